@@ -0,0 +1,241 @@
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Count, Exists, Max, OuterRef, Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import BaseRenderer
+
+from apps.nurseries.models import Nursery, NurseryAssistant
+from apps.subscriptions.models import SubscriptionDetail
+from .models import CalendarFeedKey
+
+CONTENT_TYPE = 'text/calendar; charset=utf-8'
+TOKEN_SALT = 'activities.calendar'
+ICS_DAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+def cache_timeout():
+    return getattr(settings, 'ICS_FEED_CACHE_TIMEOUT', 86400)
+
+
+def max_age():
+    return getattr(settings, 'ICS_FEED_MAX_AGE', 300)
+
+
+# Accès
+
+def calendar_token(user, rotate=False):
+    """
+    Jeton d'abonnement à placer dans l'URL du flux (?token=) : les applications de
+    calendrier ne savent pas envoyer d'en-tête Authorization.
+    Signé avec la clé de calendrier de l'utilisateur : `rotate` la renouvelle, ce qui
+    révoque tous ses liens précédents.
+    """
+    feed_key, created = CalendarFeedKey.objects.get_or_create(user=user)
+    if rotate and not created:
+        feed_key.rotate()
+    return signing.dumps([user.pk, feed_key.key], salt=TOKEN_SALT)
+
+
+def subscription_url(request, url_name, kwargs, rotate=False):
+    url = request.build_absolute_uri(reverse(url_name, kwargs=kwargs))
+    return f"{url}?token={calendar_token(request.user, rotate)}"
+
+
+class CalendarTokenAuthentication(BaseAuthentication):
+    """
+    Authentifie une requête par le paramètre `token` produit par `calendar_token`.
+    Le jeton n'expire pas : il est révoqué par le renouvellement de la clé de calendrier
+    de l'utilisateur, ou par la désactivation du compte.
+    """
+
+    def authenticate(self, request):
+        token = request.query_params.get('token')
+        if not token:
+            return None
+        try:
+            user_id, key = signing.loads(token, salt=TOKEN_SALT)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise AuthenticationFailed("Lien de calendrier invalide.")
+        user = User.objects.filter(pk=user_id, is_active=True, calendar_key__key=key).first()
+        if user is None:
+            raise AuthenticationFailed("Lien de calendrier invalide.")
+        return user, token
+
+
+def can_view_timetable(user, nursery_id, classroom_id=None):
+    """
+    Manager de la crèche, assistant de la crèche, ou parent d'un enfant inscrit
+    (dans la classe si `classroom_id` est donné) : une seule requête, quel que soit le rôle.
+    """
+    if user.is_staff:
+        return True
+    enrolments = SubscriptionDetail.objects.filter(
+        subscription__parent__user=user, subscription__is_active=True, is_valide=True,
+        subscription__plan__nursery_id=OuterRef('pk'),
+    )
+    if classroom_id is not None:
+        enrolments = enrolments.filter(classroom_id=classroom_id)
+    return Nursery.objects.filter(pk=nursery_id).filter(
+        Q(manager__user=user)
+        | Exists(NurseryAssistant.objects.filter(profil__user=user, nursery_id=OuterRef('pk')))
+        | Exists(enrolments)
+    ).exists()
+
+
+class ICalendarRenderer(BaseRenderer):
+    """
+    Négociation du type text/calendar ; le flux lui-même est une réponse Django,
+    seules les erreurs passent par ce rendu.
+    """
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, str)):
+            return data
+        return json.dumps(data, ensure_ascii=False).encode()
+
+
+# Format iCalendar (RFC 5545)
+
+def escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """
+    Ligne terminée par CRLF, repliée à 75 octets sans couper un caractère UTF-8.
+    """
+    if len(line.encode()) <= 75:
+        return line + '\r\n'
+    parts, current, size, limit = [], [], 0, 75
+    for char in line:
+        width = len(char.encode())
+        if size + width > limit:
+            parts.append(''.join(current))
+            current, size, limit = [], 0, 74
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def local(value):
+    # Heures « flottantes » : les créneaux sont saisis à l'heure locale de la crèche
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def utc(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def event(slot, host):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:classroom-activity-{slot.pk}@{host}',
+        f'DTSTAMP:{utc(slot.updated_at)}',
+        f'DTSTART:{local(datetime.datetime.combine(slot.date, slot.start_time))}',
+        f'DTEND:{local(datetime.datetime.combine(slot.date, slot.end_time))}',
+        f'SUMMARY:{escape(slot.activity.name)}',
+        f'LOCATION:{escape(slot.classroom.name)}',
+        f'CATEGORIES:{escape(slot.activity.get_type_display())}',
+    ]
+    if slot.activity.description:
+        lines.append(f'DESCRIPTION:{escape(slot.activity.description)}')
+    recurrence = getattr(slot, 'recurrence', None)
+    if recurrence is not None:
+        until = datetime.datetime.combine(recurrence.until, datetime.time(23, 59, 59))
+        lines.append(
+            f"RRULE:FREQ=WEEKLY;INTERVAL={recurrence.interval};"
+            f"BYDAY={','.join(ICS_DAYS[day] for day in recurrence.weekdays)};UNTIL={local(until)}"
+        )
+        for value in recurrence.exceptions:
+            start = datetime.datetime.combine(datetime.date.fromisoformat(value), slot.start_time)
+            lines.append(f'EXDATE:{local(start)}')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+def feed(slots, name, host):
+    """
+    Calendrier produit événement par événement (une série répétée = un VEVENT avec RRULE) ;
+    les créneaux sont lus par paquets, le calendrier complet n'est jamais construit en mémoire.
+    """
+    yield ''.join(fold(line) for line in [
+        'BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//stage//Emploi du temps//FR',
+        'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', f'X-WR-CALNAME:{escape(name)}',
+    ])
+    queryset = slots.select_related('activity', 'classroom', 'recurrence').order_by('date', 'start_time', 'pk')
+    for slot in queryset.iterator(chunk_size=500):
+        yield event(slot, host)
+    yield fold('END:VCALENDAR')
+
+
+# Réponse
+
+def feed_validators(scope, slots):
+    """
+    ETag et Last-Modified du flux, d'après le nombre de créneaux et la dernière modification
+    des créneaux, de leurs activités, de leurs classes et de la crèche (une requête).
+    """
+    values = slots.aggregate(
+        count=Count('pk'), slot_at=Max('updated_at'), activity_at=Max('activity__updated_at'),
+        classroom_at=Max('classroom__updated_at'), nursery_at=Max('classroom__nursery__updated_at'),
+    )
+    timestamps = [value for key, value in values.items() if key != 'count' and value is not None]
+    fingerprint = ':'.join([scope, str(values['count'])] + [str(value.timestamp()) for value in timestamps])
+    etag = f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+    return etag, int(max(timestamps).timestamp()) if timestamps else None
+
+
+def cached_feed(chunks, key):
+    """
+    Transmet le flux et ne le met en cache qu'une fois envoyé en entier.
+    """
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(key, ''.join(parts), cache_timeout())
+
+
+def feed_response(request, scope, slots, name):
+    """
+    Réponse .ics : 304 si le client a déjà cette version, sinon le calendrier en cache
+    (clé = version des données, donc durée de vie longue sans risque de contenu périmé),
+    sinon généré en streaming.
+    """
+    etag, last_modified = feed_validators(scope, slots)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        key = 'activities:ics:' + etag.strip('"')
+        body = cache.get(key)
+        if body is not None:
+            response = HttpResponse(body, content_type=CONTENT_TYPE)
+            response['X-Cache'] = 'HIT'
+        else:
+            response = StreamingHttpResponse(
+                cached_feed(feed(slots, name, request.get_host()), key), content_type=CONTENT_TYPE,
+            )
+            response['X-Cache'] = 'MISS'
+        response['Content-Disposition'] = f'inline; filename="{scope}.ics"'
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = f'private, max-age={max_age()}'
+    return response
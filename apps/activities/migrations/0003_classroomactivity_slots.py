@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0002_initial'),
+        ('classrooms', '0003_occupancy_counters'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='classroomactivity',
+            unique_together={('classroom', 'activity', 'date')},
+        ),
+        migrations.AddIndex(
+            model_name='classroomactivity',
+            index=models.Index(fields=['classroom', 'date', 'start_time'], name='classroomactivity_slot'),
+        ),
+    ]
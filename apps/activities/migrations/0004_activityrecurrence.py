@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 18:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0003_classroomactivity_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRecurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekdays', models.JSONField(default=list, help_text='Jours de la semaine (0=Lundi, …, 6=Dimanche)')),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Toutes les N semaines')),
+                ('until', models.DateField(help_text='Dernière date de la série (incluse)')),
+                ('exceptions', models.JSONField(blank=True, default=list, help_text='Dates annulées')),
+                ('classroom_activity', models.OneToOneField(help_text='Activité de classe répétée', on_delete=django.db.models.deletion.CASCADE, related_name='recurrence', to='activities.classroomactivity')),
+            ],
+            options={
+                'verbose_name': "Répétition d'activité",
+                'verbose_name_plural': "Répétitions d'activités",
+                'indexes': [models.Index(fields=['until'], name='activityrecurrence_until')],
+            },
+        ),
+    ]
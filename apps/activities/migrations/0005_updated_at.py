@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0004_activityrecurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Date de mise à jour'),
+        ),
+        migrations.AddField(
+            model_name='classroomactivity',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Date de mise à jour'),
+        ),
+    ]
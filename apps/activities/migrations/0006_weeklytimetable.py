@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 18:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0005_updated_at'),
+        ('classrooms', '0003_occupancy_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyTimetable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField(help_text='Lundi de la semaine')),
+                ('data', models.JSONField(help_text='Créneaux de la semaine, jour par jour')),
+                ('built_at', models.DateTimeField(auto_now=True, help_text='Date de construction')),
+                ('classroom', models.ForeignKey(help_text='Classe concernée', on_delete=django.db.models.deletion.CASCADE, related_name='weekly_timetables', to='classrooms.classroom')),
+            ],
+            options={
+                'verbose_name': 'Emploi du temps hebdomadaire',
+                'verbose_name_plural': 'Emplois du temps hebdomadaires',
+                'unique_together': {('classroom', 'week_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 19:29
+
+import apps.activities.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0006_weeklytimetable'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeedKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(default=apps.activities.models.new_calendar_key, help_text='Secret des jetons', max_length=64)),
+                ('rotated_at', models.DateTimeField(auto_now=True, help_text='Date du dernier renouvellement')),
+                ('user', models.OneToOneField(help_text='Propriétaire des liens', on_delete=django.db.models.deletion.CASCADE, related_name='calendar_key', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Clé de calendrier',
+                'verbose_name_plural': 'Clés de calendrier',
+            },
+        ),
+    ]
@@ -1,3 +1,6 @@
+import secrets
+
+from django.contrib.auth.models import User
 from django.db import models
 from apps.nurseries.models import Nursery
 from apps.classrooms.models import Classroom
@@ -9,7 +12,7 @@ class Activity(models.Model):
     - name, description
     - nursery : FK vers Nursery
     - type : educational, recreational, cultural, other
-    - created_at : timestamp d'ajout
+    - created_at, updated_at : timestamps d'ajout et de mise à jour
     """
     TYPE_CHOICES = [
         ('educational', 'Educationnele'),
@@ -28,6 +31,7 @@ class Activity(models.Model):
     type = models.CharField(max_length=50, choices=TYPE_CHOICES, help_text="Catégorie de l'activité")
     valide = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True, help_text="Date de création")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Date de mise à jour")
 
     class Meta:
         verbose_name = "Activité"
@@ -42,7 +46,9 @@ class ClassroomActivity(models.Model):
     Association entre une classe (Classroom) et une activité (Activity) :
     - classroom : FK vers Classroom
     - activity : FK vers Activity
-    - start_time, end_time : horaires respectifs pour cette classe
+    - date, start_time, end_time : créneau de l'activité pour cette classe
+      (une même activité peut être planifiée à plusieurs dates)
+    - updated_at : dernière modification (versionne les calendriers .ics)
     """
     classroom = models.ForeignKey(
         Classroom,
@@ -60,10 +66,14 @@ class ClassroomActivity(models.Model):
     date = models.DateField(help_text="Date de l'activité pour cette classe")
     start_time = models.TimeField(help_text="Heure de début pour la classe")
     end_time = models.TimeField(help_text="Heure de fin pour la classe")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Date de mise à jour")
 
     class Meta:
-        unique_together = ('classroom', 'activity')
+        unique_together = ('classroom', 'activity', 'date')
         ordering = ['start_time']
+        indexes = [
+            models.Index(fields=['classroom', 'date', 'start_time'], name='classroomactivity_slot'),
+        ]
         verbose_name = "Activité de classe"
         verbose_name_plural = "Activités de classe"
 
@@ -72,3 +82,95 @@ class ClassroomActivity(models.Model):
             f"{self.classroom.name} → {self.activity.name} "
             f"({self.start_time.strftime('%H:%M')} - {self.end_time.strftime('%H:%M')})"
         )
+
+
+class ActivityRecurrence(models.Model):
+    """
+    Répétition hebdomadaire d'une activité de classe (à la manière d'une RRULE) :
+    - classroom_activity : première occurrence (date et horaires de la série)
+    - weekdays : jours de la semaine concernés (0=Lundi, …, 6=Dimanche)
+    - interval : une semaine sur `interval`
+    - until : dernière date possible (incluse)
+    - exceptions : dates annulées (ISO 8601)
+    Les occurrences ne sont pas enregistrées : elles sont calculées à la demande
+    (voir apps.activities.recurrence).
+    """
+    classroom_activity = models.OneToOneField(
+        ClassroomActivity,
+        on_delete=models.CASCADE,
+        related_name='recurrence',
+        help_text="Activité de classe répétée"
+    )
+    weekdays = models.JSONField(default=list, help_text="Jours de la semaine (0=Lundi, …, 6=Dimanche)")
+    interval = models.PositiveSmallIntegerField(default=1, help_text="Toutes les N semaines")
+    until = models.DateField(help_text="Dernière date de la série (incluse)")
+    exceptions = models.JSONField(default=list, blank=True, help_text="Dates annulées")
+
+    class Meta:
+        verbose_name = "Répétition d'activité"
+        verbose_name_plural = "Répétitions d'activités"
+        indexes = [
+            models.Index(fields=['until'], name='activityrecurrence_until'),
+        ]
+
+    def __str__(self):
+        return f"{self.classroom_activity} jusqu'au {self.until}"
+
+
+class WeeklyTimetable(models.Model):
+    """
+    Emploi du temps matérialisé d'une classe pour une semaine ISO (modèle de lecture) :
+    - classroom, week_start : la classe et le lundi de la semaine (clé unique, donc indexée)
+    - data : document servi tel quel par classrooms/{id}/timetable/
+    Une semaine est supprimée dès qu'un de ses créneaux change, puis reconstruite par le
+    worker ; une semaine absente est construite à la première lecture.
+    """
+    classroom = models.ForeignKey(
+        Classroom,
+        on_delete=models.CASCADE,
+        related_name='weekly_timetables',
+        help_text="Classe concernée"
+    )
+    week_start = models.DateField(help_text="Lundi de la semaine")
+    data = models.JSONField(help_text="Créneaux de la semaine, jour par jour")
+    built_at = models.DateTimeField(auto_now=True, help_text="Date de construction")
+
+    class Meta:
+        unique_together = ('classroom', 'week_start')
+        verbose_name = "Emploi du temps hebdomadaire"
+        verbose_name_plural = "Emplois du temps hebdomadaires"
+
+    def __str__(self):
+        return f"{self.classroom.name} — semaine du {self.week_start}"
+
+
+def new_calendar_key():
+    return secrets.token_urlsafe(24)
+
+
+class CalendarFeedKey(models.Model):
+    """
+    Secret des liens d'abonnement aux calendriers (.ics) d'un utilisateur :
+    - user : propriétaire des liens
+    - key : inclus dans chaque jeton ; le renouveler invalide tous les liens déjà distribués
+    Créé au premier lien demandé.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='calendar_key',
+        help_text="Propriétaire des liens"
+    )
+    key = models.CharField(max_length=64, default=new_calendar_key, help_text="Secret des jetons")
+    rotated_at = models.DateTimeField(auto_now=True, help_text="Date du dernier renouvellement")
+
+    class Meta:
+        verbose_name = "Clé de calendrier"
+        verbose_name_plural = "Clés de calendrier"
+
+    def __str__(self):
+        return f"Clé de calendrier de {self.user}"
+
+    def rotate(self):
+        self.key = new_calendar_key()
+        self.save(update_fields=['key', 'rotated_at'])
@@ -0,0 +1,72 @@
+import datetime
+import heapq
+
+from django.db.models import Q
+
+# Fenêtre maximale d'une série ou d'une demande d'occurrences
+MAX_SPAN_DAYS = 366
+
+
+def expand(first, weekdays, interval, until, exceptions, window_start, window_end):
+    """
+    Dates d'une série hebdomadaire comprises dans [window_start, window_end], générées
+    paresseusement dans l'ordre : seules les semaines de la fenêtre sont parcourues.
+    - first : date de la première occurrence (sa semaine est la semaine 0 de la série)
+    - weekdays : jours retenus (0=Lundi), interval : une semaine sur `interval`
+    """
+    start, end = max(first, window_start), min(until, window_end)
+    if start > end:
+        return
+    days = sorted(set(weekdays))
+    skipped = {datetime.date.fromisoformat(value) for value in exceptions}
+    origin = first - datetime.timedelta(days=first.weekday())
+    monday = start - datetime.timedelta(days=start.weekday())
+    offset = (monday - origin).days // 7 % interval
+    if offset:
+        monday += datetime.timedelta(weeks=interval - offset)
+    while monday <= end:
+        for day in days:
+            date = monday + datetime.timedelta(days=day)
+            if start <= date <= end and date not in skipped:
+                yield date
+        monday += datetime.timedelta(weeks=interval)
+
+
+def occurrence_dates(classroom_activity, window_start, window_end):
+    """
+    Dates d'une activité de classe dans la fenêtre, qu'elle soit ponctuelle ou répétée
+    (la répétition doit avoir été chargée, ex. select_related('recurrence')).
+    """
+    recurrence = getattr(classroom_activity, 'recurrence', None)
+    if recurrence is None:
+        if window_start <= classroom_activity.date <= window_end:
+            yield classroom_activity.date
+        return
+    yield from expand(
+        classroom_activity.date, recurrence.weekdays, recurrence.interval,
+        recurrence.until, recurrence.exceptions, window_start, window_end,
+    )
+
+
+def in_window(window_start, window_end):
+    """
+    Filtre des activités de classe ayant au moins une date possible dans la fenêtre :
+    ponctuelles datées dans la fenêtre, ou séries commencées avant sa fin et finissant après son début.
+    """
+    return Q(date__lte=window_end) & (
+        Q(recurrence__isnull=True, date__gte=window_start) | Q(recurrence__until__gte=window_start)
+    )
+
+
+def iter_occurrences(queryset, window_start, window_end):
+    """
+    Occurrences (date, activité de classe) de la fenêtre, triées par date puis heure de début.
+    Une série ne coûte qu'une ligne : ses dates sont produites au fil de la fusion des séries.
+    """
+    def keyed(slot):
+        for date in occurrence_dates(slot, window_start, window_end):
+            yield date, slot.start_time, slot.pk, slot
+
+    slots = queryset.filter(in_window(window_start, window_end), active=True).select_related('recurrence')
+    for date, _, _, slot in heapq.merge(*[keyed(slot) for slot in slots]):
+        yield date, slot
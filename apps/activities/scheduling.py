@@ -0,0 +1,122 @@
+import bisect
+from collections import defaultdict
+
+from apps.nurseries.models import OpeningHour
+from .models import ClassroomActivity
+from .recurrence import in_window, occurrence_dates
+
+REASON_ORDER = "L'heure de fin doit être postérieure à l'heure de début."
+REASON_CLOSED = "La crèche est fermée ce jour."
+REASON_OUTSIDE = "Activité en dehors des horaires d'ouverture ({open} - {close})."
+REASON_OVERLAP = "Chevauche les activités de classe n° {ids}."
+REASON_OVERLAP_BATCH = "Chevauche un autre créneau du lot."
+REASON_PLANNED = "Activité déjà planifiée dans cette classe à cette date."
+
+
+def day_minute(time):
+    return time.hour * 60 + time.minute
+
+
+class DaySchedule:
+    """
+    Créneaux occupés d'une classe pour une date, en minutes depuis minuit :
+    blocs disjoints [début, fin) triés par début, chacun portant les activités qu'il couvre
+    (des activités qui se chevauchent déjà en base sont fusionnées en un seul bloc).
+    Début et fin étant tous deux croissants, un chevauchement se trouve par dichotomie.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.blocks = []
+
+    def _overlapping(self, start, end):
+        # Blocs [low, high) chevauchant [start, end) : ceux qui commencent avant `end`
+        # et finissent après `start`, contigus juste avant `high`
+        high = bisect.bisect_left(self.starts, end)
+        low = high
+        while low > 0 and self.blocks[low - 1][1] > start:
+            low -= 1
+        return low, high
+
+    def conflicts(self, start, end):
+        """
+        Activités chevauchant [start, end) (None pour un créneau du lot pas encore enregistré).
+        """
+        low, high = self._overlapping(start, end)
+        return [ident for block in self.blocks[low:high] for ident in block[2]]
+
+    def add(self, start, end, ident=None):
+        low, high = self._overlapping(start, end)
+        merged = self.blocks[low:high]
+        block = (
+            min([start] + [block[0] for block in merged]),
+            max([end] + [block[1] for block in merged]),
+            [ident for block in merged for ident in block[2]] + [ident],
+        )
+        self.blocks[low:high] = [block]
+        self.starts[low:high] = [block[0]]
+
+
+class Scheduler:
+    """
+    Vérification des créneaux d'activités d'une crèche :
+    - horaires d'ouverture lus une fois (sans horaires renseignés, seule la règle de
+      non-chevauchement s'applique)
+    - activités existantes des (classes, dates) concernées lues en une requête (une ligne par
+      série répétée), puis indexées par classe et par date dans des DaySchedule
+    Chaque créneau accepté via `book` est ajouté à l'index : un lot est validé en une passe.
+    """
+
+    def __init__(self, nursery_id):
+        self.hours = {hour.day: hour for hour in OpeningHour.objects.filter(nursery_id=nursery_id)}
+        self.days = defaultdict(DaySchedule)
+
+    def load(self, classroom_ids, dates, exclude=None):
+        """
+        Indexe les occurrences des activités existantes (ponctuelles ou répétées) tombant
+        aux `dates` dans les classes `classroom_ids`.
+        """
+        dates = set(dates)
+        if not dates:
+            return self
+        window = (min(dates), max(dates))
+        slots = ClassroomActivity.objects.filter(
+            in_window(*window), classroom_id__in=classroom_ids, active=True,
+        ).select_related('recurrence')
+        if exclude is not None:
+            slots = slots.exclude(pk=exclude)
+        for slot in slots:
+            for date in occurrence_dates(slot, *window):
+                if date in dates:
+                    self.days[(slot.classroom_id, date)].add(
+                        day_minute(slot.start_time), day_minute(slot.end_time), slot.pk,
+                    )
+        return self
+
+    def check(self, classroom_id, date, start_time, end_time):
+        """
+        Liste des problèmes du créneau (vide s'il peut être planifié).
+        """
+        if start_time >= end_time:
+            return [REASON_ORDER]
+        errors = []
+        if self.hours:
+            hour = self.hours.get(date.weekday())
+            if hour is None or hour.is_closed or not hour.open_time or not hour.close_time:
+                errors.append(REASON_CLOSED)
+            elif start_time < hour.open_time or end_time > hour.close_time:
+                errors.append(REASON_OUTSIDE.format(
+                    open=hour.open_time.strftime('%H:%M'), close=hour.close_time.strftime('%H:%M'),
+                ))
+        schedule = self.days.get((classroom_id, date))
+        if schedule is not None:
+            conflicts = schedule.conflicts(day_minute(start_time), day_minute(end_time))
+            ids = [str(ident) for ident in conflicts if ident is not None]
+            if ids:
+                errors.append(REASON_OVERLAP.format(ids=", ".join(ids)))
+            if len(ids) < len(conflicts):
+                errors.append(REASON_OVERLAP_BATCH)
+        return errors
+
+    def book(self, classroom_id, date, start_time, end_time, ident=None):
+        self.days[(classroom_id, date)].add(day_minute(start_time), day_minute(end_time), ident)
@@ -1,5 +1,11 @@
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import ClassroomActivity, Activity
+from .models import ActivityRecurrence, ClassroomActivity, Activity
+from .recurrence import MAX_SPAN_DAYS, expand
+from .scheduling import Scheduler
 from apps.classrooms.serializers import Classroom
 from apps.nurseries.serializers import NurserySerializer , Nursery
 from rest_framework import serializers
@@ -35,10 +41,30 @@ class ActivitySerializer(serializers.ModelSerializer):
         return attrs
 
 
+class ActivityRecurrenceSerializer(serializers.ModelSerializer):
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6), required=False,
+        help_text="Jours de la semaine (0=Lundi, …, 6=Dimanche), par défaut celui de la date",
+    )
+    interval = serializers.IntegerField(min_value=1, max_value=52, required=False, help_text="Toutes les N semaines")
+    exceptions = serializers.ListField(
+        child=serializers.DateField(), required=False, help_text="Dates annulées",
+    )
+
+    class Meta:
+        model = ActivityRecurrence
+        fields = ['weekdays', 'interval', 'until', 'exceptions']
+
+    def validate(self, attrs):
+        attrs['weekdays'] = sorted(set(attrs.get('weekdays', [])))
+        attrs['exceptions'] = sorted({date.isoformat() for date in attrs.get('exceptions', [])})
+        return attrs
+
+
 class ClassroomActivitySerializer(serializers.ModelSerializer):
 
     activity = serializers.PrimaryKeyRelatedField(
-        read_only=True,
+        queryset=Activity.objects.all(),
         help_text="ID de l'activité"
     )
 
@@ -47,11 +73,14 @@ class ClassroomActivitySerializer(serializers.ModelSerializer):
         help_text="ID de la salle de classe"
     )
 
-
+    recurrence = ActivityRecurrenceSerializer(
+        required=False, allow_null=True,
+        help_text="Répétition hebdomadaire (absente pour une activité ponctuelle)"
+    )
 
     class Meta:
         model = ClassroomActivity
-        fields = ['id', 'classroom', 'activity', 'date','start_time', 'end_time']
+        fields = ['id', 'classroom', 'activity', 'date','start_time', 'end_time', 'recurrence']
         extra_kwargs = {
             'classroom': {'required': True},
             'activity': {'required': True},
@@ -70,8 +99,120 @@ class ClassroomActivitySerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         # Validation stricte : rien ne doit être vide
         for field in ['classroom', 'activity', 'date', 'start_time', 'end_time']:
-            if self.instance and field in ['classroom', 'activity']:
-                continue  # déjà en read_only
+            if field == 'classroom' or (self.instance and field == 'activity'):
+                continue  # read_only : classe fournie par l'URL, activité figée après création
             if attrs.get(field) in [None, '']:
                 raise serializers.ValidationError({field: "Ce champ est requis et ne peut pas être vide."})
+
+        # Classe : celle de l'activité planifiée en update, celle de l'URL (contexte) en création
+        classroom = self.instance.classroom if self.instance else self.context.get('classroom')
+        if classroom is None:
+            return attrs
+        activity = self.instance.activity if self.instance else attrs['activity']
+        if activity.nursery_id != classroom.nursery_id:
+            raise serializers.ValidationError({'activity': "Cette activité n'appartient pas à la crèche de la classe."})
+        dates = self.occupied_dates(attrs)
+        scheduler = Scheduler(classroom.nursery_id).load(
+            [classroom.pk], dates, exclude=self.instance.pk if self.instance else None,
+        )
+        errors = []
+        for date in dates:
+            problems = scheduler.check(classroom.pk, date, attrs['start_time'], attrs['end_time'])
+            errors.extend(f"{date} : {problem}" if len(dates) > 1 else problem for problem in problems)
+        if errors:
+            raise serializers.ValidationError({'non_field_errors': errors})
+        return attrs
+
+    def check_rule(self, recurrence, date):
+        if not recurrence['weekdays']:
+            recurrence['weekdays'] = [date.weekday()]
+        elif date.weekday() not in recurrence['weekdays']:
+            raise serializers.ValidationError(
+                {'recurrence': "Le jour de la première date doit faire partie des jours répétés."}
+            )
+        if recurrence['until'] < date:
+            raise serializers.ValidationError({'recurrence': "La fin de la série précède sa première date."})
+        if (recurrence['until'] - date).days > MAX_SPAN_DAYS:
+            raise serializers.ValidationError(
+                {'recurrence': f"Une série ne peut pas dépasser {MAX_SPAN_DAYS} jours."}
+            )
+
+    def occupied_dates(self, attrs):
+        """
+        Dates occupées par l'activité : sa date seule, ou toutes les occurrences de sa série
+        (la série existante est conservée en update si `recurrence` n'est pas fourni).
+        """
+        date = attrs['date']
+        if 'recurrence' in attrs:
+            recurrence = attrs['recurrence']
+        else:
+            existing = getattr(self.instance, 'recurrence', None) if self.instance else None
+            recurrence = None if existing is None else {
+                'weekdays': existing.weekdays, 'interval': existing.interval,
+                'until': existing.until, 'exceptions': existing.exceptions,
+            }
+        if recurrence is None:
+            return [date]
+        self.check_rule(recurrence, date)
+        return list(expand(
+            date, recurrence['weekdays'], recurrence.get('interval', 1), recurrence['until'],
+            recurrence['exceptions'], date, recurrence['until'],
+        )) or [date]
+
+    def create(self, validated_data):
+        recurrence = validated_data.pop('recurrence', None)
+        with transaction.atomic():
+            instance = super().create(validated_data)
+            if recurrence is not None:
+                ActivityRecurrence.objects.create(classroom_activity=instance, **recurrence)
+        return instance
+
+    def update(self, instance, validated_data):
+        provided = 'recurrence' in validated_data
+        recurrence = validated_data.pop('recurrence', None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if provided and recurrence is None:
+                ActivityRecurrence.objects.filter(classroom_activity=instance).delete()
+            elif provided:
+                ActivityRecurrence.objects.update_or_create(classroom_activity=instance, defaults=recurrence)
+        if provided:
+            # Vide la répétition mise en cache sur l'instance avant la réponse
+            instance.refresh_from_db()
+        return instance
+
+
+class ScheduleRequestSerializer(serializers.Serializer):
+    """
+    Planification groupée d'une activité : même créneau dans plusieurs classes et à plusieurs dates.
+    """
+    classrooms = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), min_length=1, max_length=500,
+        help_text="IDs des classes",
+    )
+    dates = serializers.ListField(
+        child=serializers.DateField(), min_length=1, max_length=366,
+        help_text="Dates de l'activité",
+    )
+    start_time = serializers.TimeField(help_text="Heure de début")
+    end_time = serializers.TimeField(help_text="Heure de fin")
+    dry_run = serializers.BooleanField(
+        default=False, help_text="Rapporte les conflits sans rien enregistrer",
+    )
+
+
+class OccurrenceWindowSerializer(serializers.Serializer):
+    """
+    Fenêtre de dates demandée pour les occurrences (7 jours à partir d'aujourd'hui par défaut).
+    """
+    start = serializers.DateField(required=False, help_text="Premier jour (inclus)")
+    end = serializers.DateField(required=False, help_text="Dernier jour (inclus)")
+
+    def validate(self, attrs):
+        start = attrs.setdefault('start', timezone.localdate())
+        end = attrs.setdefault('end', start + datetime.timedelta(days=6))
+        if end < start:
+            raise serializers.ValidationError({'end': "La fin de la fenêtre précède son début."})
+        if (end - start).days > MAX_SPAN_DAYS:
+            raise serializers.ValidationError({'end': f"La fenêtre ne peut pas dépasser {MAX_SPAN_DAYS} jours."})
         return attrs
@@ -0,0 +1,77 @@
+from django.db.models import Max, Min
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from . import timetable
+from .models import Activity, ActivityRecurrence, ClassroomActivity
+
+# Les semaines d'emploi du temps matérialisées (WeeklyTimetable) touchées par une écriture
+# sont expirées puis reconstruites. bulk_create n'émettant pas de signaux, ses appelants
+# utilisent timetable.expire().
+
+
+def slot_span(slot):
+    """
+    (classe, première date, dernière date) occupées par un créneau, répétition comprise.
+    """
+    recurrence = getattr(slot, 'recurrence', None)
+    return slot.classroom_id, slot.date, recurrence.until if recurrence is not None else slot.date
+
+
+@receiver(pre_save, sender=ClassroomActivity)
+def remember_previous_span(sender, instance, raw=False, **kwargs):
+    instance._previous_span = None
+    if not raw and instance.pk:
+        previous = ClassroomActivity.objects.filter(pk=instance.pk).select_related('recurrence').first()
+        if previous is not None:
+            instance._previous_span = slot_span(previous)
+
+
+@receiver(post_save, sender=ClassroomActivity)
+@receiver(post_delete, sender=ClassroomActivity)
+def expire_slot_weeks(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    spans = {slot_span(instance), getattr(instance, '_previous_span', None)} - {None}
+    for classroom_id, first, last in spans:
+        timetable.expire([classroom_id], first, last)
+
+
+@receiver(pre_save, sender=ActivityRecurrence)
+def remember_previous_until(sender, instance, raw=False, **kwargs):
+    instance._previous_until = None
+    if not raw and instance.pk:
+        instance._previous_until = (
+            ActivityRecurrence.objects.filter(pk=instance.pk).values_list('until', flat=True).first()
+        )
+
+
+# La répétition fait partie du créneau : on avance `updated_at` de l'activité de classe,
+# ce qui périme les calendriers .ics qui la contiennent
+@receiver(post_save, sender=ActivityRecurrence)
+@receiver(post_delete, sender=ActivityRecurrence)
+def touch_classroom_activity(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    slots = ClassroomActivity.objects.filter(pk=instance.classroom_activity_id)
+    slots.update(updated_at=timezone.now())
+    slot = slots.values_list('classroom_id', 'date').first()
+    if slot is not None:
+        last = max(instance.until, getattr(instance, '_previous_until', None) or instance.until)
+        timetable.expire([slot[0]], slot[1], last)
+
+
+@receiver(post_save, sender=Activity)
+def expire_activity_weeks(sender, instance, created, raw=False, **kwargs):
+    # Nom ou type changé : toutes les semaines où l'activité est planifiée
+    if created or raw:
+        return
+    spans = (
+        ClassroomActivity.objects.filter(activity=instance)
+        .order_by()
+        .values('classroom_id')
+        .annotate(first=Min('date'), last=Max(Coalesce('recurrence__until', 'date')))
+    )
+    for span in spans:
+        timetable.expire([span['classroom_id']], span['first'], span['last'])
@@ -0,0 +1,24 @@
+import datetime
+
+from celery import shared_task
+
+from apps.core.tasks import IdempotentTask
+from .models import WeeklyTimetable
+from .timetable import store
+
+
+@shared_task(base=IdempotentTask)
+def rebuild_timetables(classroom_id, week_starts, span=None):
+    """
+    Reconstruit les semaines d'emploi du temps périmées d'une classe (dates ISO des lundis),
+    et les semaines de `span` (premier et dernier lundi) enregistrées depuis leur suppression.
+    """
+    weeks = {datetime.date.fromisoformat(value) for value in week_starts}
+    if span is not None:
+        weeks.update(
+            WeeklyTimetable.objects.filter(
+                classroom_id=classroom_id, week_start__range=[datetime.date.fromisoformat(value) for value in span],
+            ).values_list('week_start', flat=True)
+        )
+    for week_start in sorted(weeks):
+        store(classroom_id, week_start)
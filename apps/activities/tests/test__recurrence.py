@@ -0,0 +1,74 @@
+import datetime
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.activities.models import ActivityRecurrence, ClassroomActivity
+from apps.activities.recurrence import expand, iter_occurrences
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+
+MONDAY = datetime.date(2030, 1, 7)
+
+
+def day(offset):
+    return MONDAY + datetime.timedelta(days=offset)
+
+
+class ExpandTests(SimpleTestCase):
+
+    def dates(self, first=MONDAY, weekdays=(0, 2), interval=1, until=None, exceptions=(), window=(0, 27)):
+        until = until or day(60)
+        return list(expand(first, list(weekdays), interval, until, list(exceptions), day(window[0]), day(window[1])))
+
+    def test_weekly_with_exceptions(self):
+        self.assertEqual(
+            self.dates(exceptions=[day(2).isoformat(), day(14).isoformat()]),
+            [day(0), day(7), day(9), day(16), day(21), day(23)],
+        )
+
+    def test_interval_aligned_on_first_week(self):
+        # Une semaine sur deux, fenêtre ouverte sur une semaine creuse de la série
+        self.assertEqual(self.dates(interval=2, window=(8, 35)), [day(14), day(16), day(28), day(30)])
+        self.assertEqual(self.dates(interval=3, window=(1, 27)), [day(2), day(21), day(23)])
+
+    def test_bounded_by_first_and_until(self):
+        # Série commencée un mercredi : le lundi de la même semaine n'en fait pas partie
+        self.assertEqual(self.dates(first=day(2), window=(0, 8)), [day(2), day(7)])
+        self.assertEqual(self.dates(until=day(9)), [day(0), day(2), day(7), day(9)])
+        self.assertEqual(self.dates(first=day(30)), [])
+        self.assertEqual(self.dates(until=day(-1)), [])
+
+    def test_long_series_only_walks_the_window(self):
+        dates = list(expand(MONDAY, [6], 1, day(365 * 50), [], day(365 * 40), day(365 * 40 + 6)))
+        self.assertEqual(len(dates), 1)
+        self.assertEqual(dates[0].weekday(), 6)
+
+
+class IterOccurrencesTests(TestCase):
+
+    def setUp(self):
+        objects, parents, _ = seed_budget_dataset(1)
+        self.classroom_id = parents['classroom_pk']
+        self.activity = objects['nursery-activity']
+        ClassroomActivity.objects.all().delete()
+
+    def slot(self, date, hour, **fields):
+        return ClassroomActivity.objects.create(
+            classroom_id=self.classroom_id, activity=self.activity, date=date,
+            start_time=datetime.time(hour), end_time=datetime.time(hour + 1), **fields,
+        )
+
+    def test_series_and_one_offs_merged_in_order(self):
+        series = self.slot(MONDAY, 10)
+        ActivityRecurrence.objects.create(
+            classroom_activity=series, weekdays=[0, 2], until=day(13), exceptions=[day(7).isoformat()],
+        )
+        early = self.slot(day(2), 9)
+        self.slot(day(3), 8, active=False)
+        self.slot(day(30), 8)
+        ended = self.slot(day(-14), 8)
+        ActivityRecurrence.objects.create(classroom_activity=ended, weekdays=[0], until=day(-7))
+
+        occurrences = [(date, slot.pk) for date, slot in iter_occurrences(ClassroomActivity.objects.all(), day(0), day(13))]
+        self.assertEqual(occurrences, [
+            (day(0), series.pk), (day(2), early.pk), (day(2), series.pk), (day(9), series.pk),
+        ])
@@ -0,0 +1,48 @@
+import datetime
+
+from django.test import TestCase
+
+from apps.activities import timetable
+from apps.activities.models import ClassroomActivity, WeeklyTimetable
+from apps.activities.tasks import rebuild_timetables
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+
+MONDAY = datetime.date(2030, 1, 7)
+
+
+class ExpireTests(TestCase):
+
+    def setUp(self):
+        objects, parents, _ = seed_budget_dataset(1)
+        self.classroom_id = parents['classroom_pk']
+        self.activity = objects['nursery-activity']
+
+    def names(self):
+        document = WeeklyTimetable.objects.get(classroom_id=self.classroom_id, week_start=MONDAY).data
+        return [slot['name'] for day in document['days'] for slot in day['slots']]
+
+    def add_slot(self):
+        ClassroomActivity.objects.create(
+            classroom_id=self.classroom_id, activity=self.activity, date=MONDAY,
+            start_time=datetime.time(14), end_time=datetime.time(15),
+        )
+
+    def test_week_expired_at_commit(self):
+        timetable.get_document(self.classroom_id, MONDAY)
+        self.assertEqual(self.names(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_slot()
+            # Écriture non validée : la semaine matérialisée reste en place
+            self.assertTrue(WeeklyTimetable.objects.filter(classroom_id=self.classroom_id).exists())
+        # Supprimée puis reconstruite (worker en mode eager) avec le nouveau créneau
+        self.assertEqual(self.names(), [self.activity.name])
+
+    def test_week_stored_by_concurrent_read_is_rebuilt(self):
+        self.add_slot()
+        # Semaine construite sur les anciens créneaux par une lecture partie avant le commit,
+        # enregistrée après la suppression
+        timetable.store(self.classroom_id, MONDAY)
+        WeeklyTimetable.objects.filter(classroom_id=self.classroom_id).update(data={'days': []})
+        rebuild_timetables(self.classroom_id, [], [MONDAY.isoformat(), MONDAY.isoformat()])
+        self.assertEqual(self.names(), [self.activity.name])
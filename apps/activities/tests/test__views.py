@@ -0,0 +1,132 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import signing
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.activities.calendar import TOKEN_SALT
+from apps.activities.models import ClassroomActivity
+from apps.activities.views import ActivityViewSet
+from apps.core.testing import QueryBudgetTestMixin
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+
+
+class CalendarBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """
+    Flux et lien de calendrier : même nombre de requêtes pour le manager, un assistant
+    et un parent (droit d'accès vérifié en une requête).
+    """
+
+    def setUp(self):
+        objects, self.parents, self.users = seed_budget_dataset(3)
+        self.users['stranger'] = User.objects.create(username='stranger', password='!')
+
+    def get(self, role, name, **kwargs):
+        token = RefreshToken.for_user(self.users[role]).access_token
+        return self.client.get(reverse(name, kwargs=kwargs), secure=True, HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_calendar_by_role(self):
+        nursery = {'nursery_pk': self.parents['nursery_pk']}
+        classroom = {**nursery, 'classroom_pk': self.parents['classroom_pk']}
+        for role in ('manager', 'assistant', 'parent'):
+            for name, kwargs in (
+                ('nursery-activity-calendar', nursery), ('nursery-activity-calendar-link', nursery),
+                ('classroom-activity-calendar', classroom), ('classroom-activity-calendar-link', classroom),
+                ('nursery-classroom-timetable', {**nursery, 'pk': self.parents['classroom_pk']}),
+            ):
+                with self.subTest(role=role, route=name):
+                    response = self.get(role, name, **kwargs)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEndpointBudget(response)
+
+    def test_calendar_denied(self):
+        response = self.get('stranger', 'nursery-activity-calendar', nursery_pk=self.parents['nursery_pk'])
+        self.assertEqual(response.status_code, 403)
+
+
+class ScheduleTests(APITestCase):
+
+    def setUp(self):
+        objects, self.parents, users = seed_budget_dataset(2)
+        self.activity = objects['nursery-activity']
+        self.url = reverse('nursery-activity-schedule', kwargs={
+            'nursery_pk': self.parents['nursery_pk'], 'pk': self.activity.pk,
+        })
+        token = RefreshToken.for_user(users['manager']).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.payload = {
+            'classrooms': [self.parents['classroom_pk']], 'dates': ['2030-01-07', '2030-01-08'],
+            'start_time': '14:00', 'end_time': '15:00',
+        }
+
+    def test_schedule(self):
+        response = self.client.post(self.url, self.payload, format='json', secure=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+
+        response = self.client.post(self.url, self.payload, format='json', secure=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data['conflicts']), 2)
+
+    def test_concurrent_insert_is_a_conflict(self):
+        original, calls = ActivityViewSet.planned, []
+
+        def planned(activity, classroom_ids, dates):
+            if not calls:
+                # Vérification faite, puis une autre requête enregistre le créneau du 8
+                calls.append(1)
+                ClassroomActivity.objects.create(
+                    classroom_id=self.parents['classroom_pk'], activity=activity, date=datetime.date(2030, 1, 8),
+                    start_time=datetime.time(14), end_time=datetime.time(15),
+                )
+                return set()
+            return original(activity, classroom_ids, dates)
+
+        with mock.patch.object(ActivityViewSet, 'planned', staticmethod(planned)):
+            response = self.client.post(self.url, self.payload, format='json', secure=True)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(
+            [(item['classroom'], str(item['date'])) for item in response.data['conflicts']],
+            [(self.parents['classroom_pk'], '2030-01-08')],
+        )
+        self.assertEqual(ClassroomActivity.objects.filter(activity=self.activity, date__year=2030).count(), 1)
+
+
+class CalendarTokenTests(APITestCase):
+
+    def setUp(self):
+        _, parents, users = seed_budget_dataset(2)
+        self.kwargs = {'nursery_pk': parents['nursery_pk']}
+        self.parent = users['parent']
+        token = RefreshToken.for_user(self.parent).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def link(self, method='get'):
+        response = getattr(self.client, method)(
+            reverse('nursery-activity-calendar-link', kwargs=self.kwargs), secure=True,
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data['url']
+
+    def feed(self, url):
+        return APIClient().get(url.replace('https://testserver', ''), secure=True)
+
+    def test_rotation_revokes_previous_links(self):
+        first = self.link()
+        self.assertEqual(self.link(), first)
+        self.assertEqual(self.feed(first).status_code, 200)
+
+        rotated = self.link('post')
+        self.assertNotEqual(rotated, first)
+        self.assertEqual(self.feed(first).status_code, 403)
+        self.assertEqual(self.feed(rotated).status_code, 200)
+
+    def test_legacy_token_rejected(self):
+        # Ancien format (identifiant seul, sans clé) : plus accepté
+        token = signing.dumps(self.parent.pk, salt=TOKEN_SALT)
+        url = reverse('nursery-activity-calendar', kwargs=self.kwargs)
+        self.assertEqual(APIClient().get(f"{url}?token={token}", secure=True).status_code, 403)
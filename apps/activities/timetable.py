@@ -0,0 +1,113 @@
+import datetime
+import re
+
+from django.db import transaction
+
+from .models import ClassroomActivity, WeeklyTimetable
+from .recurrence import iter_occurrences
+
+WEEK_PATTERN = re.compile(r'^(\d{4})-W(\d{2})$')
+
+
+def monday(date):
+    return date - datetime.timedelta(days=date.weekday())
+
+
+def parse_week(value):
+    """
+    Lundi de la semaine ISO 'AAAA-Www' (ex. '2026-W42'), ValueError si invalide.
+    """
+    match = WEEK_PATTERN.match(value or '')
+    if match is None:
+        raise ValueError(value)
+    return datetime.date.fromisocalendar(int(match.group(1)), int(match.group(2)), 1)
+
+
+def week_label(week_start):
+    year, week, _ = week_start.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def build(classroom_id, week_start):
+    """
+    Document de la semaine : les sept jours et leurs créneaux (séries répétées développées).
+    """
+    week_end = week_start + datetime.timedelta(days=6)
+    days = {week_start + datetime.timedelta(days=offset): [] for offset in range(7)}
+    slots = ClassroomActivity.objects.filter(classroom_id=classroom_id).select_related('activity')
+    for date, slot in iter_occurrences(slots, week_start, week_end):
+        days[date].append({
+            'id': slot.pk,
+            'activity': slot.activity_id,
+            'name': slot.activity.name,
+            'type': slot.activity.type,
+            'start_time': slot.start_time.isoformat(),
+            'end_time': slot.end_time.isoformat(),
+            'recurring': getattr(slot, 'recurrence', None) is not None,
+        })
+    return {
+        'classroom': classroom_id,
+        'week': week_label(week_start),
+        'start': week_start.isoformat(),
+        'end': week_end.isoformat(),
+        'days': [{'date': date.isoformat(), 'slots': slots} for date, slots in days.items()],
+    }
+
+
+def store(classroom_id, week_start):
+    data = build(classroom_id, week_start)
+    WeeklyTimetable.objects.update_or_create(
+        classroom_id=classroom_id, week_start=week_start, defaults={'data': data},
+    )
+    return data
+
+
+def get_document(classroom_id, week_start):
+    """
+    Document de la semaine : une lecture sur l'index unique (classe, semaine),
+    construit et enregistré s'il n'existe pas encore.
+    """
+    data = (
+        WeeklyTimetable.objects.filter(classroom_id=classroom_id, week_start=week_start)
+        .values_list('data', flat=True)
+        .first()
+    )
+    if data is not None:
+        return data
+    data = build(classroom_id, week_start)
+    # Ignoré si la semaine vient d'être construite en parallèle (autre requête, worker)
+    WeeklyTimetable.objects.bulk_create(
+        [WeeklyTimetable(classroom_id=classroom_id, week_start=week_start, data=data)], ignore_conflicts=True,
+    )
+    return data
+
+
+def expire(classroom_ids, first, last):
+    """
+    Périme les semaines matérialisées des classes couvrant [first, last]. Appelé par les
+    signaux, et explicitement après un bulk_create (qui n'en émet pas).
+    Suppression au commit de l'écriture : avant, une lecture concurrente pourrait encore
+    reconstruire la semaine à partir des anciens créneaux.
+    """
+    classroom_ids = list(classroom_ids)
+    span = (monday(first), monday(last))
+    transaction.on_commit(lambda: drop(classroom_ids, *span))
+
+
+def drop(classroom_ids, first_week, last_week):
+    """
+    Supprime les semaines de la plage et confie au worker leur reconstruction, ainsi que
+    celle des semaines de la plage enregistrées entre-temps par une lecture partie avant
+    le commit (construites sur les anciens créneaux).
+    """
+    from .tasks import rebuild_timetables
+    from apps.core.tasks import enqueue
+
+    weeks = WeeklyTimetable.objects.filter(classroom_id__in=classroom_ids, week_start__range=(first_week, last_week))
+    stale = {classroom_id: [] for classroom_id in classroom_ids}
+    for classroom_id, week_start in weeks.values_list('classroom_id', 'week_start'):
+        stale[classroom_id].append(week_start.isoformat())
+    weeks.delete()
+    span = [first_week.isoformat(), last_week.isoformat()]
+    for classroom_id, week_starts in stale.items():
+        enqueue(rebuild_timetables, classroom_id, week_starts, span)
@@ -1,14 +1,43 @@
-from django.shortcuts import render
-from rest_framework import mixins, permissions, viewsets
-from rest_framework.exceptions import PermissionDenied
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from apps.nurseries.models import Nursery, NurseryAssistant
+from apps.classrooms.models import Classroom
 from apps.activities.models import Activity, ClassroomActivity
-from apps.activities.serializers import ActivitySerializer, ClassroomActivitySerializer
+from apps.activities.serializers import (
+    ActivitySerializer, ClassroomActivitySerializer, OccurrenceWindowSerializer, ScheduleRequestSerializer,
+)
+from apps.activities import timetable
+from apps.activities.recurrence import iter_occurrences
+from apps.activities.calendar import (
+    CalendarTokenAuthentication, ICalendarRenderer, can_view_timetable, feed_response, subscription_url,
+)
+from apps.activities.scheduling import REASON_PLANNED, Scheduler
+from apps.core.mixins import EagerLoadingMixin
+
+# Flux .ics : jeton d'abonnement (?token=) ou authentification habituelle
+CALENDAR_ACTION = dict(
+    methods=['GET'], url_path='calendar.ics', url_name='calendar',
+    renderer_classes=[ICalendarRenderer, JSONRenderer],
+    authentication_classes=[CalendarTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+)
+# Lien d'abonnement : GET le donne, POST renouvelle la clé (les liens précédents sont révoqués)
+CALENDAR_LINK_ACTION = dict(methods=['GET', 'POST'], url_path='calendar-link')
 
 # Create your views here.
 
 
 class ActivityViewSet(
+    EagerLoadingMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -18,10 +47,37 @@ class ActivityViewSet(
     queryset = Activity.objects.all()
     serializer_class = ActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
+    # calendar_link : 4 requêtes, 7 au premier lien (création de la clé de calendrier)
+    query_budget = {'list': 3, 'retrieve': 2, 'calendar': 4, 'calendar_link': 7}
 
     def get_queryset(self):
         return Activity.objects.filter(nursery__manager__user=self.request.user)
 
+    def get_timetable_nursery(self):
+        nursery = get_object_or_404(Nursery, pk=self.kwargs['nursery_pk'])
+        if not can_view_timetable(self.request.user, nursery.pk):
+            raise PermissionDenied("Accès refusé.")
+        return nursery
+
+    @action(detail=False, **CALENDAR_ACTION)
+    def calendar(self, request, nursery_pk=None):
+        """
+        Emploi du temps de toutes les classes de la crèche au format iCalendar.
+        """
+        nursery = self.get_timetable_nursery()
+        slots = ClassroomActivity.objects.filter(classroom__nursery=nursery, classroom__existe=True, active=True)
+        return feed_response(request, f"nursery-{nursery.pk}", slots, nursery.name)
+
+    @action(detail=False, **CALENDAR_LINK_ACTION)
+    def calendar_link(self, request, nursery_pk=None):
+        """
+        URL d'abonnement au calendrier de la crèche, signée pour l'utilisateur.
+        """
+        nursery = self.get_timetable_nursery()
+        return Response({'url': subscription_url(
+            request, 'nursery-activity-calendar', {'nursery_pk': nursery.pk}, rotate=request.method == 'POST',
+        )})
+
     def perform_create(self, serializer):
         try:
             nursery = Nursery.objects.get(manager__user=self.request.user)
@@ -36,8 +92,77 @@ class ActivityViewSet(
             raise PermissionDenied("Accès refusé.")
         serializer.save()
 
+    @action(detail=True, methods=['POST'])
+    def schedule(self, request, pk=None, nursery_pk=None):
+        """
+        Planifie l'activité sur le même créneau dans plusieurs classes et à plusieurs dates :
+        {"classrooms": [...], "dates": [...], "start_time", "end_time", "dry_run"}.
+        Le lot est validé en une passe (horaires d'ouverture, chevauchements avec les activités
+        existantes) puis enregistré en entier, ou refusé en entier avec la liste des conflits.
+        """
+        activity = self.get_object()
+        params = ScheduleRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        classroom_ids = list(dict.fromkeys(data['classrooms']))
+        dates = sorted(set(data['dates']))
+
+        with transaction.atomic():
+            # Classes verrouillées jusqu'à l'enregistrement : deux planifications simultanées
+            # des mêmes classes sont vérifiées l'une après l'autre
+            classrooms = Classroom.objects.filter(pk__in=classroom_ids, nursery_id=activity.nursery_id)
+            if not data['dry_run']:
+                classrooms = classrooms.select_for_update().order_by('pk')
+            known = set(classrooms.values_list('pk', flat=True))
+            unknown = [pk for pk in classroom_ids if pk not in known]
+            if unknown:
+                raise ValidationError({'classrooms': f"Classes inconnues dans cette crèche : {unknown}."})
+
+            scheduler = Scheduler(activity.nursery_id).load(classroom_ids, dates)
+            planned = self.planned(activity, classroom_ids, dates)
+            slots, conflicts = [], []
+            for classroom_id in classroom_ids:
+                for date in dates:
+                    errors = scheduler.check(classroom_id, date, data['start_time'], data['end_time'])
+                    if (classroom_id, date) in planned:
+                        errors.append(REASON_PLANNED)
+                    if errors:
+                        conflicts.append({'classroom': classroom_id, 'date': date, 'errors': errors})
+                        continue
+                    scheduler.book(classroom_id, date, data['start_time'], data['end_time'])
+                    slots.append(ClassroomActivity(
+                        classroom_id=classroom_id, activity=activity, date=date,
+                        start_time=data['start_time'], end_time=data['end_time'],
+                    ))
+
+            if conflicts and not data['dry_run']:
+                return Response({'created': 0, 'conflicts': conflicts}, status=status.HTTP_400_BAD_REQUEST)
+            if data['dry_run']:
+                return Response({'created': 0, 'schedulable': len(slots), 'conflicts': conflicts})
+            try:
+                with transaction.atomic():
+                    created = ClassroomActivity.objects.bulk_create(slots)
+            except IntegrityError:
+                # Créneau enregistré entre la vérification et l'écriture (autre chemin d'écriture)
+                planned = self.planned(activity, classroom_ids, dates)
+                conflicts = [
+                    {'classroom': slot.classroom_id, 'date': slot.date, 'errors': [REASON_PLANNED]}
+                    for slot in slots if (slot.classroom_id, slot.date) in planned
+                ]
+                return Response({'created': 0, 'conflicts': conflicts}, status=status.HTTP_409_CONFLICT)
+            timetable.expire(classroom_ids, dates[0], dates[-1])
+        return Response({'created': len(created), 'conflicts': []}, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def planned(activity, classroom_ids, dates):
+        return set(
+            ClassroomActivity.objects.filter(activity=activity, classroom_id__in=classroom_ids, date__in=dates)
+            .values_list('classroom_id', 'date')
+        )
+
 
 class ClassroomActivityViewSet(
+    EagerLoadingMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -47,22 +172,95 @@ class ClassroomActivityViewSet(
     queryset = ClassroomActivity.objects.all()
     serializer_class = ClassroomActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {'list': 3, 'retrieve': 2, 'occurrences': 2, 'calendar': 4, 'calendar_link': 7}
 
     def get_queryset(self):
         if self.request.user.is_staff:
             return ClassroomActivity.objects.all()
         return ClassroomActivity.objects.filter(classroom__nursery__manager__user=self.request.user)
 
-    def perform_create(self, serializer):
+    def get_classroom(self):
+        """
+        Classe de l'URL, dont l'utilisateur doit gérer la crèche.
+        """
         try:
-            assistant = NurseryAssistant.objects.get(profil__user=self.request.user, type='nursery_assistant', nursery=self.kwargs['nursery_pk'], is_manager=True)
-        except NurseryAssistant.DoesNotExist:
+            classroom = Classroom.objects.select_related('nursery__manager__user').get(
+                pk=self.kwargs.get('classroom_pk'), nursery_id=self.kwargs.get('nursery_pk'),
+            )
+        except Classroom.DoesNotExist:
+            raise NotFound("Classe non trouvée.")
+        user = self.request.user
+        if not user.is_staff and classroom.nursery.manager.user != user:
             raise PermissionDenied("Accès refusé.")
-        serializer.save()
+        return classroom
+
+    def get_timetable_classroom(self):
+        classroom = get_object_or_404(
+            Classroom, pk=self.kwargs.get('classroom_pk'), nursery_id=self.kwargs.get('nursery_pk'),
+        )
+        if not can_view_timetable(self.request.user, classroom.nursery_id, classroom.pk):
+            raise PermissionDenied("Accès refusé.")
+        return classroom
+
+    @action(detail=False, **CALENDAR_ACTION)
+    def calendar(self, request, nursery_pk=None, classroom_pk=None):
+        """
+        Emploi du temps de la classe au format iCalendar.
+        """
+        classroom = self.get_timetable_classroom()
+        slots = ClassroomActivity.objects.filter(classroom=classroom, active=True)
+        return feed_response(request, f"classroom-{classroom.pk}", slots, classroom.name)
+
+    @action(detail=False, **CALENDAR_LINK_ACTION)
+    def calendar_link(self, request, nursery_pk=None, classroom_pk=None):
+        """
+        URL d'abonnement au calendrier de la classe, signée pour l'utilisateur.
+        """
+        classroom = self.get_timetable_classroom()
+        return Response({'url': subscription_url(
+            request, 'classroom-activity-calendar', {'nursery_pk': classroom.nursery_id, 'classroom_pk': classroom.pk},
+            rotate=request.method == 'POST',
+        )})
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'create':
+            context['classroom'] = self.get_classroom()
+        return context
+
+    def perform_create(self, serializer):
+        serializer.save(classroom=serializer.context['classroom'])
 
     def perform_update(self, serializer):
         classroom_activity = self.get_object()
         user = self.request.user
         if not user.is_staff and classroom_activity.classroom.nursery.manager.user != user:
             raise PermissionDenied("Accès refusé.")
-        serializer.save()
\ No newline at end of file
+        serializer.save()
+
+    @action(detail=False, methods=['GET'])
+    def occurrences(self, request, nursery_pk=None, classroom_pk=None):
+        """
+        Occurrences des activités de la classe entre ?start= et ?end= (inclus), séries répétées
+        développées à la volée : le JSON est produit au fil de l'eau, sans liste intermédiaire.
+        """
+        classroom = self.get_classroom()
+        params = OccurrenceWindowSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        window = params.validated_data['start'], params.validated_data['end']
+        slots = ClassroomActivity.objects.filter(classroom=classroom).select_related('activity')
+        return StreamingHttpResponse(
+            stream_occurrences(iter_occurrences(slots, *window)), content_type='application/json',
+        )
+
+
+def stream_occurrences(occurrences):
+    yield '['
+    for index, (date, slot) in enumerate(occurrences):
+        item = {
+            'id': slot.pk, 'activity': slot.activity_id, 'name': slot.activity.name,
+            'date': date, 'start_time': slot.start_time, 'end_time': slot.end_time,
+            'recurring': getattr(slot, 'recurrence', None) is not None,
+        }
+        yield (',' if index else '') + json.dumps(item, cls=DjangoJSONEncoder)
+    yield ']'
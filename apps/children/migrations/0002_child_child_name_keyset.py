@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('children', '0001_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='child',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='child_name_keyset'),
+        ),
+    ]
@@ -30,6 +30,10 @@ class Child(models.Model):
         verbose_name = "Enfant"
         verbose_name_plural = "Enfants"
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Sert le tri par défaut et la pagination keyset
+            models.Index(fields=['last_name', 'first_name', 'id'], name='child_name_keyset'),
+        ]
 
     def __str__(self):
         parent_username = self.parent.user.username if self.parent else "inconnu"
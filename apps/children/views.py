@@ -3,10 +3,12 @@ from rest_framework.exceptions import PermissionDenied
 from apps.users.models import UserType
 from .models import Child
 from .serializers import ChildSerializer
+from apps.core.pagination import KeysetPagination
 
 class ChildViewSet(viewsets.ModelViewSet):
     serializer_class = ChildSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
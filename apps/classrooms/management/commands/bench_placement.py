@@ -0,0 +1,87 @@
+import datetime
+import json
+import random
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.test import force_authenticate
+
+from apps.children.models import Child
+from apps.classrooms.models import Classroom
+from apps.classrooms.views import ClassroomViewSet
+from apps.core.benchmark import format_summary, measure
+from apps.nurseries.management.commands._seed import seed_nurseries
+from apps.subscriptions.models import Plan, Subscription, SubscriptionDetail
+from apps.users.models import UserType
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure l'endpoint de placement des enfants par tranche d'âge "
+        "(les données sont annulées à la fin)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--children', type=int, default=5000)
+        parser.add_argument('--classrooms', type=int, default=40)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        today = datetime.date.today()
+        factory = RequestFactory(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        view = ClassroomViewSet.as_view({'get': 'placement', 'post': 'placement'})
+
+        with transaction.atomic():
+            nursery = seed_nurseries(1, prefix='placement_manager')[0]
+            nursery.max_age = 60
+            manager = nursery.manager.user
+            Classroom.objects.bulk_create([
+                Classroom(
+                    nursery=nursery, name=f"Classe {i}", capacity=rng.randint(10, 40),
+                    age_range_start=start, age_range_end=start + rng.choice([6, 12, 18]),
+                )
+                for i, start in enumerate(rng.randint(0, 48) for _ in range(options['classrooms']))
+            ])
+            parent = UserType.objects.create(user=User.objects.create(username="placement_parent"), type='parent')
+            children = Child.objects.bulk_create([
+                Child(
+                    parent=parent, first_name=f"Enfant {i}", last_name="Placement",
+                    birthday=today - datetime.timedelta(days=rng.randint(30, 6 * 365)),
+                )
+                for i in range(options['children'])
+            ])
+            plan = Plan.objects.create(nursery=nursery, name="Mensuel", price=10000, duration='month')
+            subscriptions = Subscription.objects.bulk_create([
+                Subscription(parent=parent, plan=plan, start_date=today) for _ in children
+            ])
+            SubscriptionDetail.objects.bulk_create([
+                SubscriptionDetail(subscription=subscription, child=child)
+                for subscription, child in zip(subscriptions, children)
+            ])
+
+            url = f'/api/client/nursery/{nursery.pk}/classrooms/placement/'
+
+            def call(data=None):
+                if data is None:
+                    request = factory.get(url)
+                else:
+                    request = factory.post(url, json.dumps(data), content_type='application/json')
+                force_authenticate(request, user=manager)
+                return view(request, nursery_pk=nursery.pk).render()
+
+            response = call()
+            payload = json.loads(response.content)
+            self.stdout.write(
+                f"{len(children)} enfants, {options['classrooms']} classes : "
+                f"{len(payload['assignments'])} placés, {len(payload['unassigned'])} non placés"
+            )
+            batch = {'children': [child.pk for child in children[:2000]]}
+            self.stdout.write(format_summary("GET (enfants sans classe)", measure(call, repeat=options['repeat'])))
+            self.stdout.write(format_summary(
+                "POST (lot de 2000)", measure(lambda: call(batch), repeat=options['repeat'])
+            ))
+            transaction.set_rollback(True)
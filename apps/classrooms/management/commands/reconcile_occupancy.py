@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.classrooms.occupancy import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recalcule les effectifs des classes et groupes à partir des inscriptions valides"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Compte les écarts sans les corriger")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = reconcile(dry_run=options['dry_run'])
+        verb = "divergent(s)" if options['dry_run'] else "corrigé(s)"
+        self.stdout.write(self.style.SUCCESS(
+            f"Classes : {fixed['classrooms']} {verb} ; groupes : {fixed['groups']} {verb}."
+        ))
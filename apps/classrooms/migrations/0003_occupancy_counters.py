@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 18:27
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_enrolments(apps, schema_editor):
+    SubscriptionDetail = apps.get_model('subscriptions', 'SubscriptionDetail')
+    for model_name, field in (('Classroom', 'classroom'), ('Group', 'group')):
+        model = apps.get_model('classrooms', model_name)
+        counts = dict(
+            SubscriptionDetail.objects.filter(is_valide=True, **{f'{field}__isnull': False})
+            .values_list(field).annotate(total=Count('pk')).order_by()
+        )
+        rows = list(model.objects.all())
+        for row in rows:
+            row.nbr_children = counts.get(row.pk, 0)
+        model.objects.bulk_update(rows, ['nbr_children'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classrooms', '0002_initial'),
+        ('subscriptions', '0007_subscriptiondetail_is_valide'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='nbr_children',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text="Nombre d'enfants inscrits dans le groupe (tenu à jour par apps.classrooms.occupancy)"),
+        ),
+        migrations.AlterField(
+            model_name='classroom',
+            name='nbr_children',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text="Nombre d'enfants inscrits dans la salle (tenu à jour par apps.classrooms.occupancy)"),
+        ),
+        migrations.RunPython(count_enrolments, migrations.RunPython.noop),
+    ]
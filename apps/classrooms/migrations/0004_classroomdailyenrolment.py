@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 18:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classrooms', '0003_occupancy_counters'),
+        ('nurseries', '0010_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassroomDailyEnrolment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('children', models.PositiveIntegerField(default=0)),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_enrolments', to='classrooms.classroom')),
+                ('nursery', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_enrolments', to='nurseries.nursery')),
+            ],
+            options={
+                'verbose_name': 'Effectif journalier',
+                'verbose_name_plural': 'Effectifs journaliers',
+                'indexes': [models.Index(fields=['nursery', 'date'], name='enrolment_nursery_date')],
+                'unique_together': {('classroom', 'date')},
+            },
+        ),
+    ]
@@ -23,7 +23,11 @@ class Classroom(models.Model):
     capacity = models.PositiveIntegerField(help_text="Capacité totale")
     age_range_start = models.PositiveIntegerField(help_text="Âge minimum (en mois)")
     age_range_end = models.PositiveIntegerField(help_text="Âge maximum (en mois)")
-    nbr_children = models.PositiveIntegerField(help_text="Nombre d'enfants dans la salle", default=0)
+    nbr_children = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Nombre d'enfants inscrits dans la salle (tenu à jour par apps.classrooms.occupancy)",
+    )
     existe = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True, help_text="Date de création")
     updated_at = models.DateTimeField(auto_now=True, help_text="Date de mise à jour")
@@ -53,6 +57,11 @@ class Group(models.Model):
         help_text="Classe à laquelle appartient ce groupe"
     )
     active = models.BooleanField(default=True)
+    nbr_children = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Nombre d'enfants inscrits dans le groupe (tenu à jour par apps.classrooms.occupancy)",
+    )
     created_at = models.DateTimeField(auto_now_add=True, help_text="Date de création")
     updated_at = models.DateTimeField(auto_now=True, help_text="Date de mise à jour")
 
@@ -63,4 +72,27 @@ class Group(models.Model):
         unique_together = ('name', 'classroom')
 
     def __str__(self):
-        return f"{self.name} ({self.classroom.name})"
\ No newline at end of file
+        return f"{self.name} ({self.classroom.name})"
+
+
+class ClassroomDailyEnrolment(models.Model):
+    """
+    Effectif d'une classe en fin de journée (agrégat tenu par apps.classrooms.occupancy) :
+    une ligne par classe et par jour où l'effectif a changé ; les jours sans ligne
+    reprennent la valeur précédente.
+    """
+    classroom = models.ForeignKey(Classroom, on_delete=models.CASCADE, related_name='daily_enrolments')
+    nursery = models.ForeignKey(Nursery, on_delete=models.CASCADE, related_name='daily_enrolments')
+    date = models.DateField()
+    children = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Effectif journalier"
+        verbose_name_plural = "Effectifs journaliers"
+        unique_together = ('classroom', 'date')
+        indexes = [
+            models.Index(fields=['nursery', 'date'], name='enrolment_nursery_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.classroom_id} le {self.date} : {self.children}"
@@ -0,0 +1,149 @@
+from collections import Counter
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Classroom, ClassroomDailyEnrolment, Group
+
+
+class CapacityExceeded(serializers.ValidationError):
+    default_code = 'capacity_exceeded'
+
+
+def contributions(details):
+    """
+    Nombre d'inscriptions valides par classe et par groupe : (Counter classes, Counter groupes).
+    """
+    classrooms, groups = Counter(), Counter()
+    for detail in details:
+        if not detail.is_valide:
+            continue
+        if detail.classroom_id:
+            classrooms[detail.classroom_id] += 1
+        if detail.group_id:
+            groups[detail.group_id] += 1
+    return classrooms, groups
+
+
+def apply_deltas(classrooms, groups):
+    """
+    Applique les variations d'effectif par UPDATE atomiques (F()) ; une hausse n'est appliquée
+    que si la capacité le permet encore au moment de l'écriture, ce qui reste vrai sous
+    inscriptions concurrentes. À appeler dans une transaction : en cas de classe pleine,
+    CapacityExceeded est levée et toute la transaction doit être annulée. Une baisse est bornée
+    à zéro : un effectif déjà faux (à corriger par reconcile_occupancy) ne devient pas négatif.
+    """
+    for classroom_id, delta in sorted(classrooms.items()):
+        if delta > 0:
+            updated = Classroom.objects.filter(
+                pk=classroom_id, nbr_children__lte=F('capacity') - delta,
+            ).update(nbr_children=F('nbr_children') + delta)
+            if not updated and Classroom.objects.filter(pk=classroom_id).exists():
+                raise CapacityExceeded("Capacité de la classe atteinte.")
+        elif delta < 0:
+            Classroom.objects.filter(pk=classroom_id).update(nbr_children=Greatest(F('nbr_children') + delta, 0))
+    for group_id, delta in sorted(groups.items()):
+        if delta > 0:
+            Group.objects.filter(pk=group_id).update(nbr_children=F('nbr_children') + delta)
+        elif delta < 0:
+            Group.objects.filter(pk=group_id).update(nbr_children=Greatest(F('nbr_children') + delta, 0))
+    snapshot([classroom_id for classroom_id, delta in classrooms.items() if delta])
+
+
+def enroll(details):
+    """
+    Compte des inscriptions créées (notamment par bulk_create, qui n'émet pas de signaux).
+    """
+    apply_deltas(*contributions(details))
+
+
+def release(details):
+    classrooms, groups = contributions(details)
+    apply_deltas(
+        Counter({key: -value for key, value in classrooms.items()}),
+        Counter({key: -value for key, value in groups.items()}),
+    )
+
+
+def change(previous, current):
+    """
+    Variation due à la modification d'une inscription (classe, groupe ou validité changés).
+    """
+    replace([previous], [current])
+
+
+def replace(previous, current):
+    """
+    Variation nette entre deux états d'un ensemble d'inscriptions (mise à jour groupée) :
+    un enfant qui reste dans sa classe ne compte pas, même si elle est pleine.
+    """
+    old_classrooms, old_groups = contributions(previous)
+    new_classrooms, new_groups = contributions(current)
+    new_classrooms.subtract(old_classrooms)
+    new_groups.subtract(old_groups)
+    apply_deltas(new_classrooms, new_groups)
+
+
+def actual_counts(model, field):
+    from apps.subscriptions.models import SubscriptionDetail
+
+    # Une souscription renouvelée cède la place de ses enfants à son renouvellement :
+    # chaque enfant n'est compté qu'une fois jusqu'à l'expiration de l'ancienne période
+    return Coalesce(
+        Subquery(
+            SubscriptionDetail.objects.filter(
+                is_valide=True, subscription__renewal__isnull=True, **{field: OuterRef('pk')},
+            )
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        Value(0),
+    )
+
+
+def recount(classroom_ids, group_ids):
+    """
+    Recalcule les effectifs des classes et groupes donnés, une requête UPDATE par table
+    (après une écriture groupée d'inscriptions, ex. expiration des souscriptions).
+    """
+    if classroom_ids:
+        Classroom.objects.filter(pk__in=classroom_ids).update(nbr_children=actual_counts(Classroom, 'classroom'))
+    if group_ids:
+        Group.objects.filter(pk__in=group_ids).update(nbr_children=actual_counts(Group, 'group'))
+    snapshot(classroom_ids)
+
+
+def snapshot(classroom_ids):
+    """
+    Reporte l'effectif courant des classes dans l'agrégat journalier (une ligne par classe
+    et par jour, mise à jour en place) : deux requêtes quel que soit le nombre de classes.
+    """
+    if not classroom_ids:
+        return
+    today = timezone.localdate()
+    ClassroomDailyEnrolment.objects.bulk_create(
+        [
+            ClassroomDailyEnrolment(classroom_id=pk, nursery_id=nursery_id, date=today, children=children)
+            for pk, nursery_id, children in Classroom.objects.filter(pk__in=classroom_ids)
+            .values_list('pk', 'nursery_id', 'nbr_children')
+        ],
+        update_conflicts=True, unique_fields=['classroom', 'date'], update_fields=['children'],
+    )
+
+
+def reconcile(dry_run=False):
+    """
+    Recalcule les effectifs à partir des inscriptions valides, en une requête par table
+    pour les lignes divergentes : {'classrooms': n, 'groups': n} lignes corrigées.
+    """
+    fixed = {}
+    for key, model, field in (('classrooms', Classroom, 'classroom'), ('groups', Group, 'group')):
+        drifted = model.objects.annotate(actual=actual_counts(model, field)).exclude(nbr_children=F('actual'))
+        fixed[key] = drifted.count()
+        if fixed[key] and not dry_run:
+            model.objects.filter(pk__in=drifted.values('pk')).update(nbr_children=actual_counts(model, field))
+    return fixed
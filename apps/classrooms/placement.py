@@ -0,0 +1,128 @@
+import heapq
+from dataclasses import dataclass, field
+
+import numpy as np
+from django.db.models import F
+
+from apps.subscriptions.models import SubscriptionDetail
+from .models import Classroom
+
+REASON_NO_BIRTHDAY = "Date de naissance inconnue."
+REASON_TOO_OLD = "Âge supérieur à l'âge maximum accepté par la crèche."
+REASON_NO_RANGE = "Aucune classe ne couvre cet âge."
+REASON_FULL = "Toutes les classes de cet âge sont complètes."
+REASON_NOT_ENROLLED = "Enfant non inscrit dans cette crèche."
+
+
+@dataclass
+class Placement:
+    assignments: list = field(default_factory=list)
+    unassigned: list = field(default_factory=list)
+    remaining: dict = field(default_factory=dict)
+
+
+def ages_in_months(birthdays, on):
+    """
+    Âges en mois révolus au `on`, calculés d'un bloc : `birthdays` est un tableau datetime64[D].
+    """
+    months = birthdays.astype('datetime64[M]')
+    birth_days = (birthdays - months).astype(np.int64) + 1
+    on_months = (on.year - 1970) * 12 + on.month - 1
+    return on_months - months.astype(np.int64) - (on.day < birth_days)
+
+
+def propose(children, classrooms, on, max_age=None):
+    """
+    Propose une classe à chaque enfant.
+    - children : [(id, date de naissance)], classrooms : [(id, âge début, âge fin, places restantes)]
+    - balayage par âge croissant : les classes entrent dans un tas dès que l'âge atteint leur début
+      et en sortent une fois leur fin dépassée ; chaque enfant va dans la classe ouverte qui se
+      termine le plus tôt (choix glouton qui maximise le nombre d'enfants placés)
+    Coût O((n + m) log m) pour n enfants et m classes.
+    """
+    result = Placement(remaining={pk: max(remaining, 0) for pk, _, _, remaining in classrooms})
+    known = []
+    for child_id, birthday in children:
+        if birthday is None:
+            result.unassigned.append({'child': child_id, 'age_months': None, 'reason': REASON_NO_BIRTHDAY})
+        else:
+            known.append((child_id, birthday))
+
+    # Âges, filtre d'âge maximum et tri vectorisés (numpy)
+    ids = np.array([child_id for child_id, _ in known], dtype=np.int64)
+    ages = ages_in_months(np.array([birthday for _, birthday in known], dtype='datetime64[D]'), on)
+    if max_age is not None:
+        too_old = ages > max_age
+        result.unassigned.extend(
+            {'child': child_id, 'age_months': age, 'reason': REASON_TOO_OLD}
+            for child_id, age in zip(ids[too_old].tolist(), ages[too_old].tolist())
+        )
+        ids, ages = ids[~too_old], ages[~too_old]
+    order = np.lexsort((ids, ages))
+    aged = zip(ages[order].tolist(), ids[order].tolist())
+
+    intervals = sorted((start, end, pk) for pk, start, end, _ in classrooms if start <= end)
+    available, covering = [], []  # tas (fin, id) : classes avec places / toutes les classes couvrantes
+    cursor = 0
+    for age, child_id in aged:
+        while cursor < len(intervals) and intervals[cursor][0] <= age:
+            start, end, pk = intervals[cursor]
+            heapq.heappush(covering, (end, pk))
+            if result.remaining[pk] > 0:
+                heapq.heappush(available, (end, pk))
+            cursor += 1
+        while available and (available[0][0] < age or result.remaining[available[0][1]] == 0):
+            heapq.heappop(available)
+        while covering and covering[0][0] < age:
+            heapq.heappop(covering)
+
+        if not available:
+            reason = REASON_FULL if covering else REASON_NO_RANGE
+            result.unassigned.append({'child': child_id, 'age_months': age, 'reason': reason})
+            continue
+        pk = available[0][1]
+        result.remaining[pk] -= 1
+        result.assignments.append({'child': child_id, 'classroom': pk, 'age_months': age})
+    return result
+
+
+def enrolled_children(nursery):
+    """
+    Enfants inscrits (inscription valide, souscription active) dans la crèche :
+    [(id, date de naissance, a une classe ?)], lus depuis les inscriptions.
+    """
+    return SubscriptionDetail.objects.filter(
+        subscription__plan__nursery=nursery, subscription__is_active=True, is_valide=True,
+    ).values_list('child_id', 'child__birthday', 'classroom_id')
+
+
+def propose_for_nursery(nursery, on, child_ids=None):
+    """
+    Propositions pour les enfants inscrits sans classe, ou pour le lot `child_ids`
+    (limité aux enfants inscrits dans la crèche : les autres sont signalés comme inconnus).
+    Le lot est filtré en Python : un IN de plusieurs milliers d'identifiants à travers
+    les jointures coûte bien plus cher que la lecture des inscriptions de la crèche.
+    """
+    birthdays, placed = {}, set()
+    for child_id, birthday, classroom_id in enrolled_children(nursery):
+        birthdays[child_id] = birthday
+        if classroom_id is not None:
+            placed.add(child_id)
+    if child_ids is None:
+        children = [(pk, birthday) for pk, birthday in birthdays.items() if pk not in placed]
+    else:
+        child_ids = list(dict.fromkeys(child_ids))
+        children = [(pk, birthdays[pk]) for pk in child_ids if pk in birthdays]
+
+    classrooms = list(
+        Classroom.objects.filter(nursery=nursery, existe=True)
+        .annotate(remaining=F('capacity') - F('nbr_children'))
+        .values_list('id', 'age_range_start', 'age_range_end', 'remaining')
+    )
+    result = propose(children, classrooms, on, max_age=nursery.max_age)
+    if child_ids is not None:
+        result.unassigned.extend(
+            {'child': child_id, 'age_months': None, 'reason': REASON_NOT_ENROLLED}
+            for child_id in child_ids if child_id not in birthdays
+        )
+    return result
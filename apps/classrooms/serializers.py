@@ -9,6 +9,8 @@ class NestedNurseryAssistantSerializer(serializers.ModelSerializer):
     class Meta:
         model = NurseryAssistant
         fields = ['id', 'full_name', 'is_manager']
+        # Relations lues par get_full_name (préchargées par EagerLoadingMixin)
+        select_related = ['profil__user']
 
     def get_full_name(self, obj):
         return f"{obj.profil.user.first_name} {obj.profil.user.last_name}"
@@ -20,7 +22,6 @@ class ClassroomSerializer(serializers.ModelSerializer):
         help_text="ID de la crèche propriétaire de cette salle",
     )
     assistants = NestedNurseryAssistantSerializer(
-        source='nurseryassistant_set',
         many=True,
         read_only=True
     )
@@ -32,22 +33,21 @@ class ClassroomSerializer(serializers.ModelSerializer):
             'age_range_start', 'age_range_end',
             'nbr_children', 'existe', 'assistants'
         ]
-        read_only_fields = ['id', 'assistants']
+        read_only_fields = ['id', 'nbr_children', 'assistants']
         extra_kwargs = {
             'name': {'required': True},
             'capacity': {'required': True},
             'age_range_start': {'required': True},
             'age_range_end': {'required': True},
-            'nbr_children': {'required': False},
             'existe': {'required': False},
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # En update : la crèche est figée
-        if self.instance:
-            self.fields['nbr_children'].required = True
-        
+    def validate_capacity(self, value):
+        if self.instance and value < self.instance.nbr_children:
+            raise serializers.ValidationError(
+                f"La capacité ne peut pas être inférieure à l'effectif actuel ({self.instance.nbr_children})."
+            )
+        return value
 
     def validate(self, attrs):
         for attr, value in attrs.items():
@@ -64,15 +64,14 @@ class GroupSerializer(serializers.ModelSerializer):
         help_text="ID de la classe associée à ce groupe",
     )
     assistants = NestedNurseryAssistantSerializer(
-        source='nurseryassistant_set',
         many=True,
         read_only=True
     )
 
     class Meta:
         model = Group
-        fields = ['id', 'name', 'classroom', 'active', 'assistants']
-        read_only_fields = ['id', 'assistants']
+        fields = ['id', 'name', 'classroom', 'active', 'nbr_children', 'assistants']
+        read_only_fields = ['id', 'nbr_children', 'assistants']
         extra_kwargs = {
             'name': {'required': True},
             'active': {'required': False},
@@ -91,3 +90,13 @@ class GroupSerializer(serializers.ModelSerializer):
             if value in [None, '']:
                 raise serializers.ValidationError({attr: f"Le champ '{attr}' est requis."})
         return attrs
+
+
+class PlacementRequestSerializer(serializers.Serializer):
+    children = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=10000,
+        help_text="IDs des enfants à placer (par défaut : enfants inscrits sans classe)",
+    )
+    date = serializers.DateField(required=False, help_text="Date de référence pour le calcul des âges")
@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.classrooms import occupancy
+from apps.classrooms.models import Classroom, ClassroomDailyEnrolment, Group
+from apps.nurseries.management.commands._seed import seed_budget_dataset, seed_nurseries
+from apps.subscriptions.models import SubscriptionDetail
+
+
+class OccupancyTests(TestCase):
+
+    def setUp(self):
+        nursery = seed_nurseries(1)[0]
+        self.classroom = Classroom.objects.create(
+            nursery=nursery, name="Petits", capacity=2, age_range_start=0, age_range_end=36,
+        )
+        self.other = Classroom.objects.create(
+            nursery=nursery, name="Grands", capacity=2, age_range_start=24, age_range_end=60,
+        )
+        self.group = Group.objects.create(classroom=self.classroom, name="Lapins")
+
+    def detail(self, classroom=None, group=None, is_valide=True):
+        # Inscription non enregistrée : seuls la classe, le groupe et la validité comptent
+        return SubscriptionDetail(
+            classroom=classroom or self.classroom, group=group, is_valide=is_valide,
+        )
+
+    def counts(self):
+        for instance in (self.classroom, self.other, self.group):
+            instance.refresh_from_db()
+        return self.classroom.nbr_children, self.other.nbr_children, self.group.nbr_children
+
+    def test_enroll_and_release(self):
+        occupancy.enroll([self.detail(group=self.group), self.detail(), self.detail(is_valide=False)])
+        self.assertEqual(self.counts(), (2, 0, 1))
+        snapshot = ClassroomDailyEnrolment.objects.get(classroom=self.classroom)
+        self.assertEqual(snapshot.children, 2)
+
+        occupancy.release([self.detail(group=self.group)])
+        self.assertEqual(self.counts(), (1, 0, 0))
+
+    def test_enroll_beyond_capacity_rejected(self):
+        occupancy.enroll([self.detail(), self.detail()])
+        with self.assertRaises(occupancy.CapacityExceeded):
+            occupancy.enroll([self.detail()])
+        self.assertEqual(self.counts(), (2, 0, 0))
+
+    def test_release_clamped_at_zero(self):
+        occupancy.enroll([self.detail(group=self.group)])
+        occupancy.release([self.detail(group=self.group), self.detail(group=self.group)])
+        self.assertEqual(self.counts(), (0, 0, 0))
+
+    def test_change_moves_child(self):
+        occupancy.enroll([self.detail(group=self.group)])
+        occupancy.change(self.detail(group=self.group), self.detail(classroom=self.other))
+        self.assertEqual(self.counts(), (0, 1, 0))
+        # Invalidation : la place est rendue
+        occupancy.change(self.detail(classroom=self.other), self.detail(classroom=self.other, is_valide=False))
+        self.assertEqual(self.counts(), (0, 0, 0))
+
+    def test_replace_counts_net_change_only(self):
+        occupancy.enroll([self.detail(), self.detail()])
+        # Classe pleine : un enfant qui y reste ne compte pas, un départ libère une place
+        occupancy.replace([self.detail(), self.detail()], [self.detail(), self.detail(classroom=self.other)])
+        self.assertEqual(self.counts(), (1, 1, 0))
+        with self.assertRaises(occupancy.CapacityExceeded):
+            occupancy.replace([self.detail(classroom=self.other)], [self.detail(), self.detail()])
+
+
+class ReconcileCommandTests(TestCase):
+
+    def setUp(self):
+        _, parents, _ = seed_budget_dataset(2)
+        self.classroom = Classroom.objects.get(pk=parents['classroom_pk'])
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('reconcile_occupancy', *args, stdout=out)
+        return out.getvalue()
+
+    def test_reconcile(self):
+        # Jeu créé par bulk_create, sans signaux : effectifs à zéro pour 4 inscriptions
+        self.assertIn("Classes : 1 divergent(s) ; groupes : 1 divergent(s)", self.run_command('--dry-run'))
+        self.classroom.refresh_from_db()
+        self.assertEqual(self.classroom.nbr_children, 0)
+
+        self.assertIn("Classes : 1 corrigé(s) ; groupes : 1 corrigé(s)", self.run_command())
+        self.classroom.refresh_from_db()
+        self.assertEqual(self.classroom.nbr_children, 4)
+        self.assertEqual(Group.objects.get(classroom=self.classroom, name="Groupe 0").nbr_children, 4)
+
+        self.assertIn("Classes : 0 corrigé(s) ; groupes : 0 corrigé(s)", self.run_command())
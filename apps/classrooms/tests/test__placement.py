@@ -0,0 +1,51 @@
+import datetime
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.classrooms.placement import (
+    REASON_FULL, REASON_NO_BIRTHDAY, REASON_NO_RANGE, REASON_TOO_OLD, ages_in_months, propose,
+)
+
+
+class AgesInMonthsTests(SimpleTestCase):
+
+    def test_completed_months(self):
+        on = datetime.date(2026, 3, 15)
+        birthdays = np.array([
+            datetime.date(2026, 3, 15), datetime.date(2025, 3, 15), datetime.date(2025, 3, 16),
+            datetime.date(2024, 1, 31), datetime.date(1969, 12, 31),
+        ], dtype='datetime64[D]')
+        self.assertEqual(ages_in_months(birthdays, on).tolist(), [0, 12, 11, 25, 674])
+
+    def test_empty(self):
+        self.assertEqual(ages_in_months(np.array([], dtype='datetime64[D]'), datetime.date(2026, 1, 1)).tolist(), [])
+
+
+class ProposeTests(SimpleTestCase):
+    on = datetime.date(2026, 10, 1)
+
+    def test_assignments_and_reasons(self):
+        children = [
+            (1, datetime.date(2026, 4, 1)),   # 6 mois
+            (2, datetime.date(2025, 10, 1)),  # 12 mois
+            (3, datetime.date(2024, 10, 1)),  # 24 mois
+            (4, None),
+            (5, datetime.date(2020, 10, 1)),  # 72 mois
+            (6, datetime.date(2025, 4, 1)),   # 18 mois
+        ]
+        classrooms = [(10, 0, 12, 1), (20, 12, 24, 1), (30, 30, 36, 5)]
+        result = propose(children, classrooms, self.on, max_age=48)
+
+        self.assertEqual(
+            [(item['child'], item['classroom']) for item in result.assignments], [(1, 10), (2, 20)],
+        )
+        reasons = {item['child']: item['reason'] for item in result.unassigned}
+        self.assertEqual(reasons, {
+            3: REASON_FULL, 4: REASON_NO_BIRTHDAY, 5: REASON_TOO_OLD, 6: REASON_FULL,
+        })
+        self.assertEqual(result.remaining, {10: 0, 20: 0, 30: 5})
+
+    def test_no_covering_range(self):
+        result = propose([(1, datetime.date(2024, 4, 1))], [(10, 0, 12, 3)], self.on)
+        self.assertEqual(result.unassigned, [{'child': 1, 'age_months': 30, 'reason': REASON_NO_RANGE}])
@@ -1,13 +1,22 @@
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError, NotFound
+from rest_framework.exceptions import ValidationError, NotFound, PermissionDenied
 from .models import Classroom, Group
 from apps.nurseries.models import Nursery
-from .serializers import ClassroomSerializer, GroupSerializer
+from .serializers import ClassroomSerializer, GroupSerializer, PlacementRequestSerializer
+from .placement import propose_for_nursery
+from apps.activities import timetable
+from apps.activities.calendar import can_view_timetable
+from apps.core.mixins import ConditionalGetMixin, EagerLoadingMixin
 
 
-class ClassroomViewSet(viewsets.ModelViewSet):
+class ClassroomViewSet(EagerLoadingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ClassroomSerializer
+    query_budget = {'list': 5, 'retrieve': 4, 'placement': 4, 'timetable': 6}
 
     def get_queryset(self):
         nursery_id = self.kwargs.get('nursery_pk')
@@ -23,9 +32,51 @@ class ClassroomViewSet(viewsets.ModelViewSet):
             raise NotFound("Crèche non trouvée.")
         serializer.save(nursery_id=nursery_id)
 
+    @action(detail=False, methods=['GET', 'POST'], permission_classes=[IsAuthenticated])
+    def placement(self, request, nursery_pk=None):
+        """
+        Propose une classe (tranche d'âge et places restantes) aux enfants inscrits sans classe
+        (GET, ?date=) ou à un lot d'enfants (POST {"children": [...], "date": ...}).
+        Aucune affectation n'est enregistrée.
+        """
+        nursery = get_object_or_404(Nursery.objects.select_related('manager__user'), pk=nursery_pk)
+        if nursery.manager.user != request.user and not request.user.is_staff:
+            raise PermissionDenied("Permission refusée.")
 
-class GroupViewSet(viewsets.ModelViewSet):
+        params = PlacementRequestSerializer(data=request.data if request.method == 'POST' else request.query_params)
+        params.is_valid(raise_exception=True)
+        on = params.validated_data.get('date') or timezone.localdate()
+        result = propose_for_nursery(nursery, on, params.validated_data.get('children'))
+        return Response({
+            'date': on,
+            'assignments': result.assignments,
+            'unassigned': result.unassigned,
+            'remaining': [{'classroom': pk, 'remaining': count} for pk, count in result.remaining.items()],
+        })
+
+    @action(detail=True, methods=['GET'], permission_classes=[IsAuthenticated])
+    def timetable(self, request, pk=None, nursery_pk=None):
+        """
+        Emploi du temps de la classe pour la semaine ISO ?week=2026-W42 (semaine courante
+        par défaut), lu dans sa version matérialisée.
+        """
+        classroom = get_object_or_404(Classroom, pk=pk, nursery_id=nursery_pk)
+        if not can_view_timetable(request.user, classroom.nursery_id, classroom.pk):
+            raise PermissionDenied("Permission refusée.")
+        week = request.query_params.get('week')
+        if week is None:
+            week_start = timetable.monday(timezone.localdate())
+        else:
+            try:
+                week_start = timetable.parse_week(week)
+            except ValueError:
+                raise ValidationError({'week': "Semaine invalide, format attendu : AAAA-Www (ex. 2026-W42)."})
+        return Response(timetable.get_document(classroom.pk, week_start))
+
+
+class GroupViewSet(EagerLoadingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = GroupSerializer
+    query_budget = {'list': 5, 'retrieve': 4}
 
     def get_queryset(self):
         classroom_id = self.kwargs.get('classroom_pk')
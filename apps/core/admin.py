@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import CompletedTask
 
-# Register your models here.
+
+@admin.register(CompletedTask)
+class CompletedTaskAdmin(admin.ModelAdmin):
+    list_display = ('key', 'task', 'created_at')
+    search_fields = ('key', 'task')
+    readonly_fields = ('key', 'task', 'created_at')
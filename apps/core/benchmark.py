@@ -0,0 +1,35 @@
+import statistics
+import time
+
+
+def measure(func, repeat=50, warmup=3):
+    """
+    Exécute `func` `repeat` fois (après quelques tours de chauffe) et retourne les durées en millisecondes.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        'p50': statistics.median(samples),
+        'p95': percentile(samples, 95),
+        'max': max(samples),
+    }
+
+
+def format_summary(label, samples):
+    stats = summarize(samples)
+    return f"{label:<32} p50={stats['p50']:8.2f} ms  p95={stats['p95']:8.2f} ms  max={stats['max']:8.2f} ms"
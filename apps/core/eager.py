@@ -0,0 +1,156 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+class EagerLoadingPlan:
+    """
+    Plan de chargement d'un queryset : chemins `select_related` (relations simples,
+    jointes) et objets `Prefetch` (relations multiples, une requête par niveau).
+    """
+
+    def __init__(self):
+        self.select = []
+        self.prefetch = []
+
+    def add_select(self, path):
+        if path not in self.select:
+            self.select.append(path)
+
+    def add_prefetch(self, prefetch):
+        if all(existing.prefetch_to != prefetch.prefetch_to for existing in self.prefetch):
+            self.prefetch.append(prefetch)
+
+    def merge(self, other, prefix=''):
+        """
+        Intègre le plan `other`, exprimé depuis le modèle atteint par `prefix`.
+        """
+        for path in other.select:
+            self.add_select(f"{prefix}__{path}" if prefix else path)
+        for prefetch in other.prefetch:
+            lookup = f"{prefix}__{prefetch.prefetch_through}" if prefix else prefetch.prefetch_through
+            self.add_prefetch(Prefetch(lookup, queryset=prefetch.queryset))
+
+    def apply(self, queryset):
+        """
+        Applique le plan, sans redéclarer un prefetch déjà présent sur le queryset
+        (Django refuse deux querysets différents pour le même chemin).
+        """
+        if self.select:
+            queryset = queryset.select_related(*self.select)
+        seen = [
+            lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+            for lookup in queryset._prefetch_related_lookups
+        ]
+        prefetch = [
+            lookup for lookup in self.prefetch
+            if not any(path == lookup.prefetch_to or path.startswith(f"{lookup.prefetch_to}__") for path in seen)
+        ]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+def resolve_relation(model, attr):
+    """
+    Champ de relation `attr` de `model` (accepte aussi le nom d'accès inverse,
+    ex. 'nurseryassistant_set') ou None si `attr` n'est pas une relation.
+    """
+    try:
+        field = model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        accessors = {rel.get_accessor_name(): rel for rel in model._meta.related_objects}
+        field = accessors.get(attr)
+    if field is None or not field.is_relation:
+        return None
+    return field
+
+
+def relation_path(model, source_attrs):
+    """
+    Parcourt `source_attrs` tant qu'il s'agit de relations :
+    (chemin ORM, modèle atteint, relation multiple ?, source entièrement résolue ?).
+    """
+    path, many = [], False
+    for attr in source_attrs:
+        field = resolve_relation(model, attr)
+        if field is None:
+            return '__'.join(path), model, many, False
+        path.append(field.name if not field.auto_created or field.concrete else field.get_accessor_name())
+        many = many or field.many_to_many or field.one_to_many
+        model = field.related_model
+    return '__'.join(path), model, many, True
+
+
+def add_path(plan, model, path, many, nested=None):
+    """
+    Ajoute au plan la relation `path` (et le plan imbriqué `nested` du modèle qu'elle atteint).
+    Une relation multiple devient un Prefetch dont le queryset porte le plan imbriqué.
+    """
+    if not path:
+        if nested is not None:
+            plan.merge(nested)
+        return
+    if not many:
+        plan.add_select(path)
+        if nested is not None:
+            plan.merge(nested, prefix=path)
+        return
+    # Découpe au premier saut multiple : ce qui précède est joint, ce qui suit est préchargé
+    attrs = path.split('__')
+    current, head = model, []
+    for index, attr in enumerate(attrs):
+        field = resolve_relation(current, attr)
+        head.append(attr)
+        if field.many_to_many or field.one_to_many:
+            related = field.related_model
+            tail = '__'.join(attrs[index + 1:])
+            inner = EagerLoadingPlan()
+            tail_many = bool(tail) and relation_path(related, attrs[index + 1:])[2]
+            add_path(inner, related, tail, tail_many, nested)
+            queryset = inner.apply(related._default_manager.all())
+            plan.add_prefetch(Prefetch('__'.join(head), queryset=queryset))
+            return
+        current = field.related_model
+
+
+def build_plan(serializer, model):
+    """
+    Déduit le plan de chargement d'un serializer pour `model` en parcourant ses champs
+    lisibles : serializers imbriqués (y compris many=True), champs de relation,
+    sources pointées ('profil.user.first_name'). Les SerializerMethodField étant opaques,
+    un serializer peut compléter le plan via `Meta.select_related` / `Meta.prefetch_related`.
+    """
+    plan = EagerLoadingPlan()
+    meta = getattr(serializer, 'Meta', None)
+    for path in getattr(meta, 'select_related', ()):
+        plan.add_select(path)
+    for path in getattr(meta, 'prefetch_related', ()):
+        add_path(plan, model, path, relation_path(model, path.split('__'))[2])
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                plan.merge(build_plan(field, model))
+            continue
+
+        path, target, many, complete = relation_path(model, field.source_attrs)
+        if isinstance(field, serializers.ListSerializer):
+            nested = build_plan(field.child, target) if complete else None
+            add_path(plan, model, path, many, nested)
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = build_plan(field, target) if complete else None
+            add_path(plan, model, path, many, nested)
+        elif isinstance(field, ManyRelatedField):
+            add_path(plan, model, path, True)
+        elif isinstance(field, RelatedField):
+            # Clé primaire seule : lue sur la colonne *_id, sans jointure
+            if not (field.use_pk_only_optimization() and len(field.source_attrs) == 1):
+                add_path(plan, model, path, many)
+        elif path:
+            # Champ simple atteint à travers des relations ('nursery.name')
+            add_path(plan, model, path, many)
+    return plan
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+
+from apps.children.models import Child
+from apps.core.benchmark import format_summary, measure
+from apps.core.pagination import KeysetPagination
+from apps.users.models import UserType
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la pagination par numéro de page (COUNT + OFFSET) à la pagination keyset "
+        "sur la liste des enfants, à différentes profondeurs (les données sont annulées à la fin)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=30)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        rows = options['rows']
+
+        with transaction.atomic():
+            self.stdout.write(f"Génération de {rows} enfants…")
+            user = User.objects.create(username="bench_parent", password="!")
+            parent = UserType.objects.create(user=user, type='parent')
+            Child.objects.bulk_create(
+                [
+                    Child(parent=parent, last_name=f"Nom{i % 5000:04d}", first_name=f"Prénom{i}")
+                    for i in range(rows)
+                ],
+                batch_size=5000,
+            )
+            queryset = Child.objects.all()
+            page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+
+            def by_page_number(params):
+                request = Request(factory.get('/api/client/child/', params))
+                list(PageNumberPagination().paginate_queryset(queryset, request))
+
+            def by_keyset(params):
+                request = Request(factory.get('/api/client/child/', params))
+                list(KeysetPagination().paginate_queryset(queryset, request))
+
+            for depth in (0.01, 0.5, 0.99):
+                page = max(1, int(rows * depth) // page_size)
+
+                # Curseur pointant juste avant la même page
+                cursor = None
+                if page > 1:
+                    last = queryset.order_by('last_name', 'first_name', 'pk')[(page - 1) * page_size - 1]
+                    cursor = KeysetPagination.make_cursor([last.last_name, last.first_name, last.pk])
+
+                label = f"page {page}"
+                self.stdout.write(format_summary(
+                    f"{label} numéro de page",
+                    measure(lambda: by_page_number({'page': page}), repeat=options['repeat']),
+                ))
+                keyset_params = {'cursor': cursor} if cursor else {}
+                self.stdout.write(format_summary(
+                    f"{label} keyset",
+                    measure(lambda: by_keyset(keyset_params), repeat=options['repeat']),
+                ))
+                self.stdout.write(format_summary(
+                    f"{label} keyset sans count",
+                    measure(lambda: by_keyset({**keyset_params, 'skip_count': 1}), repeat=options['repeat']),
+                ))
+
+            transaction.set_rollback(True)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from stage.celery import app
+
+
+class Command(BaseCommand):
+    help = "Lance un worker Celery pour les tâches d'arrière-plan (équivaut à « celery -A stage worker »)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2)
+        parser.add_argument('--loglevel', default='info')
+        parser.add_argument('--queues', default='celery', help="Files à consommer, séparées par des virgules")
+        parser.add_argument('--beat', action='store_true', help="Lance aussi les tâches périodiques (CELERY_BEAT_SCHEDULE)")
+
+    def handle(self, *args, **options):
+        argv = [
+            'worker',
+            f"--concurrency={options['concurrency']}",
+            f"--loglevel={options['loglevel']}",
+            f"--queues={options['queues']}",
+        ]
+        if options['beat']:
+            # Un seul worker doit porter le planificateur
+            argv.append('--beat')
+        app.worker_main(argv)
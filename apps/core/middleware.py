@@ -0,0 +1,42 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .queries import QueryBudgetExceeded, QueryRecorder, check_budget, get_budget, resolve_view
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """
+    Développement / tests : compte les requêtes SQL de chaque requête HTTP, les compare
+    au budget déclaré par la vue (`query_budget`) et signale les N+1.
+    - en-têtes X-Query-Count et X-Query-Time (ms)
+    - anomalies journalisées, ou levées (QueryBudgetExceeded) si QUERY_BUDGET_STRICT est vrai
+    Inactif si QUERY_BUDGET_ENABLED est faux.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-Query-Time'] = f"{recorder.duration * 1000:.1f}"
+
+        view_class, action = resolve_view(request)
+        if view_class is None:
+            return response
+        problems = check_budget(recorder, get_budget(view_class, action))
+        if problems:
+            label = f"{request.method} {request.path} ({view_class.__name__}.{action or request.method.lower()})"
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(f"{label} : " + " ; ".join(problems))
+            for problem in problems:
+                logger.warning("%s : %s", label, problem)
+        return response
@@ -0,0 +1,92 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .eager import build_plan
+
+
+class ConditionalGetMixin:
+    """
+    Ajoute ETag / Last-Modified aux actions `list` et `retrieve` d'un viewset et répond
+    304 Not Modified sans rien sérialiser quand le client a déjà la bonne version.
+    - liste : validateurs calculés à partir de max(updated_at) et du nombre de lignes filtrées
+    - détail : à partir du `updated_at` de l'objet, résolu d'abord par get_object (404 et
+      permissions d'objet appliqués aussi aux requêtes conditionnelles), puis réutilisé au rendu
+    `conditional_related` liste des chemins `updated_at` d'objets imbriqués dans la réponse
+    (ex. 'details__updated_at') à prendre aussi en compte.
+    """
+    conditional_related = ()
+
+    def get_validators(self, queryset):
+        if not any(field.name == 'updated_at' for field in queryset.model._meta.concrete_fields):
+            return None, None
+        aggregates = {
+            'count': Count('pk', distinct=bool(self.conditional_related)),
+            'updated_at': Max('updated_at'),
+        }
+        for index, path in enumerate(self.conditional_related):
+            aggregates[f'related_{index}'] = Max(path)
+        values = queryset.aggregate(**aggregates)
+        timestamps = [value for key, value in values.items() if key != 'count' and value is not None]
+        if not values['count'] or not timestamps:
+            return None, None
+        user = getattr(self.request.user, 'pk', None)
+        fingerprint = ':'.join(
+            [str(user), str(values['count'])] + [str(value.timestamp()) for value in timestamps]
+        )
+        etag = f'W/"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+        return etag, int(max(timestamps).timestamp())
+
+    def conditional_response(self, queryset, render):
+        etag, last_modified = self.get_validators(queryset)
+        if etag is None:
+            return render()
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.filter_queryset(self.get_queryset()),
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def get_object(self):
+        instance = getattr(self, '_conditional_object', None)
+        return instance if instance is not None else super().get_object()
+
+    def retrieve(self, request, *args, **kwargs):
+        self._conditional_object = self.get_object()
+        queryset = self.filter_queryset(self.get_queryset()).filter(pk=self._conditional_object.pk)
+        return self.conditional_response(
+            queryset,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+
+class EagerLoadingMixin:
+    """
+    Précharge les relations que le serializer de l'action va parcourir (select_related
+    pour les relations simples, Prefetch pour les relations multiples), déduites de ses
+    champs par `apps.core.eager.build_plan` : le nombre de requêtes d'une liste ne dépend
+    plus de la taille de la page.
+    Branché sur `filter_queryset`, par lequel passent list, retrieve et get_object,
+    pour rester actif quand le viewset redéfinit get_queryset.
+    """
+
+    def get_eager_loading_plan(self, queryset):
+        serializer_class = self.get_serializer_class()
+        cached = getattr(self, '_eager_loading_plan', None)
+        if cached is None or cached[0] is not serializer_class:
+            serializer = serializer_class(context=self.get_serializer_context())
+            cached = self._eager_loading_plan = (serializer_class, build_plan(serializer, queryset.model))
+        return cached[1]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return self.get_eager_loading_plan(queryset).apply(queryset)
@@ -1,3 +1,14 @@
 from django.db import models
 
-# Create your models here.
+
+class CompletedTask(models.Model):
+    """
+    Clé d'idempotence d'une tâche d'arrière-plan ayant abouti : une tâche reçue
+    à nouveau avec la même clé (renvoi, double livraison) n'est pas rejouée.
+    """
+    key = models.CharField(max_length=255, unique=True, help_text="Clé d'idempotence")
+    task = models.CharField(max_length=255, help_text="Nom de la tâche exécutée")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.task} [{self.key}]"
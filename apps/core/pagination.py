@@ -0,0 +1,164 @@
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder tronque les heures à la milliseconde : un curseur doit garder
+    les microsecondes, sinon la page suivante saute ou répète des lignes.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par clé (keyset) : chaque page repart de la dernière ligne vue
+    (WHERE (a, b, pk) > (x, y, z)) au lieu d'un OFFSET, donc coût constant quelle que soit la profondeur.
+    - ordre : celui du queryset, sinon `Meta.ordering` du modèle, complété par `pk` pour être total
+    - `?cursor=` : curseur opaque fourni dans `next` / `previous`
+    - `?skip_count=1` : ne calcule pas le COUNT(*) (le champ `count` vaut alors null)
+    - `?page=` (sans curseur) : pagination par numéro de page, comme avant le passage au keyset,
+      pour les clients existants ; leurs liens `next`/`previous` restent en ?page=
+    Les champs de tri doivent être non nuls.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_query_param = 'page'
+    skip_count_query_param = 'skip_count'
+    invalid_cursor_message = "Curseur invalide."
+
+    @property
+    def default_page_size(self):
+        return api_settings.PAGE_SIZE or 20
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not {'pk', '-pk', 'id', '-id'} & set(ordering):
+            ordering.append('pk')
+        return ordering
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values, reverse = payload['v'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    @staticmethod
+    def make_cursor(values, reverse=False):
+        payload = json.dumps({'v': values, 'r': reverse}, cls=CursorEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def encode_cursor(self, instance, reverse):
+        cursor = self.make_cursor([getattr(instance, alias) for alias, _ in self.keys], reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def after(self, values, reverse):
+        """
+        Condition « strictement après `values` » dans l'ordre de parcours :
+        a >= x AND (a > x OR (a = x AND (b > y OR ...))), la borne de tête permettant
+        à la base de démarrer un parcours d'index.
+        """
+        condition = None
+        for index in reversed(range(len(self.keys))):
+            alias, descending = self.keys[index]
+            lookup = 'lt' if descending != reverse else 'gt'
+            step = Q(**{f'{alias}__{lookup}': values[index]})
+            if condition is not None:
+                step |= Q(**{alias: values[index]}) & condition
+            condition = step
+        alias, descending = self.keys[0]
+        return Q(**{f"{alias}__{'lte' if descending != reverse else 'gte'}": values[0]}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.legacy = None
+        if self.page_query_param in request.query_params and self.cursor_query_param not in request.query_params:
+            self.legacy = PageNumberPagination()
+            self.legacy.page_size = self.get_page_size(request)
+            self.legacy.page_size_query_param = self.page_size_query_param
+            self.legacy.max_page_size = self.max_page_size
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        ordering = self.get_ordering(queryset)
+        self.keys = [(f'_keyset_{i}', field.startswith('-')) for i, field in enumerate(ordering)]
+        annotations = {alias: F(field.lstrip('-')) for (alias, _), field in zip(self.keys, ordering)}
+
+        values, reverse = self.decode_cursor(request)
+        self.count = None
+        if request.query_params.get(self.skip_count_query_param) not in ('1', 'true'):
+            self.count = queryset.count()
+
+        queryset = queryset.annotate(**annotations)
+        if values is not None:
+            queryset = queryset.filter(self.after(values, reverse))
+        order_by = [
+            f'-{alias}' if descending != reverse else alias
+            for alias, descending in self.keys
+        ]
+        rows = list(queryset.order_by(*order_by)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_link = self.previous_link = None
+        if rows:
+            if has_more or reverse:
+                self.next_link = self.encode_cursor(rows[-1], reverse=False)
+            if values is not None and (has_more or not reverse):
+                self.previous_link = self.encode_cursor(rows[0], reverse=True)
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.next_link),
+            ('previous', self.previous_link),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
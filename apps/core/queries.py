@@ -0,0 +1,118 @@
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Levée (en mode strict) quand une requête HTTP dépasse son budget de requêtes SQL
+    ou répète la même requête ligne par ligne (N+1).
+    """
+
+
+def query_shape(sql):
+    """
+    Forme d'une requête, indépendante des valeurs : les listes IN (%s, %s, ...) et
+    les littéraux numériques ou chaînes sont remplacés par « ? ».
+    """
+    shape = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    shape = re.sub(r'\b\d+(?:\.\d+)?\b', '?', shape)
+    shape = re.sub(r'%s', '?', shape)
+    shape = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(?)', shape)
+    return re.sub(r'\s+', ' ', shape).strip()
+
+
+class QueryRecorder:
+    """
+    Enregistre les requêtes SQL exécutées sur toutes les connexions pendant un bloc :
+        with QueryRecorder() as recorder:
+            ...
+        recorder.count, recorder.repeated()
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({'sql': sql, 'time': time.perf_counter() - start})
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(query['time'] for query in self.queries)
+
+    def repeated(self, threshold=None):
+        """
+        Formes de SELECT exécutées au moins `threshold` fois : [(forme, nombre), ...],
+        la plus fréquente d'abord. C'est la signature d'un accès relation par relation (N+1) ;
+        les écritures répétées (lots de bulk_create) ne sont pas concernées.
+        """
+        if threshold is None:
+            threshold = n_plus_one_threshold()
+        shapes = Counter(
+            query_shape(query['sql']) for query in self.queries
+            if query['sql'].lstrip().upper().startswith('SELECT')
+        )
+        return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+
+def n_plus_one_threshold():
+    return getattr(settings, 'QUERY_BUDGET_N_PLUS_ONE_THRESHOLD', 3)
+
+
+def resolve_view(request):
+    """
+    (classe de vue, action) de la requête résolue ; action vaut None hors viewset.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None, None
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    actions = getattr(match.func, 'actions', None) or {}
+    return view_class, actions.get(request.method.lower())
+
+
+def get_budget(view_class, action):
+    """
+    Budget déclaré par la vue : `query_budget = 5` (toutes actions)
+    ou `query_budget = {'list': 6, 'retrieve': 5}` ; sinon QUERY_BUDGET_DEFAULT.
+    """
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        budget = budget.get(action)
+    if budget is None:
+        budget = getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+    return budget
+
+
+def check_budget(recorder, budget, threshold=None):
+    """
+    Liste des anomalies constatées (texte), vide si tout va bien.
+    """
+    problems = []
+    if budget is not None and recorder.count > budget:
+        problems.append(f"{recorder.count} requêtes SQL pour un budget de {budget}")
+    for shape, count in recorder.repeated(threshold):
+        problems.append(f"N+1 probable ({count}×) : {shape[:200]}")
+    return problems
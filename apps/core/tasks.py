@@ -0,0 +1,42 @@
+import logging
+
+from celery import Task
+from django.db import transaction
+
+from .models import CompletedTask
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotentTask(Task):
+    """
+    Tâche acceptant un argument nommé `idempotency_key` : si une exécution portant
+    la même clé a déjà abouti, l'appel est ignoré. La clé n'est enregistrée qu'après
+    succès, donc une tentative en échec reste rejouable (retries).
+    """
+    # `idempotency_key` ne figure pas dans la signature des fonctions décorées
+    typing = False
+
+    def __call__(self, *args, idempotency_key=None, **kwargs):
+        if idempotency_key is None:
+            return super().__call__(*args, **kwargs)
+        if CompletedTask.objects.filter(key=idempotency_key).exists():
+            logger.info("Tâche %s déjà exécutée (clé %s), ignorée", self.name, idempotency_key)
+            return None
+        result = super().__call__(*args, **kwargs)
+        CompletedTask.objects.get_or_create(key=idempotency_key, defaults={'task': self.name})
+        return result
+
+
+def enqueue(task, *args, idempotency_key=None, countdown=None, **kwargs):
+    """
+    Envoie `task` au worker une fois la transaction en cours validée : pas de tâche
+    pour des données annulées, ni de tâche lancée avant que ses lignes soient visibles.
+    En mode eager (CELERY_TASK_ALWAYS_EAGER), la tâche s'exécute sur place au commit.
+    """
+    if idempotency_key is not None:
+        kwargs['idempotency_key'] = idempotency_key[:255]
+    transaction.on_commit(
+        lambda: task.apply_async(args, kwargs, countdown=countdown),
+        robust=True,
+    )
@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+
+from .queries import QueryRecorder, check_budget, get_budget, n_plus_one_threshold
+
+
+class QueryBudgetTestMixin:
+    """
+    Assertions de budget SQL pour les TestCase Django (également exécutables sous pytest) :
+
+        class NurseryTests(QueryBudgetTestMixin, APITestCase):
+            def test_list(self):
+                self.assertEndpointBudget(self.client.get('/api/client/mynursery/'))
+
+            def test_import(self):
+                with self.assertQueryBudget(4):
+                    import_rows(...)
+
+    Sous `manage.py test`, QueryBudgetMiddleware est en mode strict : toute requête HTTP
+    du client de test qui dépasse le budget de sa vue fait déjà échouer le test.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget=None, threshold=None):
+        with QueryRecorder() as recorder:
+            yield recorder
+        problems = check_budget(recorder, budget, threshold)
+        if problems:
+            self.fail(self._format_problems(problems, recorder))
+
+    def assertNoNPlusOne(self, recorder, threshold=None):
+        repeated = recorder.repeated(threshold or n_plus_one_threshold())
+        if repeated:
+            self.fail(self._format_problems([f"N+1 ({count}×) : {shape}" for shape, count in repeated], recorder))
+
+    def assertEndpointBudget(self, response):
+        """
+        Vérifie une réponse du client de test contre le budget déclaré par sa vue
+        (en-tête X-Query-Count posé par QueryBudgetMiddleware).
+        """
+        match = response.resolver_match
+        view_class = getattr(match.func, 'cls', None)
+        action = (getattr(match.func, 'actions', None) or {}).get(response.request['REQUEST_METHOD'].lower())
+        budget = get_budget(view_class, action)
+        count = int(response['X-Query-Count'])
+        if budget is not None and count > budget:
+            self.fail(f"{view_class.__name__}.{action} : {count} requêtes SQL pour un budget de {budget}")
+
+    @staticmethod
+    def _format_problems(problems, recorder):
+        queries = "\n".join(f"  {index}. {query['sql']}" for index, query in enumerate(recorder.queries, 1))
+        return "\n".join(problems) + f"\nRequêtes exécutées ({recorder.count}) :\n{queries}"
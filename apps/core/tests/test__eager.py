@@ -0,0 +1,107 @@
+from django.contrib.auth.models import User
+from django.db.models import Prefetch
+from django.test import TestCase
+from rest_framework import serializers
+
+from apps.core.eager import EagerLoadingPlan, build_plan
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+from apps.nurseries.models import Nursery, NurseryAssistant
+from apps.subscriptions.models import Subscription, SubscriptionDetail
+from apps.users.models import UserType
+
+
+class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username']
+
+
+class ParentSerializer(serializers.ModelSerializer):
+    user = UserSerializer()
+
+    class Meta:
+        model = UserType
+        fields = ['id', 'user']
+
+
+class DetailSerializer(serializers.ModelSerializer):
+    child_name = serializers.CharField(source='child.first_name')
+    group = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta:
+        model = SubscriptionDetail
+        fields = ['id', 'child_name', 'group']
+
+
+class SubscriptionSerializer(serializers.ModelSerializer):
+    parent = ParentSerializer()
+    plan = serializers.PrimaryKeyRelatedField(read_only=True)
+    nursery_name = serializers.CharField(source='plan.nursery.name')
+    details = DetailSerializer(many=True)
+    renewed_from = serializers.PrimaryKeyRelatedField(write_only=True, queryset=Subscription.objects.all())
+    assistants = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Subscription
+        fields = ['id', 'parent', 'plan', 'nursery_name', 'details', 'renewed_from', 'assistants']
+        # Relation lue par la méthode, invisible pour build_plan
+        prefetch_related = ['plan__nursery__assistants']
+
+    def get_assistants(self, obj):
+        return [assistant.pk for assistant in obj.plan.nursery.assistants.all()]
+
+
+def prefetches(plan):
+    return {prefetch.prefetch_to: prefetch.queryset for prefetch in plan.prefetch}
+
+
+class BuildPlanTests(TestCase):
+
+    def test_select_and_prefetch_derived_from_fields(self):
+        plan = build_plan(SubscriptionSerializer(), Subscription)
+        # Serializer imbriqué (et son propre imbriqué) joint ; clés primaires seules lues sur *_id
+        self.assertEqual(plan.select, ['parent', 'parent__user', 'plan__nursery'])
+        lookups = prefetches(plan)
+        self.assertEqual(set(lookups), {'plan__nursery__assistants', 'details'})
+        # Le plan du serializer imbriqué many=True porte sur le queryset du Prefetch
+        self.assertEqual(lookups['details'].query.select_related, {'child': {}})
+        self.assertIs(lookups['plan__nursery__assistants'].model, NurseryAssistant)
+
+    def test_reverse_accessor_and_source_star(self):
+        class AssistantsSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = NurseryAssistant
+                fields = ['id']
+
+        class NurseryNameSerializer(serializers.Serializer):
+            name = serializers.CharField()
+            manager_name = serializers.CharField(source='manager.user.username')
+
+        class NurserySerializer(serializers.ModelSerializer):
+            staff = AssistantsSerializer(many=True, source='assistants')
+            summary = NurseryNameSerializer(source='*')
+
+            class Meta:
+                model = Nursery
+                fields = ['id', 'staff', 'summary']
+
+        plan = build_plan(NurserySerializer(), Nursery)
+        self.assertEqual(plan.select, ['manager__user'])
+        self.assertEqual(set(prefetches(plan)), {'assistants'})
+
+    def test_apply_keeps_existing_prefetch(self):
+        plan = EagerLoadingPlan()
+        plan.add_prefetch(Prefetch('details', queryset=SubscriptionDetail.objects.select_related('child')))
+        queryset = plan.apply(Subscription.objects.prefetch_related('details__group'))
+        self.assertEqual(queryset._prefetch_related_lookups, ('details__group',))
+
+    def test_query_count_independent_of_rows(self):
+        def count(rows, prefix):
+            seed_budget_dataset(rows, prefix=prefix)
+            queryset = build_plan(SubscriptionSerializer(), Subscription).apply(Subscription.objects.all())
+            with self.assertNumQueries(3):
+                data = SubscriptionSerializer(queryset, many=True).data
+            return len(data)
+
+        self.assertEqual(count(2, 'small'), 2)
+        self.assertEqual(count(5, 'large'), 7)
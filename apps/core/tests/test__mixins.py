@@ -0,0 +1,86 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+from apps.nurseries.models import Nursery, OpeningHour
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+@override_settings(CACHES=NO_CACHE)
+class ConditionalGetTests(APITestCase):
+    """
+    ETag / Last-Modified des actions list et retrieve (ConditionalGetMixin).
+    """
+
+    def setUp(self):
+        self.objects, self.parents, users = seed_budget_dataset(2)
+        self.nursery = self.objects['nursery']
+        self.subscription = self.objects['plans-subscription']
+        self.tokens = {role: str(RefreshToken.for_user(user).access_token) for role, user in users.items()}
+
+    def get(self, name, role='manager', **headers):
+        kwargs = {}
+        if name.endswith('-detail'):
+            kwargs['pk'] = self.nursery.pk
+        if name.startswith('plans-subscription'):
+            kwargs = {'nursery_pk': self.nursery.pk, 'plans_pk': self.parents['plans_pk'], 'pk': self.subscription.pk}
+        if role:
+            headers['HTTP_AUTHORIZATION'] = f"Bearer {self.tokens[role]}"
+        return self.client.get(reverse(name, kwargs=kwargs), secure=True, **headers)
+
+    def assertNotModified(self, name, role='manager'):
+        etag = self.get(name, role)['ETag']
+        response = self.get(name, role, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304, name)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        return etag
+
+    def test_list_and_detail_304(self):
+        for name in ('nursery-list', 'nursery-detail'):
+            self.assertNotModified(name)
+        self.assertNotModified('plans-subscription-detail', role='parent')
+        for name in ('mynursery-list', 'mynursery-detail'):
+            self.assertNotModified(name, role=None)
+
+    def test_if_modified_since(self):
+        response = self.get('nursery-detail')
+        response = self.get('nursery-detail', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_etag(self):
+        list_etag = self.assertNotModified('mynursery-list', role=None)
+        detail_etag = self.assertNotModified('mynursery-detail', role=None)
+
+        # Les horaires avancent `updated_at` de la crèche
+        OpeningHour.objects.filter(nursery=self.nursery, day=0).delete()
+        for name, etag in (('mynursery-list', list_etag), ('mynursery-detail', detail_etag)):
+            response = self.get(name, role=None, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, name)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_follows_row_count(self):
+        etag = self.get('mynursery-list', role=None)['ETag']
+        Nursery.objects.filter(pk=self.nursery.pk).update(verified=False)
+        response = self.get('mynursery-list', role=None, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_nested_updates_change_etag(self):
+        etag = self.assertNotModified('plans-subscription-detail', role='parent')
+        self.subscription.details.first().save()
+        response = self.get('plans-subscription-detail', role='parent', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        manager_etag = self.get('mynursery-list', role='manager')['ETag']
+        response = self.get('mynursery-list', role='parent', HTTP_IF_NONE_MATCH=manager_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_object_still_404(self):
+        etag = self.get('nursery-detail')['ETag']
+        self.nursery.pk += 1000
+        self.assertEqual(self.get('nursery-detail', HTTP_IF_NONE_MATCH=etag).status_code, 404)
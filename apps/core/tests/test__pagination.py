@@ -0,0 +1,107 @@
+import datetime
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.core.pagination import KeysetPagination
+from apps.nurseries.management.commands._seed import seed_nurseries
+from apps.nurseries.models import Nursery
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.nurseries = seed_nurseries(7)
+        # Mêmes millisecondes, microsecondes différentes : un curseur tronqué sauterait des lignes
+        base = timezone.now().replace(microsecond=0)
+        for index, nursery in enumerate(self.nurseries):
+            Nursery.objects.filter(pk=nursery.pk).update(created_at=base + datetime.timedelta(microseconds=index))
+
+    def paginate(self, queryset, url="/nurseries/?page_size=3"):
+        paginator = KeysetPagination()
+        rows = paginator.paginate_queryset(queryset, Request(APIRequestFactory().get(url)))
+        return [row.pk for row in rows], paginator
+
+    def walk(self, queryset):
+        pages, url = [], "/nurseries/?page_size=3"
+        while url:
+            pks, paginator = self.paginate(queryset, url)
+            pages.append(pks)
+            url = paginator.next_link
+        return pages, paginator
+
+    def assertRoundTrip(self, queryset):
+        expected = list(queryset.values_list('pk', flat=True))
+        pages, paginator = self.walk(queryset)
+        self.assertEqual([pk for page in pages for pk in page], expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+        # Retour en arrière depuis la dernière page
+        backwards, url = [], paginator.previous_link
+        while url:
+            pks, paginator = self.paginate(queryset, url)
+            backwards.append(pks)
+            url = paginator.previous_link
+        self.assertEqual(backwards, pages[-2::-1])
+
+    def test_round_trip_by_name(self):
+        self.assertRoundTrip(Nursery.objects.all())
+
+    def test_round_trip_by_datetime_keeps_microseconds(self):
+        self.assertRoundTrip(Nursery.objects.order_by('-created_at'))
+
+    def test_cursor_encodes_microseconds(self):
+        value = datetime.datetime(2026, 1, 1, 8, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+        cursor = KeysetPagination.make_cursor([value, 1])
+        _, paginator = self.paginate(Nursery.objects.none())
+        paginator.keys = [('a', False), ('b', False)]
+        request = Request(APIRequestFactory().get("/", {'cursor': cursor}))
+        self.assertEqual(paginator.decode_cursor(request), ([value.isoformat(), 1], False))
+
+    def test_count_and_skip_count(self):
+        _, paginator = self.paginate(Nursery.objects.all())
+        self.assertEqual(paginator.count, 7)
+        _, paginator = self.paginate(Nursery.objects.all(), "/nurseries/?skip_count=1")
+        self.assertIsNone(paginator.count)
+
+
+@override_settings(CACHES=NO_CACHE)
+class PaginationViewTests(APITestCase):
+
+    def setUp(self):
+        seed_nurseries(5)
+        staff = User.objects.create(username="staff", password="!", is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(staff).access_token}")
+
+    def get(self, **params):
+        return self.client.get(reverse('nursery-list'), params, secure=True)
+
+    def test_page_number_fallback(self):
+        response = self.get(page=2, page_size=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(parse_qs(urlparse(response.data['next']).query)['page'], ['3'])
+        self.assertNotIn('cursor', response.data['next'])
+
+        self.assertEqual(self.get(page=9).status_code, 404)
+
+    def test_cursor_links(self):
+        response = self.get(page_size=2)
+        self.assertIn('cursor=', response.data['next'])
+        self.assertIsNone(response.data['previous'])
+        following = self.client.get(response.data['next'], secure=True)
+        self.assertEqual(following.status_code, 200)
+        self.assertEqual(len(following.data['results']), 2)
+        self.assertIn('cursor=', following.data['previous'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.get(cursor="pas-un-curseur").status_code, 404)
@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from apps.core.models import CompletedTask
+from apps.core.tasks import enqueue
+from apps.nurseries.tasks import delete_files
+
+
+class EagerTaskTests(TestCase):
+    """
+    Tâches en mode eager (tests) : exécutées sur place, au commit de la transaction.
+    """
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.name = default_storage.save('tests/file.txt', ContentFile(b'x'))
+
+    def test_eager_under_tests(self):
+        self.assertTrue(settings.TESTING)
+        self.assertTrue(settings.CELERY_TASK_ALWAYS_EAGER)
+
+    def test_runs_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            enqueue(delete_files, [self.name])
+            # Rien avant le commit
+            self.assertTrue(default_storage.exists(self.name))
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(default_storage.exists(self.name))
+
+    def test_not_sent_on_rollback(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                enqueue(delete_files, [self.name])
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertTrue(default_storage.exists(self.name))
+
+    def test_idempotency_key(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(delete_files, [self.name], idempotency_key='tests:delete')
+        self.assertTrue(CompletedTask.objects.filter(key='tests:delete', task=delete_files.name).exists())
+
+        # Même clé : la tâche n'est pas rejouée
+        name = default_storage.save('tests/file.txt', ContentFile(b'x'))
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(delete_files, [name], idempotency_key='tests:delete')
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(delete_files, [name], idempotency_key='tests:other')
+        self.assertFalse(default_storage.exists(name))
@@ -0,0 +1,94 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+LIST_VERSION_KEY = "nurseries:list:version"
+STATS_KEYS = {True: "nurseries:cache:hits", False: "nurseries:cache:misses"}
+
+# Paramètres dépendant de l'heure courante : jamais mis en cache
+UNCACHEABLE_PARAMS = {'open_now'}
+
+
+def timeout():
+    return getattr(settings, 'NURSERY_CACHE_TIMEOUT', 300)
+
+
+def list_version():
+    return cache.get_or_set(LIST_VERSION_KEY, 1, None)
+
+
+def bump_list_version():
+    """
+    Invalide toutes les pages de liste en cache (appelé par les signaux d'écriture).
+    """
+    try:
+        cache.incr(LIST_VERSION_KEY)
+    except ValueError:
+        cache.set(LIST_VERSION_KEY, 2, None)
+
+
+def list_key(request):
+    digest = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f"nurseries:list:{list_version()}:{digest}"
+
+
+def detail_key(request, pk, updated_at):
+    digest = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f"nurseries:detail:{pk}:{updated_at.timestamp()}:{digest}"
+
+
+def record(hit):
+    key = STATS_KEYS[hit]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def stats():
+    hits, misses = (cache.get(STATS_KEYS[hit], 0) for hit in (True, False))
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else 0.0}
+
+
+def reset_stats():
+    cache.delete_many(list(STATS_KEYS.values()))
+
+
+class CachedReadMixin:
+    """
+    Met en cache les réponses `list` et `retrieve` d'un viewset public.
+    - liste : clé = URL complète (filtres, page) + version globale, incrémentée par les signaux
+    - détail : clé = id + `updated_at` de la crèche, donc périmée dès que la crèche change
+    L'en-tête `X-Cache` indique HIT ou MISS.
+    """
+
+    def cached_response(self, key, render):
+        data = cache.get(key)
+        hit = data is not None
+        if hit:
+            response = Response(data)
+        else:
+            response = render()
+            cache.set(key, response.data, timeout())
+        record(hit)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if UNCACHEABLE_PARAMS & set(request.query_params):
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(
+            list_key(request),
+            lambda: super(CachedReadMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        # Objet résolu une seule fois (ConditionalGetMixin le garde pour le rendu)
+        instance = self.get_object()
+        return self.cached_response(
+            detail_key(request, instance.pk, instance.updated_at),
+            lambda: super(CachedReadMixin, self).retrieve(request, *args, **kwargs),
+        )
@@ -0,0 +1,261 @@
+import csv
+import datetime
+import json
+import tempfile
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.core import signing
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.http import FileResponse, StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from apps.children.models import Child
+from apps.classrooms.models import Classroom
+from apps.subscriptions.models import SubscriptionDetail
+
+CHUNK_SIZE = 2000
+TOKEN_SALT = 'nurseries.exports'
+# Durée de validité d'un lien de téléchargement (et de conservation des fichiers, cf. purge_exports)
+MAX_AGE = 24 * 3600
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    title: str
+    columns: tuple  # (en-tête, champ pour values_list)
+    queryset: object  # fonction(nursery_id) -> queryset ordonné
+
+
+DATASETS = {
+    'subscriptions': Dataset(
+        "Souscriptions",
+        (
+            ("Souscription", 'subscription_id'),
+            ("Plan", 'subscription__plan__name'),
+            ("Début", 'subscription__start_date'),
+            ("Fin", 'subscription__end_date'),
+            ("Prix", 'subscription__price'),
+            ("Active", 'subscription__is_active'),
+            ("Parent (nom)", 'subscription__parent__user__last_name'),
+            ("Parent (prénom)", 'subscription__parent__user__first_name'),
+            ("Parent (e-mail)", 'subscription__parent__user__email'),
+            ("Parent (téléphone)", 'subscription__parent__contact'),
+            ("Enfant (nom)", 'child__last_name'),
+            ("Enfant (prénom)", 'child__first_name'),
+            ("Naissance", 'child__birthday'),
+            ("Classe", 'classroom__name'),
+            ("Groupe", 'group__name'),
+            ("Valide", 'is_valide'),
+        ),
+        lambda nursery_id: SubscriptionDetail.objects.filter(
+            subscription__plan__nursery_id=nursery_id,
+        ).order_by('subscription_id', 'pk'),
+    ),
+    'children': Dataset(
+        "Enfants",
+        (
+            ("Enfant", 'pk'),
+            ("Nom", 'last_name'),
+            ("Prénom", 'first_name'),
+            ("Naissance", 'birthday'),
+            ("Parent (nom)", 'parent__user__last_name'),
+            ("Parent (prénom)", 'parent__user__first_name'),
+            ("Parent (e-mail)", 'parent__user__email'),
+            ("Parent (téléphone)", 'parent__contact'),
+        ),
+        # Enfants inscrits (détail valide d'une souscription active de la crèche) et familles
+        # importées par la crèche
+        lambda nursery_id: Child.objects.filter(
+            Q(
+                subscription_details_for_child__subscription__plan__nursery_id=nursery_id,
+                subscription_details_for_child__subscription__is_active=True,
+                subscription_details_for_child__is_valide=True,
+            )
+            | Q(parent__imported_by_id=nursery_id)
+        ).distinct().order_by('last_name', 'first_name', 'pk'),
+    ),
+    'classrooms': Dataset(
+        "Classes",
+        (
+            ("Classe", 'name'),
+            ("Âge min. (mois)", 'age_range_start'),
+            ("Âge max. (mois)", 'age_range_end'),
+            ("Capacité", 'capacity'),
+            ("Inscrits", 'nbr_children'),
+            ("Active", 'existe'),
+        ),
+        lambda nursery_id: Classroom.objects.filter(nursery_id=nursery_id).order_by('name', 'pk'),
+    ),
+}
+
+
+def rows(dataset, nursery_id):
+    """
+    Lignes de l'export : projection values_list lue par paquets, jamais tout le queryset en mémoire.
+    """
+    fields = [field for _, field in dataset.columns]
+    return dataset.queryset(nursery_id).values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+# Premiers caractères d'une formule pour un tableur (injection de formules, CSV et XLSX)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def text(value):
+    # Saisie libre (noms, téléphones...) : neutralisée par une apostrophe, affichée comme texte
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def cell(value):
+    # Valeur texte pour le CSV ; le XLSX garde les types (dates, nombres)
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return "oui" if value else "non"
+    if isinstance(value, (datetime.date, Decimal)):
+        return str(value)
+    return text(value)
+
+
+class Echo:
+    """
+    Pseudo-fichier pour csv.writer : chaque ligne écrite est renvoyée au lieu d'être stockée.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(dataset, nursery_id):
+    """
+    CSV séparé par des points-virgules avec BOM (ouvert tel quel par Excel en français),
+    produit par paquets de lignes.
+    """
+    writer = csv.writer(Echo(), delimiter=';')
+    yield '﻿' + writer.writerow([header for header, _ in dataset.columns])
+    lines = []
+    for row in rows(dataset, nursery_id):
+        lines.append(writer.writerow([cell(value) for value in row]))
+        if len(lines) >= CHUNK_SIZE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def write_xlsx(dataset, nursery_id, target):
+    """
+    Classeur en mode write-only d'openpyxl : les lignes sont écrites au fil de l'eau
+    dans une feuille sur disque, la mémoire ne dépend pas du nombre de lignes.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(dataset.title)
+    sheet.append([header for header, _ in dataset.columns])
+    for row in rows(dataset, nursery_id):
+        sheet.append(["oui" if value is True else "non" if value is False else text(value) for value in row])
+    workbook.save(target)
+
+
+def write_file(dataset, nursery_id, filetype, target):
+    if filetype == 'xlsx':
+        write_xlsx(dataset, nursery_id, target)
+    else:
+        for chunk in csv_chunks(dataset, nursery_id):
+            target.write(chunk.encode())
+    target.seek(0)
+
+
+def filename(key, nursery_id, filetype):
+    return f"{key}-{nursery_id}-{datetime.date.today():%Y%m%d}.{filetype}"
+
+
+def export_response(key, nursery_id, filetype):
+    """
+    Réponse de téléchargement : CSV produit en streaming, XLSX construit dans un fichier
+    temporaire (supprimé à la fermeture) puis envoyé par blocs.
+    """
+    dataset = DATASETS[key]
+    name = filename(key, nursery_id, filetype)
+    if filetype == 'csv':
+        response = StreamingHttpResponse(csv_chunks(dataset, nursery_id), content_type=CONTENT_TYPES['csv'])
+        response['Content-Disposition'] = f'attachment; filename="{name}"'
+        return response
+    target = tempfile.TemporaryFile()
+    write_file(dataset, nursery_id, filetype, target)
+    return FileResponse(target, as_attachment=True, filename=name, content_type=CONTENT_TYPES[filetype])
+
+
+# Exports construits par le worker, pour les gros volumes
+
+def storage_name(key, nursery_id, filetype, export_id):
+    return f"exports/{nursery_id}/{export_id}/{filename(key, nursery_id, filetype)}"
+
+
+# Marqueur déposé une fois le fichier entièrement enregistré : le stockage n'a pas de
+# renommage atomique et un fichier en cours d'écriture est déjà visible
+READY_SUFFIX = '.ready'
+
+
+def ready_name(name):
+    return name + READY_SUFFIX
+
+
+def build(key, nursery_id, filetype, name):
+    with tempfile.TemporaryFile() as target:
+        write_file(DATASETS[key], nursery_id, filetype, target)
+        # Nouvelle tentative : le fichier partiel d'un essai interrompu est remplacé, pas renommé
+        default_storage.delete(name)
+        default_storage.save(name, File(target))
+    default_storage.save(ready_name(name), ContentFile(b''))
+
+
+def is_ready(name):
+    return default_storage.exists(ready_name(name))
+
+
+def download_token(name):
+    return signing.dumps(name, salt=TOKEN_SALT)
+
+
+def read_token(token, nursery_id):
+    """
+    Nom du fichier désigné par le jeton, ou None (jeton invalide, expiré ou d'une autre crèche).
+    """
+    try:
+        name = signing.loads(token, salt=TOKEN_SALT, max_age=MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return name if name.startswith(f"exports/{nursery_id}/") else None
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Négociation des types des exports ; les fichiers sont des réponses Django,
+    seules les erreurs passent par ces rendus.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, str)):
+            return data
+        return json.dumps(data, ensure_ascii=False).encode()
+
+
+class XLSXRenderer(CSVRenderer):
+    media_type = CONTENT_TYPES['xlsx']
+    format = 'xlsx'
+    charset = None
@@ -1,16 +1,85 @@
+import re
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.utils import timezone
 from django_filters import rest_framework as filters
 from rest_framework.pagination import PageNumberPagination
 from apps.nurseries.serializers import Nursery
+from apps.nurseries.models import OpeningHour
+from rest_framework.exceptions import ValidationError
+from apps.nurseries.search import search_nurseries
+from apps.nurseries.geo import nearby, DEFAULT_RADIUS_KM, MAX_RADIUS_KM
+
+# Jours acceptés par ?open_at= (anglais, français ou numéro 0=lundi)
+DAY_ALIASES = {
+    alias: day
+    for day, aliases in enumerate([
+        ('mon', 'lun'), ('tue', 'mar'), ('wed', 'mer'), ('thu', 'jeu'),
+        ('fri', 'ven'), ('sat', 'sam'), ('sun', 'dim'),
+    ])
+    for alias in (*aliases, str(day))
+}
+
+
+def parse_week_minute(value):
+    """
+    « sat-07:30 » -> minutes depuis lundi 00:00.
+    """
+    match = re.fullmatch(r'([a-z0-9]+)-(\d{1,2}):(\d{2})', value.strip().lower())
+    if not match or match.group(1) not in DAY_ALIASES:
+        raise ValidationError({'open_at': "Format attendu : « jour-HH:MM », par exemple « sat-07:30 »."})
+    hour, minute = int(match.group(2)), int(match.group(3))
+    if hour > 23 or minute > 59:
+        raise ValidationError({'open_at': "Heure invalide."})
+    return DAY_ALIASES[match.group(1)] * 24 * 60 + hour * 60 + minute
+
 
 # ===== FILTRES =====
 class NurseryFilter(filters.FilterSet):
+    q = filters.CharFilter(method='search', help_text="Recherche plein texte (nom, adresse, informations), sans accents, triée par pertinence")
     name = filters.CharFilter(lookup_expr='icontains', help_text="Recherche par nom (insensible à la casse)", field_name='name')
     address = filters.CharFilter(lookup_expr='startswith', help_text="Filtre par ville exacte", field_name='address')
     max_age = filters.NumberFilter(field_name='max_age', lookup_expr='gte', help_text="Âge maximum")
+    open_at = filters.CharFilter(method='filter_open_at', help_text="Crèches ouvertes à ce moment de la semaine, ex. « sat-07:30 »")
+    open_now = filters.BooleanFilter(method='filter_open_now', help_text="Crèches actuellement ouvertes")
+    near = filters.CharFilter(method='filter_near', help_text="Position « lat,lng » : crèches dans le rayon `radius`, triées par distance")
+    radius = filters.NumberFilter(method='filter_radius', help_text=f"Rayon de recherche en km (défaut {DEFAULT_RADIUS_KM}, max {MAX_RADIUS_KM})")
 
     class Meta:
         model = Nursery
-        fields = ['name', 'address', 'max_age']
+        fields = ['q', 'name', 'address', 'max_age', 'open_at', 'open_now', 'near', 'radius']
+
+    def search(self, queryset, name, value):
+        return search_nurseries(queryset, value)
+
+    def filter_open_at(self, queryset, name, value):
+        return queryset.filter(pk__in=OpeningHour.open_nursery_ids(parse_week_minute(value)))
+
+    def filter_open_now(self, queryset, name, value):
+        if not value:
+            return queryset
+        # Les horaires sont exprimés à l'heure locale des crèches
+        now = timezone.localtime(timezone=ZoneInfo(settings.NURSERY_TIME_ZONE))
+        minute = OpeningHour.week_minute(now.weekday(), now)
+        return queryset.filter(pk__in=OpeningHour.open_nursery_ids(minute))
+
+    def filter_radius(self, queryset, name, value):
+        # Lu par filter_near
+        return queryset
+
+    def filter_near(self, queryset, name, value):
+        try:
+            latitude, longitude = (float(part) for part in value.split(','))
+        except ValueError:
+            raise ValidationError({'near': "Format attendu : « latitude,longitude »."})
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({'near': "Coordonnées hors limites."})
+        radius = self.form.cleaned_data.get('radius')
+        if radius is None:
+            radius = DEFAULT_RADIUS_KM
+        if not 0 < radius <= MAX_RADIUS_KM:
+            raise ValidationError({'radius': f"Le rayon doit être strictement positif et au plus de {MAX_RADIUS_KM} km."})
+        return nearby(queryset, latitude, longitude, float(radius))
 
 # ===== PAGINATION CUSTOM (optionnel) =====
 class NurseryPagination(PageNumberPagination):
@@ -0,0 +1,109 @@
+import math
+import re
+
+from django.db.models import F, Q
+
+from .search import normalize
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# Grille fixe de cellules de 0,1° (~11 km) : geo_cell = ligne * GRID_COLS + colonne
+GRID_SIZE = 0.1
+GRID_COLS = round(360 / GRID_SIZE)
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 200
+
+# Géocodage hors ligne : centre des principales villes couvertes par la plateforme
+CITY_COORDINATES = {
+    "abomey-calavi": (6.4485, 2.3557),
+    "abomey": (7.1829, 1.9912),
+    "allada": (6.6658, 2.1511),
+    "bohicon": (7.1782, 2.0667),
+    "cotonou": (6.3654, 2.4183),
+    "djougou": (9.7085, 1.6660),
+    "kandi": (11.1342, 2.9386),
+    "lokossa": (6.6387, 1.7167),
+    "natitingou": (10.3042, 1.3796),
+    "ouidah": (6.3631, 2.0851),
+    "parakou": (9.3372, 2.6303),
+    "porto-novo": (6.4969, 2.6289),
+    "savalou": (7.9281, 1.9756),
+    "lome": (6.1319, 1.2228),
+    "lagos": (6.5244, 3.3792),
+}
+
+
+def geocode(address):
+    """
+    Géocodage de substitution (sans service externe) : retourne les coordonnées de la ville
+    citée dans l'adresse, la plus à droite l'emportant, ou None si aucune n'est reconnue.
+    """
+    text = normalize(address)
+    found, position = None, -1
+    for city, coordinates in CITY_COORDINATES.items():
+        for match in re.finditer(rf"(?<![\w-]){re.escape(city)}(?![\w-])", text):
+            if match.start() > position:
+                found, position = coordinates, match.start()
+    return found
+
+
+def grid_cell(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    row = math.floor((latitude + 90) / GRID_SIZE)
+    col = min(math.floor((longitude + 180) / GRID_SIZE), GRID_COLS - 1)
+    return row * GRID_COLS + col
+
+
+def bounding_box(latitude, longitude, radius_km):
+    delta_lat = radius_km / KM_PER_DEGREE
+    delta_lng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        max(latitude - delta_lat, -90), min(latitude + delta_lat, 90),
+        max(longitude - delta_lng, -180), min(longitude + delta_lng, 180),
+    )
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Condition sur `geo_cell` couvrant le cercle : une plage de colonnes contiguës par ligne de la grille.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    first, last = grid_cell(min_lat, min_lng), grid_cell(max_lat, max_lng)
+    first_row, first_col = divmod(first, GRID_COLS)
+    last_row, last_col = divmod(last, GRID_COLS)
+    condition = Q()
+    for row in range(first_row, last_row + 1):
+        condition |= Q(geo_cell__range=(row * GRID_COLS + first_col, row * GRID_COLS + last_col))
+    return condition
+
+
+def nearby(queryset, latitude, longitude, radius_km=DEFAULT_RADIUS_KM):
+    """
+    Crèches situées à moins de `radius_km` du point donné, triées par distance.
+    L'index `geo_cell` réduit les candidats aux cellules couvrant le cercle : la distance
+    (approximation équirectangulaire) n'est calculée que pour eux, au carré (`distance_sq`, km²)
+    pour rester en arithmétique SQL pure ; voir `distance_km`.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    kx = KM_PER_DEGREE * math.cos(math.radians(latitude))
+    dx = (F('longitude') - longitude) * kx
+    dy = (F('latitude') - latitude) * KM_PER_DEGREE
+    return (
+        queryset
+        .filter(covering_cells(latitude, longitude, radius_km))
+        .filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng))
+        .annotate(distance_sq=dx * dx + dy * dy)
+        .filter(distance_sq__lte=radius_km * radius_km)
+        .order_by('distance_sq', 'name')
+    )
+
+
+def distance_km(nursery):
+    """
+    Distance en km d'une crèche issue de `nearby`, None sinon.
+    """
+    distance_sq = getattr(nursery, 'distance_sq', None)
+    return math.sqrt(distance_sq) if distance_sq is not None else None
@@ -0,0 +1,144 @@
+import hashlib
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+PHOTO_FIELDS = ('photo_exterior', 'photo_interior')
+RENDITION_WIDTHS = (320, 640, 1280)
+RENDITION_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+
+def rendition_name(source_name, width, fmt):
+    """
+    nurseries/{uuid}/images/facade.png -> nurseries/{uuid}/images/facade_640w.webp
+    """
+    stem, _ = os.path.splitext(source_name)
+    return f"{stem}_{width}w.{fmt}"
+
+
+def render(image, width, fmt):
+    """
+    Redimensionne `image` à `width` px de large et l'encode ; les métadonnées (EXIF) ne sont pas recopiées.
+    """
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, **RENDITION_FORMATS[fmt])
+    return buffer.getvalue()
+
+
+def generate_renditions(source_name):
+    """
+    Génère toutes les déclinaisons d'une photo et retourne le manifeste
+    {'source': ..., 'webp': {'320': nom, ...}, 'jpeg': {...}}.
+    """
+    with default_storage.open(source_name, 'rb') as source:
+        image = Image.open(source)
+        # Applique l'orientation EXIF avant de la perdre
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGB')
+
+    manifest = {'source': source_name}
+    # Pas d'agrandissement : largeurs inférieures à l'originale, plus l'originale (plafonnée)
+    widths = [w for w in RENDITION_WIDTHS if w < image.width] + [min(image.width, RENDITION_WIDTHS[-1])]
+    for fmt in RENDITION_FORMATS:
+        manifest[fmt] = {}
+        for width in sorted(set(widths)):
+            name = rendition_name(source_name, width, fmt)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            manifest[fmt][str(width)] = default_storage.save(name, ContentFile(render(image, width, fmt)))
+    return manifest
+
+
+def delete_renditions(manifest):
+    for fmt in RENDITION_FORMATS:
+        for name in (manifest or {}).get(fmt, {}).values():
+            if default_storage.exists(name):
+                default_storage.delete(name)
+
+
+def pending_fields(nursery):
+    """
+    Photos dont les déclinaisons manquent ou correspondent à un ancien fichier.
+    """
+    renditions = nursery.photo_renditions or {}
+    return [
+        field for field in PHOTO_FIELDS
+        if (getattr(nursery, field).name or None) != (renditions.get(field) or {}).get('source')
+    ]
+
+
+def refresh_renditions(nursery_id):
+    """
+    Met à jour les déclinaisons des photos d'une crèche qui ont changé depuis la dernière génération.
+    """
+    from .models import Nursery
+
+    nursery = Nursery.objects.filter(pk=nursery_id).first()
+    if nursery is None:
+        return
+    renditions = dict(nursery.photo_renditions or {})
+    fields = pending_fields(nursery)
+    if not fields:
+        return
+    for field in fields:
+        delete_renditions(renditions.pop(field, None))
+        source = getattr(nursery, field)
+        if source:
+            try:
+                renditions[field] = generate_renditions(source.name)
+            except (OSError, Image.DecompressionBombError):
+                logger.exception("Déclinaisons impossibles pour %s", source.name)
+    # update() : pas de signaux, mais `updated_at` avance pour périmer caches et ETags
+    Nursery.objects.filter(pk=nursery_id).update(photo_renditions=renditions, updated_at=timezone.now())
+
+
+def renditions_key(nursery):
+    """
+    Clé d'idempotence de la génération : change dès qu'une des photos sources change.
+    """
+    sources = '|'.join(getattr(nursery, field).name or '' for field in PHOTO_FIELDS)
+    return f"nursery-renditions:{nursery.pk}:{hashlib.sha1(sources.encode()).hexdigest()}"
+
+
+def stored_files(nursery):
+    """
+    Noms de tous les fichiers d'une crèche dans le stockage (documents, photos, déclinaisons).
+    """
+    names = [
+        getattr(nursery, field).name
+        for field in ('agreement_document', 'id_card_document') + PHOTO_FIELDS
+        if getattr(nursery, field)
+    ]
+    for manifest in (nursery.photo_renditions or {}).values():
+        for fmt in RENDITION_FORMATS:
+            names.extend(manifest.get(fmt, {}).values())
+    return names
+
+
+def rendition_urls(nursery, field, request=None):
+    """
+    URLs des déclinaisons d'une photo : {'webp': {'320': url, ...}, 'jpeg': {...}}, ou None.
+    """
+    manifest = (nursery.photo_renditions or {}).get(field)
+    if not manifest or manifest.get('source') != getattr(nursery, field).name:
+        return None
+    urls = {}
+    for fmt in RENDITION_FORMATS:
+        urls[fmt] = {}
+        for width, name in manifest.get(fmt, {}).items():
+            url = default_storage.url(name)
+            urls[fmt][width] = request.build_absolute_uri(url) if request else url
+    return urls
@@ -0,0 +1,166 @@
+import datetime
+import random
+
+from django.contrib.auth.models import User
+
+from apps.activities.models import Activity, ClassroomActivity
+from apps.children.models import Child
+from apps.classrooms.models import Classroom, Group
+from apps.nurseries import urls as nursery_urls
+from apps.nurseries.models import Nursery, NurseryAssistant, OpeningHour
+from apps.subscriptions.models import Plan, Subscription, SubscriptionDetail
+from apps.users.models import UserType
+
+PREFIXES = ["Crèche", "Micro-crèche", "Garderie", "Jardin d'enfants", "Halte-garderie"]
+NAMES = [
+    "des Anges", "Les Petits Loups", "Les Lucioles", "Arc-en-ciel", "Les Câlins",
+    "Le Petit Prince", "Les Étoiles", "Les Coccinelles", "Pomme d'Api", "Les Oursons",
+]
+CITIES = [
+    "Cotonou", "Porto-Novo", "Parakou", "Abomey-Calavi", "Bohicon",
+    "Natitingou", "Ouidah", "Lokossa", "Djougou", "Kandi",
+]
+# Routes consultées en tant que parent ; les autres en tant que manager de la crèche
+PARENT_ROUTES = ('plans-subscription',)
+
+
+def seed_nurseries(count, batch_size=2000, seed=42, prefix='bench_manager', **extra):
+    """
+    Crée `count` crèches vérifiées (avec leurs managers) en masse, pour les benchmarks.
+    `extra` peut fournir des valeurs ou des fonctions `f(rng, index)` par champ.
+    À appeler dans une transaction annulée ensuite.
+    """
+    rng = random.Random(seed)
+    created = []
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        users = User.objects.bulk_create([
+            User(username=f"{prefix}_{offset + i}", password="!")
+            for i in range(size)
+        ])
+        managers = UserType.objects.bulk_create([
+            UserType(user=user, type='nursery_manager') for user in users
+        ])
+        nurseries = []
+        for i, manager in enumerate(managers):
+            index = offset + i
+            values = {
+                field: value(rng, index) if callable(value) else value
+                for field, value in extra.items()
+            }
+            nurseries.append(Nursery(
+                manager=manager,
+                name=f"{rng.choice(PREFIXES)} {rng.choice(NAMES)} {index}",
+                address=f"{rng.randint(1, 300)} rue {rng.choice(NAMES)}, {rng.choice(CITIES)}",
+                contact_number="0022990000000",
+                information=f"Accueil des enfants de {rng.randint(3, 36)} mois, repas bio, jardin.",
+                max_age=rng.choice([24, 36, 48]),
+                max_children_per_class=rng.choice([8, 10, 12]),
+                verified=True,
+                **values,
+            ))
+        created.extend(Nursery.objects.bulk_create(nurseries))
+    return created
+
+
+def create_nursery(name, address="12 rue des Écoles, Cotonou", prefix=None, **fields):
+    """
+    Une crèche vérifiée et son manager, enregistrée par save() : signaux (index de recherche,
+    géolocalisation) compris, contrairement à seed_nurseries.
+    """
+    user = User.objects.create(username=prefix or f"manager_{User.objects.count()}", password="!")
+    values = {
+        'contact_number': "0022990000000", 'information': "", 'max_age': 36,
+        'max_children_per_class': 10, 'verified': True, **fields,
+    }
+    return Nursery.objects.create(
+        manager=UserType.objects.create(user=user, type='nursery_manager'), name=name, address=address, **values,
+    )
+
+
+def seed_budget_dataset(rows, prefix='budget'):
+    """
+    Jeu de données des budgets de requêtes (check_query_budgets, tests) : une crèche avec
+    `rows` lignes par liste (classes, groupes, assistants, activités, plans, souscriptions).
+    -> (objets par nom de route, paramètres d'URL parents, utilisateurs par rôle)
+    """
+    nursery = seed_nurseries(rows, prefix=f"{prefix}_manager")[0]
+    manager = nursery.manager.user
+    OpeningHour.objects.bulk_create([
+        OpeningHour(nursery=nursery, day=day, open_time=datetime.time(7), close_time=datetime.time(18),
+                    week_start=day * 1440 + 420, week_end=day * 1440 + 1080)
+        for day in range(5)
+    ])
+    classrooms = Classroom.objects.bulk_create([
+        Classroom(nursery=nursery, name=f"Classe {i}", capacity=12, age_range_start=0, age_range_end=36)
+        for i in range(rows)
+    ])
+    classroom = classrooms[0]
+    groups = Group.objects.bulk_create([Group(classroom=classroom, name=f"Groupe {i}") for i in range(rows)])
+
+    users = User.objects.bulk_create([User(username=f"{prefix}_assistant_{i}", password="!") for i in range(rows)])
+    profiles = UserType.objects.bulk_create([UserType(user=user, type='nursery_assistant') for user in users])
+    assistants = NurseryAssistant.objects.bulk_create([
+        NurseryAssistant(profil=profile, nursery=nursery, classroom=classroom, group=groups[0])
+        for profile in profiles
+    ])
+
+    activities = Activity.objects.bulk_create([
+        Activity(nursery=nursery, name=f"Activité {i}", description="-", type='educational')
+        for i in range(rows)
+    ])
+    classroom_activities = ClassroomActivity.objects.bulk_create([
+        ClassroomActivity(classroom=classroom, activity=activity, date=datetime.date.today(),
+                          start_time=datetime.time(9), end_time=datetime.time(10))
+        for activity in activities
+    ])
+
+    plans = Plan.objects.bulk_create([
+        Plan(nursery=nursery, name=f"Plan {i}", price=10000, duration='month') for i in range(rows)
+    ])
+    parent_user = User.objects.create(username=f"{prefix}_parent", password="!")
+    parent = UserType.objects.create(user=parent_user, type='parent')
+    children = Child.objects.bulk_create([
+        Child(parent=parent, first_name=f"Enfant {i}", last_name="Budget") for i in range(rows)
+    ])
+    subscriptions = Subscription.objects.bulk_create([
+        Subscription(parent=parent, plan=plans[0], start_date=datetime.date.today(), price=10000)
+        for _ in range(rows)
+    ])
+    SubscriptionDetail.objects.bulk_create([
+        SubscriptionDetail(subscription=subscription, child=child, classroom=classroom, group=groups[0])
+        for subscription in subscriptions for child in children
+    ])
+
+    objects = {
+        'nursery': nursery, 'mynursery': nursery,
+        'nursery-assistant': assistants[0], 'nursery-plan': plans[0], 'mynursery-plan': plans[0],
+        'nursery-classroom': classroom, 'nursery-activity': activities[0],
+        'classroom-group': groups[0], 'classroom-activity': classroom_activities[0],
+        'plans-subscription': subscriptions[0], 'plans-subscription-get': subscriptions[0],
+    }
+    parents = {'nursery_pk': nursery.pk, 'mynursery_pk': nursery.pk, 'classroom_pk': classroom.pk, 'plans_pk': plans[0].pk}
+    return objects, parents, {'manager': manager, 'parent': parent_user, 'assistant': users[0]}
+
+
+def budget_routes(objects, parents):
+    """
+    (nom de base, nom de route, kwargs, classe de vue, action) pour chaque route GET
+    de apps/nurseries/urls.py sans paramètre libre.
+    """
+    for pattern in nursery_urls.urlpatterns:
+        actions = getattr(pattern.callback, 'actions', None) or {}
+        groups = set(pattern.pattern.regex.groupindex)
+        if 'get' not in actions or 'format' in groups or not pattern.name:
+            continue
+        basename = max((key for key in objects if pattern.name.startswith(f"{key}-")), key=len, default=None)
+        if basename is None or groups - {'pk'} - set(parents):
+            continue
+        kwargs = {group: parents[group] for group in groups if group != 'pk'}
+        if 'pk' in groups:
+            kwargs['pk'] = objects[basename].pk
+        yield basename, pattern.name, kwargs, pattern.callback.cls, actions['get']
+
+
+def route_role(basename):
+    return 'parent' if basename.startswith(PARENT_ROUTES) else 'manager'
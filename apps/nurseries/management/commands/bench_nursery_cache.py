@@ -0,0 +1,59 @@
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from apps.core.benchmark import format_summary, measure
+from apps.nurseries.cache import reset_stats, stats
+from apps.nurseries.models import OpeningHour
+from apps.nurseries.views import NurseryGetViewSet
+from ._seed import seed_nurseries
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la latence des pages publiques des crèches avec et sans cache "
+        "(les données sont annulées à la fin)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        list_view = NurseryGetViewSet.as_view({'get': 'list'})
+        detail_view = NurseryGetViewSet.as_view({'get': 'retrieve'})
+
+        with transaction.atomic():
+            self.stdout.write(f"Génération de {options['rows']} crèches…")
+            nurseries = seed_nurseries(options['rows'])
+            OpeningHour.objects.bulk_create([
+                OpeningHour(
+                    nursery=nursery, day=day,
+                    open_time=datetime.time(7), close_time=datetime.time(18),
+                    week_start=day * 1440 + 420, week_end=day * 1440 + 1080,
+                )
+                for nursery in nurseries[:1000] for day in range(5)
+            ])
+            pk = nurseries[0].pk
+
+            scenarios = [
+                ("liste ?page=3", lambda: list_view(factory.get('/api/client/mynursery/', {'page': 3})).render()),
+                ("liste ?q=creche", lambda: list_view(factory.get('/api/client/mynursery/', {'q': 'creche'})).render()),
+                ("détail", lambda: detail_view(factory.get(f'/api/client/mynursery/{pk}/'), pk=pk).render()),
+            ]
+            for label, call in scenarios:
+                def cold():
+                    cache.clear()
+                    call()
+
+                self.stdout.write(format_summary(f"{label} (sans cache)", measure(cold, repeat=options['repeat'])))
+                reset_stats()
+                self.stdout.write(format_summary(f"{label} (cache)", measure(call, repeat=options['repeat'])))
+                self.stdout.write(f"    taux de succès : {stats()['hit_ratio']:.1%}")
+
+            transaction.set_rollback(True)
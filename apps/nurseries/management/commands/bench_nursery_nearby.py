@@ -0,0 +1,50 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.core.benchmark import format_summary, measure
+from apps.nurseries.geo import CITY_COORDINATES, grid_cell, nearby
+from apps.nurseries.views import NurseryGetViewSet
+from ._seed import seed_nurseries
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la latence de la recherche par proximité (?near=) sur un jeu de crèches "
+        "géolocalisées généré (les données sont annulées à la fin)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        cities = list(CITY_COORDINATES.values())
+        points = []
+        for _ in range(options['rows']):
+            latitude, longitude = rng.choice(cities)
+            points.append((latitude + rng.gauss(0, 0.15), longitude + rng.gauss(0, 0.15)))
+
+        with transaction.atomic():
+            self.stdout.write(f"Génération de {options['rows']} crèches…")
+            seed_nurseries(
+                options['rows'],
+                latitude=lambda rng, i: points[i][0],
+                longitude=lambda rng, i: points[i][1],
+                geo_cell=lambda rng, i: grid_cell(*points[i]),
+            )
+
+            base = NurseryGetViewSet.queryset
+            center = CITY_COORDINATES['cotonou']
+            for radius in (2, 5, 10, 25):
+                def first_page():
+                    qs = nearby(base, *center, radius)
+                    qs.count()
+                    list(qs.values('id', 'name', 'address', 'distance_sq')[:10])
+
+                samples = measure(first_page, repeat=options['repeat'])
+                self.stdout.write(format_summary(f"?near=cotonou&radius={radius}", samples))
+
+            transaction.set_rollback(True)
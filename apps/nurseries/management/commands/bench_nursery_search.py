@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from apps.core.benchmark import format_summary, measure
+from apps.nurseries.filters import NurseryFilter
+from apps.nurseries.search import rebuild_index
+from apps.nurseries.views import NurseryGetViewSet
+from ._seed import seed_nurseries
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la latence de la recherche plein texte (?q=) à l'ancien filtre icontains "
+        "sur un jeu de crèches généré (les données sont annulées à la fin)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        queries = [
+            ('name', 'lucioles'),
+            ('q', 'lucioles'),
+            ('name', 'creche'),
+            ('q', 'creche'),
+            ('q', 'creche cotonou'),
+        ]
+
+        with transaction.atomic():
+            self.stdout.write(f"Génération de {options['rows']} crèches…")
+            seed_nurseries(options['rows'])
+            rebuild_index()
+
+            base = NurseryGetViewSet.queryset
+            for param, value in queries:
+                request = factory.get('/api/client/mynursery/', {param: value})
+
+                def first_page():
+                    qs = NurseryFilter(request.GET, queryset=base, request=request).qs
+                    qs.count()
+                    list(qs.values('id', 'name', 'address')[:10])
+
+                samples = measure(first_page, repeat=options['repeat'])
+                self.stdout.write(format_summary(f"?{param}={value}", samples))
+
+            transaction.set_rollback(True)
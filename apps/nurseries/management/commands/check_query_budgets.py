@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.core.queries import QueryRecorder, check_budget, get_budget
+from ._seed import budget_routes, route_role, seed_budget_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Appelle chaque route GET des routeurs de apps/nurseries/urls.py sur un jeu de données "
+        "factice et compare le nombre de requêtes SQL au budget `query_budget` de la vue "
+        "(les données sont annulées à la fin)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5, help="Lignes par liste (au moins 3 pour révéler les N+1)")
+        parser.add_argument('--fail', action='store_true', help="Code de sortie non nul en cas de dépassement")
+        parser.add_argument('--verbose-sql', action='store_true', help="Affiche les requêtes des routes en échec")
+
+    # Le cache des réponses publiques est neutralisé : on mesure le pire cas
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def handle(self, *args, **options):
+        failures = 0
+        with transaction.atomic():
+            objects, parents, users = seed_budget_dataset(max(options['rows'], 1))
+            clients = {
+                role: Client(
+                    HTTP_HOST=settings.ALLOWED_HOSTS[0],
+                    HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}",
+                )
+                for role, user in users.items()
+            }
+
+            self.stdout.write(f"{'route':<40} {'statut':>6} {'SQL':>5} {'budget':>7}")
+            for basename, name, kwargs, view_class, action in budget_routes(objects, parents):
+                role = route_role(basename)
+                with QueryRecorder() as recorder:
+                    response = clients[role].get(reverse(name, kwargs=kwargs), secure=True)
+                budget = get_budget(view_class, action)
+                problems = check_budget(recorder, budget)
+                if response.status_code >= 500:
+                    problems.insert(0, f"réponse {response.status_code}")
+                line = f"{name:<40} {response.status_code:>6} {recorder.count:>5} {budget if budget is not None else '-':>7}"
+                if problems:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(line))
+                    for problem in problems:
+                        self.stdout.write(f"    {problem}")
+                    if options['verbose_sql']:
+                        for query in recorder.queries:
+                            self.stdout.write(f"      {query['sql']}")
+                else:
+                    self.stdout.write(line)
+
+            transaction.set_rollback(True)
+
+        if failures and options['fail']:
+            raise CommandError(f"{failures} route(s) hors budget.")
+        self.stdout.write(self.style.SUCCESS(f"Terminé : {failures} route(s) hors budget."))
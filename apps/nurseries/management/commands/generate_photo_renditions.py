@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.nurseries.images import pending_fields, refresh_renditions
+from apps.nurseries.models import Nursery
+
+
+class Command(BaseCommand):
+    help = "Génère les déclinaisons manquantes ou périmées des photos de crèches"
+
+    def handle(self, *args, **options):
+        done = 0
+        for nursery in Nursery.objects.only('id', 'photo_exterior', 'photo_interior', 'photo_renditions').iterator():
+            if pending_fields(nursery):
+                refresh_renditions(nursery.pk)
+                done += 1
+        self.stdout.write(self.style.SUCCESS(f"{done} crèche(s) traitée(s)."))
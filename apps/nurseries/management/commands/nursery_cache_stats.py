@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.nurseries.cache import reset_stats, stats
+
+
+class Command(BaseCommand):
+    help = "Affiche le taux de succès du cache des pages publiques des crèches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Remet les compteurs à zéro")
+
+    def handle(self, *args, **options):
+        current = stats()
+        self.stdout.write(
+            f"hits={current['hits']} misses={current['misses']} "
+            f"hit_ratio={current['hit_ratio']:.1%}"
+        )
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS("Compteurs remis à zéro."))
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.nurseries.models import ChunkedUpload
+from apps.nurseries.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = "Supprime les envois par morceaux abandonnés (non finalisés) et leurs fichiers partiels"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Âge minimal depuis le dernier morceau reçu")
+
+    def handle(self, *args, **options):
+        limit = timezone.now() - timedelta(hours=options['hours'])
+        stale = ChunkedUpload.objects.filter(completed_at__isnull=True, updated_at__lt=limit)
+        count = 0
+        for upload in stale.iterator():
+            discard_upload(upload)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} envoi(s) abandonné(s) supprimé(s)."))
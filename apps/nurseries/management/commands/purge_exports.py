@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.nurseries.exports import MAX_AGE, READY_SUFFIX
+
+
+class Command(BaseCommand):
+    help = "Supprime les exports construits par le worker dont le lien de téléchargement a expiré"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=MAX_AGE // 3600, help="Âge minimal des fichiers")
+
+    def handle(self, *args, **options):
+        limit = timezone.now() - timedelta(hours=options['hours'])
+        count = 0
+        if default_storage.exists('exports'):
+            # exports/<crèche>/<export>/<fichier>
+            for nursery in default_storage.listdir('exports')[0]:
+                for export in default_storage.listdir(f'exports/{nursery}')[0]:
+                    for name in default_storage.listdir(f'exports/{nursery}/{export}')[1]:
+                        path = f'exports/{nursery}/{export}/{name}'
+                        if default_storage.get_modified_time(path) < limit:
+                            default_storage.delete(path)
+                            count += not name.endswith(READY_SUFFIX)
+        self.stdout.write(self.style.SUCCESS(f"{count} export(s) expiré(s) supprimé(s)."))
@@ -0,0 +1,105 @@
+# Generated by Django 5.2 on 2026-10-18 17:59
+
+import django.db.models.deletion
+import unicodedata
+
+from django.db import migrations, models
+
+FTS_TABLE = 'nurseries_nursery_fts'
+INDEX_TABLE = 'nurseries_nurserysearchindex'
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, address, information,
+        content='{INDEX_TABLE}', content_rowid='nursery_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {INDEX_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, address, information)
+        VALUES (new.nursery_id, new.name, new.address, new.information);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {INDEX_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, address, information)
+        VALUES ('delete', old.nursery_id, old.name, old.address, old.information);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {INDEX_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, address, information)
+        VALUES ('delete', old.nursery_id, old.name, old.address, old.information);
+        INSERT INTO {FTS_TABLE}(rowid, name, address, information)
+        VALUES (new.nursery_id, new.name, new.address, new.information);
+    END""",
+]
+SQLITE_BACKWARD = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_FORWARD = [
+    f"""CREATE INDEX {INDEX_TABLE}_fts ON {INDEX_TABLE} USING GIN ((
+        setweight(to_tsvector('simple', name), 'A') ||
+        setweight(to_tsvector('simple', address), 'B') ||
+        setweight(to_tsvector('simple', information), 'C')
+    ))""",
+]
+POSTGRES_BACKWARD = [
+    f"DROP INDEX IF EXISTS {INDEX_TABLE}_fts",
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def populate_index(apps, schema_editor):
+    Nursery = apps.get_model('nurseries', 'Nursery')
+    NurserySearchIndex = apps.get_model('nurseries', 'NurserySearchIndex')
+    NurserySearchIndex.objects.bulk_create(
+        [
+            NurserySearchIndex(
+                nursery_id=nursery.id,
+                name=normalize(nursery.name),
+                address=normalize(nursery.address),
+                information=normalize(nursery.information),
+            )
+            for nursery in Nursery.objects.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0004_alter_nursery_manager'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NurserySearchIndex',
+            fields=[
+                ('nursery', models.OneToOneField(help_text='Crèche indexée', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_index', serialize=False, to='nurseries.nursery')),
+                ('name', models.TextField(blank=True, default='')),
+                ('address', models.TextField(blank=True, default='')),
+                ('information', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'verbose_name': 'Index de recherche',
+                'verbose_name_plural': 'Index de recherche',
+            },
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_vendor_sql({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+        migrations.RunPython(populate_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2 on 2026-10-18 18:07
+
+import math
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Copie figée de apps.nurseries.geo (et search.normalize) à la date de la migration :
+# une migration ne doit pas dépendre du code courant de l'application.
+GRID_SIZE = 0.1
+GRID_COLS = round(360 / GRID_SIZE)
+
+CITY_COORDINATES = {
+    "abomey-calavi": (6.4485, 2.3557),
+    "abomey": (7.1829, 1.9912),
+    "allada": (6.6658, 2.1511),
+    "bohicon": (7.1782, 2.0667),
+    "cotonou": (6.3654, 2.4183),
+    "djougou": (9.7085, 1.6660),
+    "kandi": (11.1342, 2.9386),
+    "lokossa": (6.6387, 1.7167),
+    "natitingou": (10.3042, 1.3796),
+    "ouidah": (6.3631, 2.0851),
+    "parakou": (9.3372, 2.6303),
+    "porto-novo": (6.4969, 2.6289),
+    "savalou": (7.9281, 1.9756),
+    "lome": (6.1319, 1.2228),
+    "lagos": (6.5244, 3.3792),
+}
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def geocode(address):
+    text = normalize(address)
+    found, position = None, -1
+    for city, coordinates in CITY_COORDINATES.items():
+        for match in re.finditer(rf"(?<![\w-]){re.escape(city)}(?![\w-])", text):
+            if match.start() > position:
+                found, position = coordinates, match.start()
+    return found
+
+
+def grid_cell(latitude, longitude):
+    row = math.floor((latitude + 90) / GRID_SIZE)
+    col = min(math.floor((longitude + 180) / GRID_SIZE), GRID_COLS - 1)
+    return row * GRID_COLS + col
+
+
+def geocode_nurseries(apps, schema_editor):
+    Nursery = apps.get_model('nurseries', 'Nursery')
+    for nursery in Nursery.objects.filter(latitude__isnull=True).only('id', 'address'):
+        coordinates = geocode(nursery.address)
+        if coordinates:
+            nursery.latitude, nursery.longitude = coordinates
+            nursery.geo_cell = grid_cell(*coordinates)
+            nursery.save(update_fields=['latitude', 'longitude', 'geo_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0005_nurserysearchindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nursery',
+            name='geo_cell',
+            field=models.BigIntegerField(blank=True, db_index=True, editable=False, help_text='Cellule de la grille géographique (index de recherche par proximité)', null=True),
+        ),
+        migrations.AddField(
+            model_name='nursery',
+            name='latitude',
+            field=models.FloatField(blank=True, help_text="Latitude (déduite de l'adresse si absente)", null=True),
+        ),
+        migrations.AddField(
+            model_name='nursery',
+            name='longitude',
+            field=models.FloatField(blank=True, help_text="Longitude (déduite de l'adresse si absente)", null=True),
+        ),
+        migrations.RunPython(geocode_nurseries, migrations.RunPython.noop),
+    ]
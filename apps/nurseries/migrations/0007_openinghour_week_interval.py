@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+def fill_week_intervals(apps, schema_editor):
+    OpeningHour = apps.get_model('nurseries', 'OpeningHour')
+    hours = list(OpeningHour.objects.filter(is_closed=False, open_time__isnull=False, close_time__isnull=False))
+    for hour in hours:
+        base = hour.day * 24 * 60
+        hour.week_start = base + hour.open_time.hour * 60 + hour.open_time.minute
+        hour.week_end = base + hour.close_time.hour * 60 + hour.close_time.minute
+    OpeningHour.objects.bulk_update(hours, ['week_start', 'week_end'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0006_nursery_geolocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='openinghour',
+            name='week_end',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='openinghour',
+            name='week_start',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='openinghour',
+            index=models.Index(fields=['week_start', 'week_end'], name='openinghour_week_interval'),
+        ),
+        migrations.RunPython(fill_week_intervals, migrations.RunPython.noop),
+    ]
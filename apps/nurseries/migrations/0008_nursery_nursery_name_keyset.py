@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0007_openinghour_week_interval'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nursery',
+            index=models.Index(fields=['name', 'id'], name='nursery_name_keyset'),
+        ),
+    ]
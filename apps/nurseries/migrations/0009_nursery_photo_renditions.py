@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0008_nursery_nursery_name_keyset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nursery',
+            name='photo_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Déclinaisons (WebP/JPEG, largeurs fixes) des photos, générées en arrière-plan'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 18:15
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0009_nursery_photo_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('field', models.CharField(choices=[('agreement_document', "Document d'agrément"), ('id_card_document', "Pièce d'identité")], help_text='Champ fichier à renseigner', max_length=30)),
+                ('filename', models.CharField(help_text="Nom du fichier d'origine", max_length=255)),
+                ('size', models.PositiveBigIntegerField(help_text='Taille totale annoncée (octets)')),
+                ('offset', models.PositiveBigIntegerField(default=0, help_text='Octets reçus')),
+                ('completed_at', models.DateTimeField(blank=True, help_text='Date de finalisation', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date de dernière mise à jour')),
+                ('nursery', models.ForeignKey(help_text='Crèche destinataire du document', on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to='nurseries.nursery')),
+            ],
+            options={
+                'verbose_name': 'Upload par morceaux',
+                'verbose_name_plural': 'Uploads par morceaux',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 19:20
+
+from django.db import migrations
+from django.db.models import F
+
+
+def fix_overnight_intervals(apps, schema_editor):
+    # Horaires de nuit enregistrés avec une fin avant le début : fermeture le lendemain
+    OpeningHour = apps.get_model('nurseries', 'OpeningHour')
+    OpeningHour.objects.filter(week_end__lte=F('week_start')).update(week_end=F('week_end') + 24 * 60)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0010_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_overnight_intervals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 19:50
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def backfill_parts(apps, schema_editor):
+    # Envois en cours : leurs morceaux ({position}.part) ont tous été validés sous verrou
+    ChunkedUpload = apps.get_model('nurseries', 'ChunkedUpload')
+    for upload in ChunkedUpload.objects.filter(completed_at__isnull=True, offset__gt=0).select_related('nursery'):
+        directory = f"nurseries/{upload.nursery.upload_folder}/uploads/{upload.id}"
+        if default_storage.exists(directory):
+            upload.parts = [f"{directory}/{name}" for name in sorted(default_storage.listdir(directory)[1])]
+            upload.save(update_fields=['parts'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0011_openinghour_overnight'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='parts',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Morceaux validés (noms dans le stockage)'),
+        ),
+        migrations.RunPython(backfill_parts, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 import os
 import uuid
 from django.db import models
+from django.db.models import Q
 
 def nursery_upload_path(instance, filename, subfolder):
     """
@@ -41,6 +42,15 @@ class Nursery(models.Model):
     )
     name = models.CharField(max_length=255, help_text="Nom de la crèche")
     address = models.TextField(help_text="Adresse de la crèche")
+    latitude = models.FloatField(null=True, blank=True, help_text="Latitude (déduite de l'adresse si absente)")
+    longitude = models.FloatField(null=True, blank=True, help_text="Longitude (déduite de l'adresse si absente)")
+    geo_cell = models.BigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Cellule de la grille géographique (index de recherche par proximité)",
+    )
     contact_number = models.CharField(max_length=15, help_text="Téléphone de la crèche")
     information = models.TextField(help_text="Informations complémentaires")
     max_age = models.PositiveIntegerField(help_text="Âge maximum des enfants acceptés (en mois)")
@@ -79,6 +89,12 @@ class Nursery(models.Model):
         null=True,
         blank=True,
     )
+    photo_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Déclinaisons (WebP/JPEG, largeurs fixes) des photos, générées en arrière-plan",
+    )
 
     verified = models.BooleanField(
         default=False,
@@ -93,10 +109,23 @@ class Nursery(models.Model):
         verbose_name = "Crèche"
         verbose_name_plural = "Crèches"
         ordering = ["name"]
+        indexes = [
+            # Sert le tri par défaut et la pagination keyset
+            models.Index(fields=["name", "id"], name="nursery_name_keyset"),
+        ]
 
     def __str__(self):
         return self.name
 
+    # Champs dont dépend la géolocalisation (recalculée par le signal pre_save)
+    GEO_FIELDS = ('address', 'latitude', 'longitude')
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(self.GEO_FIELDS) & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude', 'geo_cell'}
+        super().save(*args, **kwargs)
+
 
 
 class OpeningHour(models.Model):
@@ -120,20 +149,59 @@ class OpeningHour(models.Model):
     close_time = models.TimeField(help_text="Heure de fermeture (HH:MM)", null=True, blank=True)
     is_closed = models.BooleanField(default=False, help_text="Si vrai, la crèche est fermée ce jour")
 
+    # Intervalle d'ouverture en minutes depuis lundi 00:00, recalculé à chaque enregistrement ;
+    # une fermeture avant (ou à) l'ouverture se situe le lendemain et peut dépasser la fin de semaine
+    week_start = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    week_end = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
     class Meta:
         unique_together = ("nursery", "day")
         ordering = ["day"]
         verbose_name = "Horaire d'ouverture"
         verbose_name_plural = "Horaires d'ouverture"
+        indexes = [
+            models.Index(fields=["week_start", "week_end"], name="openinghour_week_interval"),
+        ]
 
     def __str__(self):
         if self.is_closed:
             return f"{self.get_day_display()} : Fermé"
         return f"{self.get_day_display()} : {self.open_time.strftime('%H:%M')} - {self.close_time.strftime('%H:%M')}"
 
+    WEEK_MINUTES = 7 * 24 * 60
+
+    @staticmethod
+    def week_minute(day, time):
+        return day * 24 * 60 + time.hour * 60 + time.minute
+
+    def week_interval(self):
+        if self.is_closed or not self.open_time or not self.close_time:
+            return None, None
+        start = self.week_minute(self.day, self.open_time)
+        end = self.week_minute(self.day, self.close_time)
+        if end <= start:
+            # Ouverture de nuit : fermeture le lendemain
+            end += 24 * 60
+        return start, end
+
     def save(self, *args, **kwargs):
+        self.week_start, self.week_end = self.week_interval()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'week_start', 'week_end'}
         super().save(*args, **kwargs)
 
+    @classmethod
+    def open_nursery_ids(cls, minute):
+        """
+        Identifiants des crèches ouvertes à `minute` (minutes depuis lundi 00:00) ; la seconde
+        condition retrouve les nuits du dimanche qui débordent sur le lundi.
+        """
+        return cls.objects.filter(
+            Q(week_start__lte=minute, week_end__gt=minute)
+            | Q(week_start__lte=minute + cls.WEEK_MINUTES, week_end__gt=minute + cls.WEEK_MINUTES)
+        ).values('nursery_id')
+
 
 
 class NurseryAssistant(models.Model):
@@ -188,3 +256,71 @@ class NurseryAssistant(models.Model):
     def __str__(self):
         # On suppose que UserType a un champ `user` lié à l’utilisateur authentifié
         return f"{self.profil.user.username} (Assistant – {self.nursery.name})"
+
+
+class NurserySearchIndex(models.Model):
+    """
+    Index de recherche « fantôme » d'une crèche :
+    - nursery : crèche indexée (clé primaire)
+    - name, address, information : textes normalisés (minuscules, sans accents)
+    La table est doublée d'une table FTS5 (SQLite) ou d'un index GIN tsvector
+    (PostgreSQL) créés par migration ; voir apps/nurseries/search.py.
+    """
+    nursery = models.OneToOneField(
+        "nurseries.Nursery",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_index",
+        help_text="Crèche indexée",
+    )
+    name = models.TextField(blank=True, default="")
+    address = models.TextField(blank=True, default="")
+    information = models.TextField(blank=True, default="")
+
+    class Meta:
+        verbose_name = "Index de recherche"
+        verbose_name_plural = "Index de recherche"
+
+    def __str__(self):
+        return f"Index #{self.nursery_id}"
+
+
+class ChunkedUpload(models.Model):
+    """
+    Upload en plusieurs morceaux d'un document de crèche :
+    - id : identifiant opaque transmis au client
+    - nursery, field : crèche et champ fichier visés
+    - filename, size : nom et taille totale annoncés à l'ouverture
+    - offset : nombre d'octets déjà reçus (reprise possible à partir de là)
+    - parts : morceaux validés, dans l'ordre du fichier
+    Chaque morceau est un objet du stockage : nurseries/{upload_folder}/uploads/{id}/{position}.{jeton}.part,
+    écrit avant validation ; seuls ceux de `parts` font partie du fichier.
+    """
+    FIELD_CHOICES = [
+        ('agreement_document', "Document d'agrément"),
+        ('id_card_document', "Pièce d'identité"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    nursery = models.ForeignKey(
+        "nurseries.Nursery",
+        on_delete=models.CASCADE,
+        related_name="chunked_uploads",
+        help_text="Crèche destinataire du document",
+    )
+    field = models.CharField(max_length=30, choices=FIELD_CHOICES, help_text="Champ fichier à renseigner")
+    filename = models.CharField(max_length=255, help_text="Nom du fichier d'origine")
+    size = models.PositiveBigIntegerField(help_text="Taille totale annoncée (octets)")
+    offset = models.PositiveBigIntegerField(default=0, help_text="Octets reçus")
+    parts = models.JSONField(default=list, blank=True, editable=False, help_text="Morceaux validés (noms dans le stockage)")
+    completed_at = models.DateTimeField(null=True, blank=True, help_text="Date de finalisation")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Date de création")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Date de dernière mise à jour")
+
+    class Meta:
+        verbose_name = "Upload par morceaux"
+        verbose_name_plural = "Uploads par morceaux"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
@@ -0,0 +1,108 @@
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models import Q
+
+from .models import Nursery, NurserySearchIndex
+
+# Table FTS5 (SQLite) adossée à nurseries_nurserysearchindex
+FTS_TABLE = "nurseries_nursery_fts"
+INDEX_TABLE = NurserySearchIndex._meta.db_table
+
+# Poids des colonnes : le nom compte plus que l'adresse, qui compte plus que la description
+SQLITE_RANK = f"bm25({FTS_TABLE}, 10.0, 4.0, 1.0)"
+PG_VECTOR = (
+    "(setweight(to_tsvector('simple', name), 'A') || "
+    "setweight(to_tsvector('simple', address), 'B') || "
+    "setweight(to_tsvector('simple', information), 'C'))"
+)
+
+INDEXED_FIELDS = ('name', 'address', 'information')
+
+
+def normalize(text):
+    """
+    Met un texte en minuscules et retire les accents : « Crèche » -> « creche ».
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(query):
+    return re.findall(r'\w+', normalize(query))
+
+
+def index_document(nursery):
+    return {field: normalize(getattr(nursery, field)) for field in INDEXED_FIELDS}
+
+
+def index_nursery(nursery):
+    """
+    Crée ou met à jour l'entrée d'index d'une crèche.
+    """
+    NurserySearchIndex.objects.update_or_create(
+        nursery=nursery,
+        defaults=index_document(nursery),
+    )
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Reconstruit tout l'index à partir de la table des crèches. Retourne le nombre de crèches indexées.
+    """
+    NurserySearchIndex.objects.all().delete()
+    batch, total = [], 0
+    for nursery in Nursery.objects.only('id', *INDEXED_FIELDS).iterator(chunk_size=batch_size):
+        batch.append(NurserySearchIndex(nursery_id=nursery.id, **index_document(nursery)))
+        if len(batch) >= batch_size:
+            NurserySearchIndex.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    NurserySearchIndex.objects.bulk_create(batch)
+    return total + len(batch)
+
+
+def search_nurseries(queryset, query):
+    """
+    Filtre `queryset` sur les crèches correspondant à `query` (préfixes, tous les mots requis)
+    et les trie par pertinence. Le tri d'origine sert à départager les ex aequo.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    table = Nursery._meta.db_table
+
+    # Jointure directe sur la table d'index : le score n'est calculé qu'une fois par crèche trouvée
+    if vendor == 'sqlite':
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        queryset = queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = {table}.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+            # bm25 est négatif : plus petit = plus pertinent
+            select={'search_rank': SQLITE_RANK},
+        )
+    elif vendor == 'postgresql':
+        match = ' & '.join(f'{term}:*' for term in terms)
+        queryset = queryset.extra(
+            tables=[INDEX_TABLE],
+            where=[
+                f"{INDEX_TABLE}.nursery_id = {table}.id",
+                f"{PG_VECTOR} @@ to_tsquery('simple', %s)",
+            ],
+            params=[match],
+            select={'search_rank': f"-ts_rank({PG_VECTOR}, to_tsquery('simple', %s))"},
+            select_params=[match],
+        )
+    else:
+        # Pas de moteur plein texte : recherche simple sur l'index normalisé
+        condition = Q()
+        for term in terms:
+            condition &= Q(name__contains=term) | Q(address__contains=term) | Q(information__contains=term)
+        return queryset.filter(pk__in=NurserySearchIndex.objects.filter(condition).values('nursery_id'))
+
+    ordering = queryset.query.order_by or Nursery._meta.ordering
+    return queryset.order_by('search_rank', *ordering)
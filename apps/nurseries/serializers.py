@@ -1,8 +1,10 @@
 import os
+from dateutil.relativedelta import relativedelta
 from rest_framework import serializers
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from .models import Nursery, OpeningHour, NurseryAssistant
+from .models import Nursery, OpeningHour, NurseryAssistant, ChunkedUpload
 from apps.users.models import UserType
 from apps.classrooms.models import Classroom, Group
 from apps.users.serializers import UserTypeSerializer
@@ -17,17 +19,32 @@ class FileValidator:
         if not value:
             return value
             
-        ext = os.path.splitext(value.name)[1].lower()
+        self.validate_name(value.name)
+        self.validate_size(value.size)
+        return value
+
+    # Utilisables séparément (ex. upload par morceaux : nom à l'ouverture, taille à chaque morceau)
+    def validate_name(self, name):
+        ext = os.path.splitext(name)[1].lower()
         if ext not in self.allowed_extensions:
             raise ValidationError(
                 _(f"Format invalide. Extensions autorisées: {', '.join(self.allowed_extensions)}")
             )
-        
-        if value.size > self.max_size:
+
+    def validate_size(self, size):
+        if size > self.max_size:
             raise ValidationError(
                 _(f"Fichier trop volumineux. Maximum: {self.max_size/1024/1024}MB")
             )
-        return value
+
+
+# Règles par champ fichier de la crèche
+FILE_VALIDATORS = {
+    'agreement_document': FileValidator(['.pdf'], 10),
+    'id_card_document': FileValidator(['.pdf', '.jpg', '.jpeg', '.png'], 5),
+    'photo_exterior': FileValidator(['.jpg', '.jpeg', '.png'], 5),
+    'photo_interior': FileValidator(['.jpg', '.jpeg', '.png'], 5),
+}
 
 class OpeningHourSerializer(serializers.ModelSerializer):
     class Meta:
@@ -45,9 +62,10 @@ class OpeningHourSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(
                     "Les horaires sont obligatoires lorsque la crèche est ouverte"
                 )
-            if attrs['open_time'] >= attrs['close_time']:
+            # Une fermeture avant l'ouverture désigne une ouverture de nuit (fermeture le lendemain)
+            if attrs['open_time'] == attrs['close_time']:
                 raise serializers.ValidationError(
-                    "L'heure d'ouverture doit être avant l'heure de fermeture"
+                    "Les heures d'ouverture et de fermeture doivent être différentes"
                 )
         
         if attrs.get('day') is None or not 0 <= attrs['day'] <= 6:
@@ -66,19 +84,19 @@ class NurserySerializer(serializers.ModelSerializer):
     
     agreement_document = serializers.FileField(
         required=False,
-        validators=[FileValidator(['.pdf'], 10)]
+        validators=[FILE_VALIDATORS['agreement_document']]
     )
     id_card_document = serializers.FileField(
         required=False,
-        validators=[FileValidator(['.pdf', '.jpg', '.jpeg', '.png'], 5)]
+        validators=[FILE_VALIDATORS['id_card_document']]
     )
     photo_exterior = serializers.ImageField(
         required=False,
-        validators=[FileValidator(['.jpg', '.jpeg', '.png'], 5)]
+        validators=[FILE_VALIDATORS['photo_exterior']]
     )
     photo_interior = serializers.ImageField(
         required=False,
-        validators=[FileValidator(['.jpg', '.jpeg', '.png'], 5)]
+        validators=[FILE_VALIDATORS['photo_interior']]
     )
     
     opening_hours = OpeningHourSerializer(
@@ -89,8 +107,8 @@ class NurserySerializer(serializers.ModelSerializer):
     class Meta:
         model = Nursery
         fields = [
-            'id', 'name', 'address', 'contact_number', 'information',
-            'max_age', 'max_children_per_class', 'legal_status',
+            'id', 'name', 'address', 'latitude', 'longitude',
+            'contact_number', 'information', 'max_age', 'max_children_per_class', 'legal_status',
             'agreement_document', 'id_card_document',
             'photo_exterior', 'photo_interior',
             'verified', 'manager_id', 'manager',
@@ -105,6 +123,37 @@ class NurserySerializer(serializers.ModelSerializer):
             )
         return value
 
+    def validate_latitude(self, value):
+        if value is not None and not -90 <= value <= 90:
+            raise serializers.ValidationError("La latitude doit être comprise entre -90 et 90")
+        return value
+
+    def validate_longitude(self, value):
+        if value is not None and not -180 <= value <= 180:
+            raise serializers.ValidationError("La longitude doit être comprise entre -180 et 180")
+        return value
+
+    def update(self, instance, validated_data):
+        # Nouvelle adresse sans coordonnées fournies : elles seront recalculées à partir de l'adresse
+        if 'address' in validated_data and not {'latitude', 'longitude'} & set(validated_data):
+            if validated_data['address'] != instance.address:
+                instance.latitude = instance.longitude = None
+        return super().update(instance, validated_data)
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChunkedUpload
+        fields = ['id', 'field', 'filename', 'size', 'offset', 'completed_at', 'created_at']
+        read_only_fields = ['id', 'offset', 'completed_at', 'created_at']
+
+    def validate(self, attrs):
+        # Extension et taille annoncée vérifiées dès l'ouverture, avant tout envoi
+        validator = FILE_VALIDATORS[attrs['field']]
+        validator.validate_name(attrs['filename'])
+        validator.validate_size(attrs['size'])
+        attrs['filename'] = os.path.basename(attrs['filename'])
+        return attrs
+
 class NurseryAssistantSerializer(serializers.ModelSerializer):
     profil_id = serializers.PrimaryKeyRelatedField(
         queryset=UserType.objects.filter(type='nursery_assistant'),
@@ -160,3 +209,42 @@ class NurseryAssistantSerializer(serializers.ModelSerializer):
             
             instance.save()
             return instance
+
+
+class StatsRequestSerializer(serializers.Serializer):
+    """
+    Période du tableau de bord : douze derniers mois par défaut.
+    """
+    start = serializers.DateField(required=False, help_text="Début (AAAA-MM-JJ)")
+    end = serializers.DateField(required=False, help_text="Fin incluse (AAAA-MM-JJ), aujourd'hui par défaut")
+    granularity = serializers.ChoiceField(
+        choices=['month', 'day'], default='month', help_text="Effectifs par mois ou par jour",
+    )
+
+    def validate(self, attrs):
+        end = attrs.get('end') or timezone.localdate()
+        start = attrs.get('start') or (end.replace(day=1) - relativedelta(months=11))
+        if start > end:
+            raise serializers.ValidationError({'start': "La date de début doit précéder la date de fin."})
+        if attrs['granularity'] == 'day' and (end - start).days > 366:
+            raise serializers.ValidationError({'start': "Une année au plus pour les effectifs journaliers."})
+        attrs.update(start=start, end=end)
+        return attrs
+
+
+class ExportRequestSerializer(serializers.Serializer):
+    background = serializers.BooleanField(
+        default=False, help_text="Construit le fichier par le worker et renvoie un lien de téléchargement",
+    )
+
+
+class FamilyImportRequestSerializer(serializers.Serializer):
+    file = serializers.FileField(help_text="Fichier CSV ou XLSX, une ligne par enfant")
+    dry_run = serializers.BooleanField(default=False, help_text="Valide le fichier sans rien enregistrer")
+
+    def validate_file(self, value):
+        extension = os.path.splitext(value.name)[1].lower()
+        if extension not in ('.csv', '.xlsx'):
+            raise serializers.ValidationError("Format non supporté (CSV ou XLSX).")
+        value.filetype = extension[1:]
+        return value
@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Nursery, OpeningHour
+from .cache import bump_list_version
+from .geo import geocode, grid_cell
+from .images import pending_fields, renditions_key
+from .tasks import refresh_photo_renditions
+from apps.core.tasks import enqueue
+from .search import INDEXED_FIELDS, index_nursery
+
+
+@receiver(pre_save, sender=Nursery)
+def update_geolocation(sender, instance, update_fields=None, **kwargs):
+    # Avec update_fields, Nursery.save ajoute les champs calculés ici à l'enregistrement
+    if update_fields and not set(Nursery.GEO_FIELDS) & set(update_fields):
+        return
+    if instance.latitude is None or instance.longitude is None:
+        instance.latitude, instance.longitude = geocode(instance.address) or (None, None)
+    instance.geo_cell = grid_cell(instance.latitude, instance.longitude)
+
+
+# La suppression de l'entrée d'index suit la crèche (CASCADE), les triggers FTS font le reste
+@receiver(post_save, sender=Nursery)
+def update_search_index(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields and not set(update_fields) & set(INDEXED_FIELDS):
+        return
+    index_nursery(instance)
+
+
+@receiver(post_save, sender=Nursery)
+def update_photo_renditions(sender, instance, raw=False, **kwargs):
+    # Génération confiée au worker, après commit
+    if not raw and pending_fields(instance):
+        enqueue(refresh_photo_renditions, instance.pk, idempotency_key=renditions_key(instance))
+
+
+@receiver(post_save, sender=Nursery)
+@receiver(post_delete, sender=Nursery)
+def invalidate_nursery_cache(sender, instance, **kwargs):
+    # Après commit : une lecture concurrente ne doit pas remettre en cache l'état d'avant
+    # sous la nouvelle version
+    transaction.on_commit(bump_list_version)
+
+
+# Les horaires font partie de la fiche : on avance `updated_at` de la crèche,
+# ce qui périme son détail en cache (et son ETag)
+@receiver(post_save, sender=OpeningHour)
+@receiver(post_delete, sender=OpeningHour)
+def touch_nursery(sender, instance, **kwargs):
+    Nursery.objects.filter(pk=instance.nursery_id).update(updated_at=timezone.now())
+    transaction.on_commit(bump_list_version)
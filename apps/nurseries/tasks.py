@@ -0,0 +1,30 @@
+from celery import shared_task
+from django.core.files.storage import default_storage
+
+from apps.core.tasks import IdempotentTask
+from .exports import build
+from .images import refresh_renditions
+
+
+@shared_task(base=IdempotentTask, autoretry_for=(OSError,), retry_backoff=True, max_retries=5)
+def delete_files(names):
+    """
+    Supprime des fichiers du stockage (documents, photos et déclinaisons d'une crèche supprimée).
+    """
+    for name in names:
+        if name and default_storage.exists(name):
+            default_storage.delete(name)
+
+
+@shared_task(base=IdempotentTask, autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def refresh_photo_renditions(nursery_id):
+    refresh_renditions(nursery_id)
+
+
+@shared_task(base=IdempotentTask, autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def build_export(nursery_id, dataset, filetype, name):
+    """
+    Construit un export volumineux dans le stockage ; le lien signé renvoyé au manager
+    répond 202 tant que le fichier n'est pas complet.
+    """
+    build(dataset, nursery_id, filetype, name)
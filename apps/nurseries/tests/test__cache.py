@@ -0,0 +1,63 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.nurseries.cache import list_version, stats
+from apps.nurseries.management.commands._seed import create_nursery
+from apps.nurseries.models import OpeningHour
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'nursery-cache-tests'}}
+
+
+@override_settings(CACHES=LOCMEM)
+class CachedReadTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nursery = create_nursery("Les Lucioles")
+
+    def get(self, route='mynursery-list', **params):
+        kwargs = {'pk': self.nursery.pk} if route == 'mynursery-detail' else {}
+        response = self.client.get(reverse(route, kwargs=kwargs), params, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_miss_then_hit(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+        # Chaque combinaison de paramètres a sa propre entrée
+        self.assertEqual(self.get(name="Luc")['X-Cache'], 'MISS')
+        self.assertEqual(stats(), {'hits': 1, 'misses': 2, 'hit_ratio': 1 / 3})
+
+    def test_list_invalidated_after_commit(self):
+        self.get()
+        version = list_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            create_nursery("Les Oursons")
+            # Tant que la transaction n'est pas validée, la version ne bouge pas
+            self.assertEqual(list_version(), version)
+            self.assertEqual(self.get()['X-Cache'], 'HIT')
+        self.assertTrue(callbacks)
+
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_detail_invalidated_by_opening_hours(self):
+        self.assertEqual(self.get('mynursery-detail')['X-Cache'], 'MISS')
+        self.assertEqual(self.get('mynursery-detail')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OpeningHour.objects.create(
+                nursery=self.nursery, day=0, open_time=datetime.time(7), close_time=datetime.time(18),
+            )
+        self.assertEqual(self.get('mynursery-detail')['X-Cache'], 'MISS')
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+    def test_open_now_not_cached(self):
+        self.assertNotIn('X-Cache', self.get(open_now=True))
+        self.assertEqual(stats()['misses'], 0)
@@ -0,0 +1,54 @@
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.nurseries import exports
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+
+
+class CellTests(SimpleTestCase):
+
+    def test_formulas_neutralised(self):
+        for value in ('=1+1', '+33 6 12', '-2', '@SUM(A1)', '\t=1'):
+            with self.subTest(value=value):
+                self.assertEqual(exports.cell(value), "'" + value)
+
+    def test_other_values_unchanged(self):
+        self.assertEqual(exports.cell('Dupont'), 'Dupont')
+        self.assertEqual(exports.cell(Decimal('-10.00')), '-10.00')
+        self.assertEqual(exports.cell(-3), -3)
+
+
+class BackgroundExportTests(APITestCase):
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        _, parents, users = seed_budget_dataset(2)
+        self.nursery_id = parents['nursery_pk']
+        token = RefreshToken.for_user(users['manager']).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def download(self, name):
+        url = reverse('nursery-export-download', kwargs={'pk': self.nursery_id, 'token': exports.download_token(name)})
+        return self.client.get(url, secure=True)
+
+    def test_partial_file_not_served(self):
+        name = exports.storage_name('classrooms', self.nursery_id, 'csv', 'partial')
+        default_storage.save(name, ContentFile(b'Classe;'))
+        self.assertEqual(self.download(name).status_code, 202)
+
+        exports.build('classrooms', self.nursery_id, 'csv', name)
+        response = self.download(name)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Capacité', b''.join(response.streaming_content).decode())
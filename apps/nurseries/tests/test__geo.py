@@ -0,0 +1,95 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.nurseries.geo import CITY_COORDINATES, GRID_COLS, KM_PER_DEGREE, distance_km, grid_cell, nearby
+from apps.nurseries.management.commands._seed import create_nursery
+from apps.nurseries.models import Nursery
+
+COTONOU = CITY_COORDINATES['cotonou']
+
+
+def names(queryset):
+    return [nursery.name for nursery in queryset]
+
+
+class GeolocationTests(TestCase):
+
+    def test_geocoded_on_create(self):
+        nursery = create_nursery("Les Lucioles")
+        self.assertEqual((nursery.latitude, nursery.longitude), COTONOU)
+        self.assertEqual(nursery.geo_cell, grid_cell(*COTONOU))
+
+    def test_partial_save_of_address_persists_coordinates(self):
+        nursery = create_nursery("Les Lucioles")
+        nursery.address = "Quartier Zongo, Parakou"
+        nursery.latitude = nursery.longitude = None
+        nursery.save(update_fields=['address'])
+
+        nursery.refresh_from_db()
+        self.assertEqual((nursery.latitude, nursery.longitude), CITY_COORDINATES['parakou'])
+        self.assertEqual(nursery.geo_cell, grid_cell(*CITY_COORDINATES['parakou']))
+
+    def test_partial_save_of_other_fields_keeps_coordinates(self):
+        nursery = create_nursery("Les Lucioles")
+        Nursery.objects.filter(pk=nursery.pk).update(latitude=7.0)
+        nursery.name = "Les Lucioles d'or"
+        nursery.save(update_fields=['name'])
+
+        nursery.refresh_from_db()
+        self.assertEqual(nursery.latitude, 7.0)
+
+
+class NearbyTests(TestCase):
+
+    def setUp(self):
+        latitude, longitude = COTONOU
+        # ~8,9 km au nord, dans la ligne de grille suivante (frontière à 6,4°)
+        create_nursery("Nord", latitude=latitude + 0.08, longitude=longitude)
+        # ~3,1 km à l'ouest, dans la colonne précédente (frontière à 2,4°)
+        create_nursery("Ouest", latitude=latitude, longitude=2.39)
+        create_nursery("Centre", latitude=latitude, longitude=longitude)
+        create_nursery("Porto-Novo", address="Porto-Novo")
+
+    def search(self, radius_km, latitude=COTONOU[0], longitude=COTONOU[1]):
+        return names(nearby(Nursery.objects.all(), latitude, longitude, radius_km))
+
+    def test_sorted_by_distance_across_cells(self):
+        self.assertEqual(self.search(10), ["Centre", "Ouest", "Nord"])
+        distances = [distance_km(nursery) for nursery in nearby(Nursery.objects.all(), *COTONOU, 10)]
+        self.assertAlmostEqual(distances[2], 0.08 * KM_PER_DEGREE, places=3)
+
+    def test_radius_bounds(self):
+        self.assertEqual(self.search(8.8), ["Centre", "Ouest"])
+        self.assertEqual(self.search(9), ["Centre", "Ouest", "Nord"])
+        self.assertEqual(self.search(3), ["Centre"])
+        self.assertEqual(self.search(20), ["Centre", "Ouest", "Nord"])
+        self.assertEqual(self.search(200)[-1], "Porto-Novo")
+
+    def test_grid_edges(self):
+        create_nursery("Antiméridien", latitude=0.0, longitude=180.0)
+        create_nursery("Avant l'antiméridien", latitude=0.0, longitude=179.95)
+        create_nursery("Pôle", latitude=90.0, longitude=0.0)
+        self.assertEqual(grid_cell(0.0, 180.0) % GRID_COLS, GRID_COLS - 1)
+
+        self.assertEqual(self.search(10, 0.0, 179.99), ["Antiméridien", "Avant l'antiméridien"])
+        self.assertEqual(self.search(10, 89.99, 0.0), ["Pôle"])
+
+
+class NearFilterTests(APITestCase):
+
+    def setUp(self):
+        create_nursery("Centre", latitude=COTONOU[0], longitude=COTONOU[1])
+
+    def get(self, **params):
+        return self.client.get(reverse('mynursery-list'), {'near': "6.3654,2.4183", **params}, secure=True)
+
+    def test_radius_validation(self):
+        self.assertEqual(self.get(radius=0).status_code, 400)
+        self.assertEqual(self.get(radius=201).status_code, 400)
+        self.assertEqual(self.get(near="91,0").status_code, 400)
+
+        response = self.get(radius=200)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.data['results']], ["Centre"])
+        self.assertEqual(response.data['results'][0]['distance'], 0)
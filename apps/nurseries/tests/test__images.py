@@ -0,0 +1,81 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.nurseries.images import pending_fields, rendition_urls, stored_files
+from apps.nurseries.management.commands._seed import create_nursery
+
+
+def image_file(name, size=(800, 400), fmt='PNG', exif=None):
+    buffer = io.BytesIO()
+    options = {'exif': exif} if exif is not None else {}
+    Image.new('RGB', size, 'orange').save(buffer, format=fmt, **options)
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+class RenditionTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.nursery = create_nursery("Les Lucioles")
+
+    def upload(self, field, content):
+        # Génération confiée au worker après commit (eager sous les tests)
+        with self.captureOnCommitCallbacks(execute=True):
+            setattr(self.nursery, field, content)
+            self.nursery.save()
+        self.nursery.refresh_from_db()
+        return self.nursery.photo_renditions.get(field)
+
+    def test_widths_and_formats(self):
+        manifest = self.upload('photo_exterior', image_file("facade.png"))
+        self.assertEqual(manifest['source'], self.nursery.photo_exterior.name)
+        for fmt, pil_format in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+            # Pas d'agrandissement : 320, 640 puis la largeur d'origine
+            self.assertEqual(sorted(manifest[fmt], key=int), ['320', '640', '800'])
+            with default_storage.open(manifest[fmt]['320']) as file:
+                image = Image.open(file)
+                self.assertEqual((image.format, image.size), (pil_format, (320, 160)))
+        self.assertEqual(pending_fields(self.nursery), [])
+
+    def test_large_image_capped(self):
+        manifest = self.upload('photo_interior', image_file("salle.png", size=(3000, 1500)))
+        self.assertEqual(sorted(manifest['webp'], key=int), ['320', '640', '1280'])
+
+    def test_exif_orientation_applied(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotation de 90°
+        manifest = self.upload('photo_exterior', image_file("portrait.jpg", size=(400, 200), fmt='JPEG', exif=exif))
+        with default_storage.open(manifest['jpeg']['200']) as file:
+            self.assertEqual(Image.open(file).size, (200, 400))
+
+    def test_replacement_removes_old_renditions(self):
+        old = self.upload('photo_exterior', image_file("facade.png"))
+        new = self.upload('photo_exterior', image_file("facade-2.png", size=(500, 250)))
+        self.assertNotEqual(old['source'], new['source'])
+        for name in old['webp'].values():
+            self.assertFalse(default_storage.exists(name))
+        self.assertTrue(all(default_storage.exists(name) for name in new['webp'].values()))
+        self.assertEqual(set(new['webp'].values()) - set(stored_files(self.nursery)), set())
+
+    def test_urls_follow_current_source(self):
+        self.upload('photo_exterior', image_file("facade.png"))
+        urls = rendition_urls(self.nursery, 'photo_exterior')
+        self.assertTrue(urls['webp']['640'].endswith('_640w.webp'))
+        # Photo changée mais pas encore déclinée : pas de liens périmés
+        self.nursery.photo_exterior.name = "nurseries/autre.png"
+        self.assertIsNone(rendition_urls(self.nursery, 'photo_exterior'))
+
+    def test_unreadable_image_skipped(self):
+        with self.assertLogs('apps.nurseries.images', level='ERROR'):
+            manifest = self.upload('photo_exterior', ContentFile(b"pas une image", name="facade.png"))
+        self.assertIsNone(manifest)
@@ -0,0 +1,78 @@
+import datetime
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.nurseries.management.commands._seed import create_nursery
+from apps.nurseries.models import OpeningHour
+from apps.nurseries.serializers import OpeningHourSerializer
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def hours(nursery, days, open_time, close_time):
+    for day in days:
+        OpeningHour.objects.create(
+            nursery=nursery, day=day, open_time=datetime.time(*open_time), close_time=datetime.time(*close_time),
+        )
+
+
+@override_settings(CACHES=NO_CACHE)
+class OpenFilterTests(APITestCase):
+
+    def setUp(self):
+        hours(create_nursery("Jour"), range(5), (7, 0), (18, 0))
+        # Nuit du dimanche : déborde sur le lundi, au-delà de la fin de semaine
+        hours(create_nursery("Nuit"), [6], (22, 0), (6, 0))
+        hours(create_nursery("Samedi soir"), [5], (20, 0), (2, 0))
+
+    def names(self, **params):
+        response = self.client.get(reverse('mynursery-list'), params, secure=True)
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(row['name'] for row in response.data['results'])
+
+    def test_open_at(self):
+        self.assertEqual(self.names(open_at="mon-08:00"), ["Jour"])
+        self.assertEqual(self.names(open_at="ven-18:00"), [])
+        self.assertEqual(self.names(open_at="sat-19:59"), [])
+        self.assertEqual(self.names(open_at="sat-23:30"), ["Samedi soir"])
+        self.assertEqual(self.names(open_at="6-01:00"), ["Samedi soir"])
+
+    def test_week_wrap_around(self):
+        self.assertEqual(self.names(open_at="sun-23:00"), ["Nuit"])
+        self.assertEqual(self.names(open_at="lun-05:59"), ["Nuit"])
+        self.assertEqual(self.names(open_at="lun-06:00"), [])
+
+    def test_open_at_rejects_invalid_values(self):
+        for value in ("mon", "xyz-08:00", "mon-24:00"):
+            response = self.client.get(reverse('mynursery-list'), {'open_at': value}, secure=True)
+            self.assertEqual(response.status_code, 400, value)
+
+    def at_utc(self, *args):
+        return mock.patch('django.utils.timezone.now',
+                          return_value=datetime.datetime(*args, tzinfo=datetime.timezone.utc))
+
+    @override_settings(NURSERY_TIME_ZONE='Africa/Porto-Novo')
+    def test_open_now_uses_nursery_time_zone(self):
+        # Dimanche 21:30 UTC = 22:30 à Porto-Novo
+        with self.at_utc(2026, 10, 18, 21, 30):
+            self.assertEqual(self.names(open_now=True), ["Nuit"])
+        # Lundi 06:30 UTC = 07:30 à Porto-Novo
+        with self.at_utc(2026, 10, 19, 6, 30):
+            self.assertEqual(self.names(open_now=True), ["Jour"])
+            self.assertEqual(len(self.names(open_now=False)), 3)
+
+
+class OpeningHourSerializerTests(APITestCase):
+
+    def validate(self, open_time, close_time):
+        return OpeningHourSerializer(data={'day': 5, 'open_time': open_time, 'close_time': close_time})
+
+    def test_overnight_range_accepted(self):
+        self.assertTrue(self.validate("20:00", "02:00").is_valid())
+        self.assertTrue(self.validate("07:00", "18:00").is_valid())
+
+    def test_empty_range_rejected(self):
+        self.assertFalse(self.validate("07:00", "07:00").is_valid())
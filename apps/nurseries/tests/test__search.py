@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from apps.nurseries.management.commands._seed import create_nursery
+from apps.nurseries.models import Nursery, NurserySearchIndex
+from apps.nurseries.search import normalize, rebuild_index, search_nurseries, tokenize
+
+
+def names(queryset):
+    return [nursery.name for nursery in queryset]
+
+
+class NormalizeTests(TestCase):
+
+    def test_accents_and_case(self):
+        self.assertEqual(normalize("Crèche ÉTOILÉE"), "creche etoilee")
+        self.assertEqual(tokenize("  Petits-Loups, Cotonou!"), ['petits', 'loups', 'cotonou'])
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        self.by_name = create_nursery("Les Lucioles", address="3 rue du Port, Ouidah", information="Jardin")
+        self.by_address = create_nursery("Arc-en-ciel", address="7 rue des Lucioles, Cotonou", information="")
+        self.by_information = create_nursery("Pomme d'Api", information="Éveil musical, lucioles en été")
+        create_nursery("Les Oursons", information="Repas bio")
+
+    def search(self, query):
+        return names(search_nurseries(Nursery.objects.all(), query))
+
+    def test_ranking_by_column_weight(self):
+        # Nom > adresse > informations
+        self.assertEqual(self.search("lucioles"), ["Les Lucioles", "Arc-en-ciel", "Pomme d'Api"])
+
+    def test_prefix_accents_and_all_terms(self):
+        self.assertEqual(self.search("LUCI"), ["Les Lucioles", "Arc-en-ciel", "Pomme d'Api"])
+        self.assertEqual(self.search("éveil lucioles"), ["Pomme d'Api"])
+        self.assertEqual(self.search("lucioles ouidah"), ["Les Lucioles"])
+        self.assertEqual(self.search("   "), names(Nursery.objects.all()))
+
+    def test_index_follows_writes(self):
+        # Triggers FTS : mise à jour et suppression de l'entrée d'index
+        self.by_name.name = "Les Coccinelles"
+        self.by_name.save()
+        self.assertEqual(self.search("coccinelles"), ["Les Coccinelles"])
+        self.assertNotIn("Les Coccinelles", self.search("lucioles"))
+
+        self.by_address.delete()
+        self.assertEqual(self.search("lucioles"), ["Pomme d'Api"])
+        self.assertFalse(NurserySearchIndex.objects.filter(nursery_id=self.by_address.pk).exists())
+
+    def test_rebuild(self):
+        NurserySearchIndex.objects.all().delete()
+        self.assertEqual(self.search("lucioles"), [])
+        self.assertEqual(rebuild_index(batch_size=2), 4)
+        self.assertEqual(self.search("lucioles"), ["Les Lucioles", "Arc-en-ciel", "Pomme d'Api"])
@@ -0,0 +1,110 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.nurseries.management.commands._seed import create_nursery
+from apps.nurseries.models import ChunkedUpload
+from apps.nurseries.uploads import OffsetMismatch, append_chunk, part_names, parts_dir
+
+CONTENT = b"%PDF-0123456789"
+
+
+class ChunkedUploadTests(APITestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.nursery = create_nursery("Les Lucioles")
+        token = RefreshToken.for_user(self.nursery.manager.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = self.client.post(
+            reverse('nursery-uploads', kwargs={'pk': self.nursery.pk}),
+            {'field': 'agreement_document', 'filename': "agrement.pdf", 'size': len(CONTENT)},
+            format='json', secure=True,
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.upload = ChunkedUpload.objects.get(pk=response.data['id'])
+        self.url = reverse('nursery-upload-chunk', kwargs={'pk': self.nursery.pk, 'upload_id': self.upload.pk})
+
+    def put(self, start, end):
+        return self.client.put(
+            self.url, CONTENT[start:end], content_type='application/octet-stream', secure=True,
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end - 1}/{len(CONTENT)}",
+        )
+
+    def finalize(self):
+        url = reverse('nursery-upload-finalize', kwargs={'pk': self.nursery.pk, 'upload_id': self.upload.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, secure=True)
+
+    def test_resume_and_complete(self):
+        self.assertEqual(self.put(0, 6).data['offset'], 6)
+        # Reprise : la position courante est donnée par GET
+        self.assertEqual(self.client.get(self.url, secure=True).data['offset'], 6)
+        self.assertEqual(self.put(6, len(CONTENT)).data['offset'], len(CONTENT))
+
+        response = self.finalize()
+        self.assertEqual(response.status_code, 200, response.data)
+        self.nursery.refresh_from_db()
+        with self.nursery.agreement_document.open('rb') as file:
+            self.assertEqual(file.read(), CONTENT)
+        self.assertEqual(part_names(self.upload), [])
+
+        self.assertEqual(self.finalize().status_code, 400)
+        self.assertEqual(self.put(0, 6).status_code, 400)
+
+    def test_offset_mismatch(self):
+        self.put(0, 6)
+        response = self.put(0, 6)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.put(8, 10).status_code, 409)
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.offset, 6)
+        self.assertEqual(len(part_names(self.upload)), 1)
+
+    def test_chunk_beyond_size_rejected(self):
+        response = self.client.put(
+            self.url, CONTENT + b"x", content_type='application/octet-stream', secure=True,
+            HTTP_CONTENT_RANGE=f"bytes 0-{len(CONTENT)}/{len(CONTENT)}",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(part_names(self.upload), [])
+
+    def test_incomplete_body_discarded(self):
+        with self.assertRaises(serializers.ValidationError):
+            append_chunk(self.upload, io.BytesIO(CONTENT[:3]), 0, 6)
+        self.upload.refresh_from_db()
+        self.assertEqual((self.upload.offset, self.upload.parts), (0, []))
+        self.assertEqual(part_names(self.upload), [])
+
+    def test_concurrent_chunk_loses_under_lock(self):
+        # Deux envois de la même position : le second a lu l'offset avant la validation du premier
+        stale = ChunkedUpload.objects.get(pk=self.upload.pk)
+        append_chunk(self.upload, io.BytesIO(CONTENT[:6]), 0, 6)
+        with self.assertRaises(OffsetMismatch):
+            append_chunk(stale, io.BytesIO(b"AAAAAA"), 0, 6)
+        self.upload.refresh_from_db()
+        self.assertEqual(part_names(self.upload), self.upload.parts)
+
+    def test_leftover_objects_ignored_and_removed(self):
+        # Reste d'une tentative abandonnée (processus interrompu avant validation)
+        leftover = default_storage.save(f"{parts_dir(self.upload)}/{0:016d}.abandon.part", ContentFile(b"XXXXXX"))
+        self.put(0, 6)
+        self.put(6, len(CONTENT))
+        self.assertEqual(self.finalize().status_code, 200)
+        self.nursery.refresh_from_db()
+        with self.nursery.agreement_document.open('rb') as file:
+            self.assertEqual(file.read(), CONTENT)
+        self.assertFalse(default_storage.exists(leftover))
@@ -0,0 +1,48 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.core.testing import QueryBudgetTestMixin
+from apps.nurseries.management.commands._seed import budget_routes, route_role, seed_budget_dataset
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+@override_settings(CACHES=NO_CACHE)
+class QueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """
+    Chaque route GET de apps/nurseries/urls.py tient le budget `query_budget` de sa vue,
+    et son nombre de requêtes ne dépend pas du nombre de lignes (pas de N+1).
+    """
+
+    def measure(self, rows, prefix):
+        objects, parents, users = seed_budget_dataset(rows, prefix=prefix)
+        tokens = {role: str(RefreshToken.for_user(user).access_token) for role, user in users.items()}
+        counts = {}
+        for basename, name, kwargs, view_class, action in budget_routes(objects, parents):
+            response = self.client.get(
+                reverse(name, kwargs=kwargs), secure=True,
+                HTTP_AUTHORIZATION=f"Bearer {tokens[route_role(basename)]}",
+            )
+            self.assertEqual(response.status_code, 200, name)
+            self.assertEndpointBudget(response)
+            counts[name] = int(response['X-Query-Count'])
+        return counts
+
+    def test_routes_within_budget(self):
+        small = self.measure(2, 'small')
+        self.assertGreater(len(small), 20)
+        self.assertEqual(self.measure(8, 'large'), small)
+
+    def test_public_detail_resolves_nursery_once(self):
+        objects, _, _ = seed_budget_dataset(3)
+        url = reverse('mynursery-detail', kwargs={'pk': objects['mynursery'].pk})
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        # Crèche, horaires, validateurs conditionnels
+        self.assertEqual(int(response['X-Query-Count']), 3)
+
+        response = self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEndpointBudget(response)
@@ -0,0 +1,180 @@
+import re
+import uuid
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from .models import ChunkedUpload
+from .serializers import FILE_VALIDATORS
+from .tasks import delete_files
+from apps.core.tasks import enqueue
+
+# Taille des blocs lus sur la requête : seul ce bloc est en mémoire, jamais le morceau entier
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class OffsetMismatch(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Le morceau ne commence pas à la position attendue."
+    default_code = 'offset_mismatch'
+
+
+class LimitedStream:
+    """
+    Lecture d'au plus `length` octets du corps de la requête, bloc par bloc.
+    Pas de seek : le stockage lit le flux une seule fois, du début à la fin.
+    """
+
+    def __init__(self, stream, length):
+        self.stream, self.size, self.received = stream, length, 0
+
+    def read(self, size=-1):
+        remaining = self.size - self.received
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        block = self.stream.read(min(size, READ_BLOCK_SIZE)) if size else b''
+        self.received += len(block)
+        return block
+
+
+class JoinedParts:
+    """
+    Morceaux stockés relus à la suite, comme un seul fichier (ouverts un par un).
+    """
+
+    def __init__(self, names, size):
+        self.names, self.size = list(names), size
+        self.current = None
+
+    def read(self, size=-1):
+        chunks = []
+        wanted = size if size is not None and size >= 0 else None
+        while wanted is None or wanted > 0:
+            if self.current is None:
+                if not self.names:
+                    break
+                self.current = default_storage.open(self.names.pop(0), 'rb')
+            block = self.current.read(READ_BLOCK_SIZE if wanted is None else min(wanted, READ_BLOCK_SIZE))
+            if not block:
+                self.current.close()
+                self.current = None
+                continue
+            chunks.append(block)
+            if wanted is not None:
+                wanted -= len(block)
+        return b''.join(chunks)
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+
+
+def parts_dir(upload):
+    return f"nurseries/{upload.nursery.upload_folder}/uploads/{upload.id}"
+
+
+def part_names(upload):
+    """
+    Tous les objets du dossier de l'envoi : morceaux validés et restes de tentatives abandonnées.
+    """
+    directory = parts_dir(upload)
+    if not default_storage.exists(directory):
+        return []
+    return [f"{directory}/{name}" for name in sorted(default_storage.listdir(directory)[1])]
+
+
+def parse_content_range(header):
+    """
+    « bytes 0-1048575/5000000 » -> (début, longueur du morceau) ; None si absent.
+    """
+    if not header:
+        return None
+    match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+|\*)', header.strip())
+    if not match:
+        raise serializers.ValidationError({'Content-Range': "Format attendu : « bytes début-fin/total »."})
+    return int(match.group(1)), int(match.group(2)) - int(match.group(1)) + 1
+
+
+def check_chunk(upload, start, length):
+    if upload.completed_at:
+        raise serializers.ValidationError("Upload déjà finalisé.")
+    if start != upload.offset:
+        raise OffsetMismatch(f"Position attendue : {upload.offset}.")
+    if start + length > upload.size:
+        raise serializers.ValidationError("Le morceau dépasse la taille annoncée.")
+    try:
+        FILE_VALIDATORS[upload.field].validate_size(start + length)
+    except DjangoValidationError as exc:
+        raise serializers.ValidationError(exc.messages)
+
+
+def append_chunk(upload, stream, start, length):
+    """
+    Enregistre `length` octets lus sur `stream` comme morceau commençant à `start`, par
+    l'API du stockage (sans accès au disque local), en revalidant la taille à chaque morceau.
+    Le corps est écrit hors transaction sous un nom propre à la tentative : le verrou ne couvre
+    que la vérification de la position et son avancement. Une tentative devancée entre-temps
+    (même position envoyée deux fois) perd son morceau et reçoit 409.
+    """
+    # Refus immédiat, avant de lire le corps ; revérifié sous verrou
+    check_chunk(upload, start, length)
+
+    body = LimitedStream(stream, length)
+    # Position sur 16 chiffres : l'ordre alphabétique des noms est celui du fichier
+    name = f"{parts_dir(upload)}/{start:016d}.{uuid.uuid4().hex}.part"
+    name = default_storage.save(name, File(body, name=name))
+    try:
+        if body.received < length:
+            raise serializers.ValidationError(f"Morceau incomplet : {body.received} octets reçus sur {length}.")
+        with transaction.atomic():
+            locked = ChunkedUpload.objects.select_for_update().get(pk=upload.pk)
+            check_chunk(locked, start, length)
+            locked.parts = [*locked.parts, name]
+            locked.offset = start + length
+            locked.save(update_fields=['parts', 'offset', 'updated_at'])
+    except Exception:
+        default_storage.delete(name)
+        raise
+    locked.nursery = upload.nursery
+    return locked
+
+
+def finalize_upload(upload):
+    """
+    Attache le fichier reçu au champ de la crèche : les morceaux sont relus à la suite par
+    l'API du stockage, jamais chargés en entier. Verrou sur l'envoi : deux finalisations
+    simultanées sont sérialisées, la seconde voit l'envoi déjà finalisé.
+    """
+    with transaction.atomic():
+        upload = ChunkedUpload.objects.select_for_update().select_related('nursery').get(pk=upload.pk)
+        if upload.completed_at:
+            raise serializers.ValidationError("Upload déjà finalisé.")
+        if upload.offset != upload.size:
+            raise serializers.ValidationError(f"Upload incomplet : {upload.offset} octets reçus sur {upload.size}.")
+
+        nursery = upload.nursery
+        previous = getattr(nursery, upload.field).name
+        content = JoinedParts(upload.parts, upload.size)
+        try:
+            getattr(nursery, upload.field).save(upload.filename, File(content, name=upload.filename), save=False)
+        finally:
+            content.close()
+        nursery.save(update_fields=[upload.field, 'updated_at'])
+
+        upload.completed_at = timezone.now()
+        upload.save(update_fields=['completed_at', 'updated_at'])
+        # Dossier de l'envoi et ancien document supprimés par le worker, une fois la finalisation validée
+        obsolete = part_names(upload) + ([previous] if previous and previous != getattr(nursery, upload.field).name else [])
+        enqueue(delete_files, obsolete)
+    return nursery
+
+
+def discard_upload(upload):
+    for name in part_names(upload):
+        default_storage.delete(name)
+    upload.delete()
@@ -1,57 +1,82 @@
-from rest_framework import viewsets, mixins, status, permissions
+import uuid
+
+from rest_framework import viewsets, mixins, status, permissions, serializers
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, JSONParser, FormParser
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.renderers import JSONRenderer
 from django_filters import rest_framework as filters
 from django.core.files.storage import default_storage
-from rest_framework.pagination import PageNumberPagination
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
 
 
 from .models import Nursery, OpeningHour, NurseryAssistant
-from .serializers import NurserySerializer, OpeningHourSerializer, NurseryAssistantSerializer
-
-
-class NurseryFilter(filters.FilterSet):
-    name = filters.CharFilter(lookup_expr='icontains', help_text="Recherche par nom (insensible à la casse)", field_name='name')
-    address = filters.CharFilter(lookup_expr='startswith', help_text="Filtre par ville exacte", field_name='address')
-    max_age = filters.NumberFilter(field_name='max_age', lookup_expr='gte', help_text="Âge maximum")
-
-    class Meta:
-        model = Nursery
-        fields = ['name', 'address', 'max_age']
-
-
-class NurseryPagination(PageNumberPagination):
-    page_size = 10 
-    page_size_query_param = 'page_size' 
-    max_page_size = 100 
+from .serializers import (
+    NurserySerializer, OpeningHourSerializer, NurseryAssistantSerializer, ChunkedUploadSerializer,
+    StatsRequestSerializer, ExportRequestSerializer, FamilyImportRequestSerializer,
+)
+from .filters import NurseryFilter, NurseryPagination
+from .geo import distance_km
+from .images import rendition_urls, stored_files
+from .tasks import delete_files, build_export
+from . import exports
+from .cache import CachedReadMixin
+from .uploads import parse_content_range, append_chunk, finalize_upload
+from apps.core.mixins import ConditionalGetMixin, EagerLoadingMixin
+from apps.core.tasks import enqueue
+from apps.core.pagination import KeysetPagination
+from apps.subscriptions import rollups
+from apps.users.imports import import_families
 
 
 class NurseryGetViewSet(
+    EagerLoadingMixin,
+    ConditionalGetMixin,
+    CachedReadMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet
 ):
     permission_classes = [permissions.AllowAny]
+    query_budget = {'list': 4, 'retrieve': 4}
     queryset = Nursery.objects.filter(manager__type='nursery_manager', verified=True)
     filter_backends = [filters.DjangoFilterBackend]
     filterset_class = NurseryFilter
     pagination_class = NurseryPagination
 
     class BasicNurserySerializer(NurserySerializer):
+        distance = serializers.SerializerMethodField()
+
         class Meta(NurserySerializer.Meta):
-            fields = ['id', 'name', 'address']
+            fields = ['id', 'name', 'address', 'distance']
+
+        def get_distance(self, obj):
+            # Présente uniquement pour une recherche par proximité (?near=)
+            distance = distance_km(obj)
+            return round(distance, 2) if distance is not None else None
 
     class DetailedNurserySerializer(NurserySerializer):
+        photo_exterior_renditions = serializers.SerializerMethodField()
+        photo_interior_renditions = serializers.SerializerMethodField()
+
         class Meta(NurserySerializer.Meta):
             fields = [
-                'id', 'name', 'address', 'contact_number', 'legal_status',
+                'id', 'name', 'address', 'latitude', 'longitude',
+                'contact_number', 'legal_status',
                 'max_age', 'max_children_per_class', 'photo_exterior',
-                'photo_interior', 'opening_hours', 'information'
+                'photo_interior', 'photo_exterior_renditions', 'photo_interior_renditions',
+                'opening_hours', 'information'
             ]
 
+        def get_photo_exterior_renditions(self, obj):
+            return rendition_urls(obj, 'photo_exterior', self.context.get('request'))
+
+        def get_photo_interior_renditions(self, obj):
+            return rendition_urls(obj, 'photo_interior', self.context.get('request'))
+
     def get_serializer_class(self):
         if self.action == 'list':
             return self.BasicNurserySerializer
@@ -60,10 +85,13 @@ class NurseryGetViewSet(
         return super().get_serializer_class()
 
 
-class NurseryViewSet(viewsets.ModelViewSet):
+class NurseryViewSet(EagerLoadingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = NurserySerializer
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, JSONParser, FormParser]
+    pagination_class = KeysetPagination
+    query_budget = {'list': 5, 'retrieve': 4, 'opening_hours': 3, 'upload_chunk': 8, 'stats': 4,
+                    'export': 3, 'export_download': 2}
     queryset = Nursery.objects.all()
 
     def get_queryset(self):
@@ -124,26 +152,153 @@ class NurseryViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def get_managed_nursery(self):
+        nursery = self.get_object()
+        if nursery.manager.user != self.request.user and not self.request.user.is_staff:
+            raise PermissionDenied("Permission refusée.")
+        return nursery
+
+    @action(detail=True, methods=['GET'])
+    def stats(self, request, pk=None):
+        """
+        Tableau de bord du manager (?start=&end=&granularity=month|day) : chiffre d'affaires
+        par mois et par plan, effectif de chaque classe. Lu dans les agrégats uniquement.
+        """
+        # Crèches du manager (toutes pour le staff), sans le préchargement du serializer
+        nursery = get_object_or_404(self.get_queryset().only('pk'), pk=pk)
+        params = StatsRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end = params.validated_data['start'], params.validated_data['end']
+        return Response({
+            'nursery': nursery.pk,
+            'start': start,
+            'end': end,
+            'revenue': rollups.revenue_report(nursery.pk, start, end),
+            'enrolment': rollups.enrolment_report(nursery.pk, start, end, params.validated_data['granularity']),
+        })
+
+    @action(
+        detail=True, methods=['GET'],
+        url_path=r'export/(?P<dataset>subscriptions|children|classrooms)\.(?P<filetype>csv|xlsx)',
+        renderer_classes=[JSONRenderer, exports.CSVRenderer, exports.XLSXRenderer],
+    )
+    def export(self, request, pk=None, dataset=None, filetype=None):
+        """
+        Export des souscriptions, des enfants inscrits ou des classes de la crèche.
+        Le CSV est produit en streaming ; avec ?background=true, le fichier est construit par
+        le worker et la réponse 202 donne un lien signé, valable 24 h.
+        """
+        nursery = get_object_or_404(self.get_queryset().only('pk'), pk=pk)
+        params = ExportRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        if not params.validated_data['background']:
+            return exports.export_response(dataset, nursery.pk, filetype)
+
+        name = exports.storage_name(dataset, nursery.pk, filetype, uuid.uuid4().hex)
+        enqueue(build_export, nursery.pk, dataset, filetype, name, idempotency_key=f"export:{name}")
+        url = self.reverse_action('export-download', kwargs={'pk': nursery.pk, 'token': exports.download_token(name)})
+        return Response({'status': 'pending', 'url': url}, status=status.HTTP_202_ACCEPTED)
+
+    @action(
+        detail=True, methods=['GET'], url_path=r'exports/(?P<token>[\w.:-]+)', url_name='export-download',
+        renderer_classes=[JSONRenderer, exports.CSVRenderer, exports.XLSXRenderer],
+    )
+    def export_download(self, request, pk=None, token=None):
+        nursery = get_object_or_404(self.get_queryset().only('pk'), pk=pk)
+        name = exports.read_token(token, nursery.pk)
+        if name is None:
+            raise NotFound("Lien de téléchargement invalide ou expiré.")
+        if not exports.is_ready(name):
+            return Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
+        filetype = name.rsplit('.', 1)[-1]
+        return FileResponse(
+            default_storage.open(name), as_attachment=True, filename=name.rsplit('/', 1)[-1],
+            content_type=exports.CONTENT_TYPES[filetype],
+        )
+
+    @action(detail=True, methods=['POST'], url_path='import/families', parser_classes=[MultiPartParser])
+    def import_families(self, request, pk=None):
+        """
+        Import des familles (parents et enfants) d'un fichier CSV ou XLSX, une ligne par enfant.
+        Rapport : compteurs, erreurs par ligne, adresses des parents invités ; chaque parent
+        reçoit par e-mail son lien pour choisir son mot de passe (invitation/).
+        """
+        nursery = get_object_or_404(self.get_queryset().only('pk'), pk=pk)
+        serializer = FamilyImportRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        report = import_families(upload, upload.filetype, nursery.pk, dry_run=serializer.validated_data['dry_run'])
+        return Response(report, status=status.HTTP_200_OK if report['dry_run'] else status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['POST'], url_path='uploads', parser_classes=[JSONParser])
+    def uploads(self, request, pk=None):
+        """
+        Ouvre un envoi par morceaux d'un document : {"field", "filename", "size"}.
+        Les morceaux sont ensuite envoyés en PUT sur uploads/{id}/ puis l'envoi est finalisé.
+        """
+        nursery = self.get_managed_nursery()
+        serializer = ChunkedUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.save(nursery=nursery)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['GET', 'PUT'], url_path=r'uploads/(?P<upload_id>[0-9a-f-]{36})')
+    def upload_chunk(self, request, pk=None, upload_id=None):
+        """
+        GET : état de l'envoi (position à laquelle reprendre).
+        PUT : corps brut du morceau, position donnée par Content-Range (ou ?offset=) ;
+        le corps est lu par blocs, jamais chargé en entier en mémoire.
+        """
+        nursery = self.get_managed_nursery()
+        upload = get_object_or_404(nursery.chunked_uploads, pk=upload_id)
+        if request.method == 'GET':
+            return Response(ChunkedUploadSerializer(upload).data)
+
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length <= 0:
+            raise serializers.ValidationError({'Content-Length': "En-tête requis et non nul."})
+        content_range = parse_content_range(request.META.get('HTTP_CONTENT_RANGE'))
+        if content_range is not None:
+            start, range_length = content_range
+            if range_length != length:
+                raise serializers.ValidationError({'Content-Range': "Ne correspond pas à Content-Length."})
+        else:
+            try:
+                start = int(request.query_params.get('offset', upload.offset))
+            except ValueError:
+                raise serializers.ValidationError({'offset': "Entier attendu."})
+
+        upload = append_chunk(upload, request.stream, start, length)
+        return Response(ChunkedUploadSerializer(upload).data)
+
+    @action(detail=True, methods=['POST'], url_path=r'uploads/(?P<upload_id>[0-9a-f-]{36})/finalize')
+    def upload_finalize(self, request, pk=None, upload_id=None):
+        nursery = self.get_managed_nursery()
+        upload = get_object_or_404(nursery.chunked_uploads, pk=upload_id)
+        nursery = finalize_upload(upload)
+        return Response(NurserySerializer(nursery, context=self.get_serializer_context()).data)
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        
-        # Suppression des fichiers associés
-        for field in ['agreement_document', 'id_card_document', 
-                     'photo_exterior', 'photo_interior']:
-            file = getattr(instance, field)
-            if file and default_storage.exists(file.name):
-                default_storage.delete(file.path)
-        
-        return super().destroy(request, *args, **kwargs)
+        names = stored_files(instance)
+        response = super().destroy(request, *args, **kwargs)
+
+        # Suppression des fichiers associés par le worker, une fois la suppression validée
+        enqueue(delete_files, names, idempotency_key=f"nursery-files:{instance.upload_folder}")
+        return response
 
 
-class NurseryAssistantViewSet(viewsets.ModelViewSet):
+class NurseryAssistantViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = NurseryAssistantSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'list': 3, 'retrieve': 2}
     
     def get_queryset(self):
         nursery_pk = self.kwargs.get('nursery_pk')
-        return NurseryAssistant.objects.filter(nursery_id=nursery_pk)
+        return NurseryAssistant.objects.filter(nursery_id=nursery_pk).order_by('pk')
 
     def perform_create(self, serializer):
         nursery_id = self.kwargs.get("nursery_pk")
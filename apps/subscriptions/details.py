@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.utils import timezone
+
+from apps.classrooms import occupancy
+from .models import Subscription, SubscriptionDetail
+from .signals import occupancy_managed
+
+# Champs d'un détail fournis par le client (l'enfant sert de clé)
+PLACEMENT_FIELDS = ('classroom', 'group')
+
+
+def placement(detail):
+    return tuple(getattr(detail, f'{field}_id') for field in PLACEMENT_FIELDS)
+
+
+def sync(subscription, details_data):
+    """
+    Aligne les détails de la souscription sur `details_data` (dicts validés : child, classroom,
+    group), enfant par enfant : création des nouveaux, mise à jour des placements changés,
+    suppression des absents ; les lignes inchangées ne sont pas réécrites.
+    Nombre de requêtes constant (hors mises à jour d'effectifs, une par classe ou groupe touché).
+    Retourne (rapport par enfant, détails finaux).
+    """
+    wanted = {detail['child'].pk: detail for detail in details_data}
+    with transaction.atomic():
+        existing = {
+            detail.child_id: detail
+            for detail in SubscriptionDetail.objects.select_for_update()
+            .filter(subscription=subscription)
+            .only('id', 'subscription_id', 'child_id', 'classroom_id', 'group_id', 'is_valide')
+        }
+        created, updated, unchanged, previous = [], [], [], []
+        now = timezone.now()
+        for child_id, data in wanted.items():
+            detail = existing.get(child_id)
+            if detail is None:
+                created.append(SubscriptionDetail(subscription=subscription, **data))
+                continue
+            before = placement(detail)
+            after = tuple(data.get(field) and data[field].pk for field in PLACEMENT_FIELDS)
+            if before == after:
+                unchanged.append(detail)
+                continue
+            previous.append(SubscriptionDetail(classroom_id=before[0], group_id=before[1], is_valide=detail.is_valide))
+            detail.classroom_id, detail.group_id = after
+            detail.updated_at = now
+            updated.append(detail)
+        deleted = [detail for child_id, detail in existing.items() if child_id not in wanted]
+
+        if deleted:
+            token = occupancy_managed.set(True)
+            try:
+                SubscriptionDetail.objects.filter(pk__in=[detail.pk for detail in deleted]).delete()
+            finally:
+                occupancy_managed.reset(token)
+        if updated:
+            SubscriptionDetail.objects.bulk_update(updated, ['classroom', 'group', 'updated_at'])
+        if created:
+            created = SubscriptionDetail.objects.bulk_create(created)
+        # Effectifs : variation nette en une passe ; un enfant qui reste dans sa classe
+        # n'est ni libéré ni réinscrit, même si elle est pleine. Une souscription déjà
+        # renouvelée ne compte plus (voir occupancy.actual_counts)
+        if not Subscription.objects.filter(renewed_from=subscription).exists():
+            occupancy.replace(previous + deleted, updated + created)
+
+    report = {
+        'created': [detail.child_id for detail in created],
+        'updated': [detail.child_id for detail in updated],
+        'deleted': [detail.child_id for detail in deleted],
+        'unchanged': len(unchanged),
+    }
+    return report, unchanged + updated + created
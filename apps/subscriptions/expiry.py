@@ -0,0 +1,65 @@
+import logging
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.classrooms import occupancy
+from .models import Subscription, SubscriptionDetail
+
+logger = logging.getLogger(__name__)
+
+
+def expired(today):
+    # Servi par l'index (is_active, end_date) ; la date de fin est incluse dans la souscription
+    return Subscription.objects.filter(is_active=True, end_date__lt=today)
+
+
+def expire(today=None, batch_size=5000, dry_run=False):
+    """
+    Désactive les souscriptions dont la date de fin est passée et invalide leurs détails,
+    par lots : chaque lot lit au plus `batch_size` clés en tête de l'index puis applique
+    quelques UPDATE ensemblistes (détails, souscriptions, effectifs des classes et groupes
+    touchés). Les lignes traitées sortent de l'index : le coût d'un lot ne dépend pas du
+    volume déjà expiré. Retourne les métriques du passage.
+    """
+    today = today or timezone.localdate()
+    started = time.perf_counter()
+    metrics = {'subscriptions': 0, 'details': 0, 'classrooms': 0, 'groups': 0, 'batches': 0}
+    touched_classrooms, touched_groups = set(), set()
+    if dry_run:
+        metrics['subscriptions'] = expired(today).count()
+        metrics['details'] = SubscriptionDetail.objects.filter(
+            subscription__in=expired(today), is_valide=True,
+        ).count()
+    else:
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    expired(today).order_by('end_date', 'pk').select_for_update()
+                    .values_list('pk', flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+                details = SubscriptionDetail.objects.filter(subscription_id__in=ids, is_valide=True)
+                placements = set(details.values_list('classroom_id', 'group_id').distinct())
+                now = timezone.now()
+                metrics['details'] += details.update(is_valide=False, updated_at=now)
+                metrics['subscriptions'] += Subscription.objects.filter(pk__in=ids).update(
+                    is_active=False, updated_at=now,
+                )
+                # UPDATE ensemblistes sans signaux : effectifs recalculés pour les classes touchées
+                classrooms = {classroom_id for classroom_id, _ in placements if classroom_id}
+                groups = {group_id for _, group_id in placements if group_id}
+                occupancy.recount(classrooms, groups)
+                touched_classrooms |= classrooms
+                touched_groups |= groups
+                metrics['batches'] += 1
+        metrics['classrooms'], metrics['groups'] = len(touched_classrooms), len(touched_groups)
+    metrics['duration_ms'] = round((time.perf_counter() - started) * 1000)
+    logger.info(
+        "Expiration des souscriptions (%s%s) : %s",
+        today.isoformat(), ", simulation" if dry_run else "",
+        " ".join(f"{key}={value}" for key, value in metrics.items()),
+    )
+    return metrics
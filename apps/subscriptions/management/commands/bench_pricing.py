@@ -0,0 +1,67 @@
+import datetime
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.children.models import Child
+from apps.nurseries.management.commands._seed import seed_nurseries
+from apps.subscriptions import pricing
+from apps.subscriptions.models import Plan, Subscription, SubscriptionDetail
+from apps.users.models import UserType
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le recalcul des prix d'un grand nombre de souscriptions "
+        "(les données sont annulées à la fin)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscriptions', type=int, default=100000)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(11)
+        today = datetime.date.today()
+        count, batch_size = options['subscriptions'], options['batch_size']
+
+        with transaction.atomic():
+            nursery = seed_nurseries(1, prefix='pricing_manager')[0]
+            plans = [
+                Plan.objects.create(nursery=nursery, name=duration, price=rng.randint(5000, 90000), duration=duration)
+                for duration in ['day', 'week', 'month', 'quarter', 'semester', 'year']
+            ]
+            parent = UserType.objects.create(user=User.objects.create(username="pricing_parent"), type='parent')
+            children = Child.objects.bulk_create([
+                Child(parent=parent, first_name=f"Enfant {i}", last_name="Tarif", birthday=today)
+                for i in range(3)
+            ])
+            for offset in range(0, count, batch_size):
+                subscriptions = []
+                for _ in range(min(batch_size, count - offset)):
+                    start = today - datetime.timedelta(days=rng.randint(0, 700))
+                    end = start + datetime.timedelta(days=rng.randint(0, 500)) if rng.random() < 0.7 else None
+                    subscriptions.append(
+                        Subscription(parent=parent, plan=rng.choice(plans), start_date=start, end_date=end)
+                    )
+                subscriptions = Subscription.objects.bulk_create(subscriptions)
+                SubscriptionDetail.objects.bulk_create([
+                    SubscriptionDetail(subscription=subscription, child=child)
+                    for subscription in subscriptions
+                    for child in children[:rng.randint(1, 3)]
+                ], batch_size=batch_size)
+            self.stdout.write(f"{count} souscriptions, {len(plans)} plans")
+
+            queryset = Subscription.objects.filter(plan__nursery=nursery)
+            for label, dry_run in [("simulation", True), ("recalcul", False), ("recalcul (inchangé)", False)]:
+                start = time.perf_counter()
+                result = pricing.reprice(queryset, batch_size=batch_size, dry_run=dry_run)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{label:<22} {elapsed:7.2f} s  {result['checked'] / elapsed:10.0f} lignes/s  "
+                    f"{result['repriced']} modifiées"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,26 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from apps.subscriptions.expiry import expire
+
+
+class Command(BaseCommand):
+    help = (
+        "Désactive les souscriptions dont la date de fin est passée et invalide leurs détails "
+        "(exécuté aussi chaque nuit par le worker)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=datetime.date.fromisoformat, help="Date du jour (AAAA-MM-JJ)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help="Compte sans modifier")
+
+    def handle(self, *args, **options):
+        metrics = expire(options['date'], batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = "à expirer" if options['dry_run'] else "expirée(s)"
+        self.stdout.write(self.style.SUCCESS(
+            f"{metrics['subscriptions']} souscription(s) {verb} ({metrics['details']} détail(s)), "
+            f"{metrics['classrooms']} classe(s) et {metrics['groups']} groupe(s) recomptés "
+            f"en {metrics['batches']} lot(s), {metrics['duration_ms']} ms."
+        ))
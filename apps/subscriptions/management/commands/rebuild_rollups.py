@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.subscriptions.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les agrégats du tableau de bord : chiffre d'affaires mensuel par plan "
+        "et effectif du jour de chaque classe"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nursery', type=int, help="Limiter à une crèche")
+
+    def handle(self, *args, **options):
+        result = rebuild(options['nursery'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['revenues']} ligne(s) de chiffre d'affaires, {result['classrooms']} classe(s) relevée(s)."
+        ))
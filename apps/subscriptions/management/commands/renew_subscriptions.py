@@ -0,0 +1,28 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from apps.subscriptions.renewal import renew
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconduit pour la période suivante les souscriptions des plans récurrents qui se terminent "
+        "bientôt (exécuté aussi chaque nuit par le worker)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=datetime.date.fromisoformat, help="Date du jour (AAAA-MM-JJ)")
+        parser.add_argument('--window', type=int, default=7, help="Jours avant la fin de la période")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Compte sans créer")
+
+    def handle(self, *args, **options):
+        metrics = renew(
+            options['date'], window=options['window'], batch_size=options['batch_size'], dry_run=options['dry_run'],
+        )
+        verb = "à renouveler" if options['dry_run'] else "renouvelée(s)"
+        self.stdout.write(self.style.SUCCESS(
+            f"{metrics['subscriptions']} souscription(s) {verb} ({metrics['details']} détail(s)), "
+            f"{metrics['skipped']} sans enfant inscrit, en {metrics['batches']} lot(s), {metrics['duration_ms']} ms."
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 18:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0008_subscription_expiry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscription',
+            name='renewed_from',
+            field=models.OneToOneField(blank=True, help_text='Souscription de la période précédente (renouvellement automatique)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='renewal', to='subscriptions.subscription'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 18:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0010_chunkedupload'),
+        ('subscriptions', '0009_subscription_renewed_from'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPlanRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='Premier jour du mois')),
+                ('subscriptions', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('nursery', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_revenues', to='nurseries.nursery')),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_revenues', to='subscriptions.plan')),
+            ],
+            options={
+                'verbose_name': "Chiffre d'affaires mensuel",
+                'verbose_name_plural': "Chiffres d'affaires mensuels",
+                'indexes': [models.Index(fields=['nursery', 'month'], name='revenue_nursery_month')],
+                'unique_together': {('plan', 'month')},
+            },
+        ),
+    ]
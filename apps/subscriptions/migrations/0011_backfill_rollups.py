@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-18 21:40
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    # Même calcul que rollups.rebuild : les agrégats ne sont tenus que pour les écritures
+    # postérieures à leur création
+    Subscription = apps.get_model('subscriptions', 'Subscription')
+    MonthlyPlanRevenue = apps.get_model('subscriptions', 'MonthlyPlanRevenue')
+    Classroom = apps.get_model('classrooms', 'Classroom')
+    ClassroomDailyEnrolment = apps.get_model('classrooms', 'ClassroomDailyEnrolment')
+
+    rows = (
+        Subscription.objects.order_by()
+        .annotate(month=TruncMonth('start_date'))
+        .values('plan__nursery_id', 'plan_id', 'month')
+        .annotate(subscriptions=Count('pk'), revenue=Sum('price'))
+    )
+    MonthlyPlanRevenue.objects.all().delete()
+    MonthlyPlanRevenue.objects.bulk_create([
+        MonthlyPlanRevenue(
+            nursery_id=row['plan__nursery_id'], plan_id=row['plan_id'], month=row['month'],
+            subscriptions=row['subscriptions'], revenue=row['revenue'],
+        )
+        for row in rows
+    ], batch_size=2000)
+
+    today = timezone.localdate()
+    ClassroomDailyEnrolment.objects.bulk_create(
+        [
+            ClassroomDailyEnrolment(classroom_id=pk, nursery_id=nursery_id, date=today, children=children)
+            for pk, nursery_id, children in Classroom.objects.values_list('pk', 'nursery_id', 'nbr_children')
+        ],
+        batch_size=2000, update_conflicts=True, unique_fields=['classroom', 'date'], update_fields=['children'],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classrooms', '0004_classroomdailyenrolment'),
+        ('subscriptions', '0010_monthlyplanrevenue'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -47,6 +47,10 @@ class Subscription(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00,
                                 help_text="Prix de la souscription (sera calculé automatiquement en fonction du plan)")
     is_active = models.BooleanField(default=True)
+    renewed_from = models.OneToOneField(
+        'self', null=True, blank=True, on_delete=models.SET_NULL, related_name='renewal',
+        help_text="Souscription de la période précédente (renouvellement automatique)",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -54,6 +58,10 @@ class Subscription(models.Model):
         verbose_name = "Souscription"
         verbose_name_plural = "Souscriptions"
         ordering = ['-start_date']
+        indexes = [
+            # Expiration : souscriptions actives dont la date de fin est passée
+            models.Index(fields=['is_active', 'end_date'], name='subscription_expiry'),
+        ]
 
     def __str__(self):
         return f"Souscription #{self.id} - {self.plan.name} ({self.parent})"
@@ -96,3 +104,26 @@ class SubscriptionDetail(models.Model):
 
     def __str__(self):
         return f"{self.child} dans {self.classroom} ({self.group})"
+
+
+class MonthlyPlanRevenue(models.Model):
+    """
+    Chiffre d'affaires d'un plan par mois de début des souscriptions (agrégat tenu par
+    apps.subscriptions.rollups à chaque écriture de souscription).
+    """
+    nursery = models.ForeignKey(Nursery, on_delete=models.CASCADE, related_name='monthly_revenues')
+    plan = models.ForeignKey(Plan, on_delete=models.CASCADE, related_name='monthly_revenues')
+    month = models.DateField(help_text="Premier jour du mois")
+    subscriptions = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Chiffre d'affaires mensuel"
+        verbose_name_plural = "Chiffres d'affaires mensuels"
+        unique_together = ('plan', 'month')
+        indexes = [
+            models.Index(fields=['nursery', 'month'], name='revenue_nursery_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.plan_id} {self.month:%Y-%m} : {self.revenue}"
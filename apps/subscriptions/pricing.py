@@ -0,0 +1,150 @@
+import datetime
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import rollups
+from .models import Subscription
+
+CENT = Decimal('0.01')
+
+# Durée d'une période de facturation ; 'none' : plan sans échéance, facturé une fois
+PERIODS = {
+    'day': relativedelta(days=1),
+    'week': relativedelta(weeks=1),
+    'month': relativedelta(months=1),
+    'quarter': relativedelta(months=3),
+    'semester': relativedelta(months=6),
+    'year': relativedelta(years=1),
+}
+
+
+@dataclass(frozen=True)
+class Quote:
+    price: Decimal
+    end_date: datetime.date | None
+    periods: Decimal
+
+
+def period_start(start_date, duration, index):
+    # Toujours calculé depuis la date de début : le 31 janvier + 2 mois donne le 31 mars
+    return start_date + PERIODS[duration] * index
+
+
+def current_period(start_date, duration, stop):
+    """
+    (nombre de périodes complètes avant stop (exclusif), début et fin exclusive de la
+    période en cours). En temps constant : calcul direct pour les jours et semaines,
+    estimation par les mois ajustée d'une période au plus sinon.
+    """
+    period = PERIODS[duration]
+    months = period.years * 12 + period.months
+    if not months:
+        length = period.days  # relativedelta(weeks=1) est stocké en jours
+        full = max((stop - start_date).days // length, 0)
+        begin = start_date + datetime.timedelta(days=full * length)
+        return full, begin, begin + datetime.timedelta(days=length)
+    full = max(((stop.year - start_date.year) * 12 + stop.month - start_date.month) // months, 0)
+    begin = period_start(start_date, duration, full)
+    while full > 0 and begin > stop:
+        full -= 1
+        begin = period_start(start_date, duration, full)
+    following = period_start(start_date, duration, full + 1)
+    while following <= stop:
+        full, begin = full + 1, following
+        following = period_start(start_date, duration, full + 1)
+    return full, begin, following
+
+
+def quote(unit_price, duration, start_date, children, end_date=None):
+    """
+    Prix d'une souscription : prix du plan × nombre d'enfants × nombre de périodes.
+    - sans date de fin : une période complète, la date de fin (incluse) est calculée
+    - avec date de fin : périodes complètes, puis la dernière période entamée au prorata
+      des jours couverts (sur la longueur réelle de cette période : 28 à 31 jours pour un mois)
+    Calcul en Decimal, arrondi au centime le plus proche.
+    """
+    unit_price = Decimal(unit_price)
+    if duration not in PERIODS:
+        return Quote((unit_price * children).quantize(CENT, ROUND_HALF_UP), end_date, Decimal(1))
+    if end_date is None:
+        end_date = period_start(start_date, duration, 1) - datetime.timedelta(days=1)
+        return Quote((unit_price * children).quantize(CENT, ROUND_HALF_UP), end_date, Decimal(1))
+
+    stop = end_date + datetime.timedelta(days=1)  # fin exclusive
+    full, begin, following = current_period(start_date, duration, stop)
+    periods = Decimal(full)
+    if begin < stop:
+        periods += Decimal((stop - begin).days) / Decimal((following - begin).days)
+    price = (unit_price * children * periods).quantize(CENT, ROUND_HALF_UP)
+    return Quote(price, end_date, periods.quantize(Decimal('0.0001'), ROUND_HALF_UP))
+
+
+def children_count():
+    # Tous les enfants inscrits : l'expiration invalide les détails, pas ce qui a été facturé
+    return Count('details')
+
+
+def reprice(queryset, batch_size=2000, dry_run=False):
+    """
+    Recalcule prix et date de fin des souscriptions du queryset depuis leur plan.
+    Lecture en une passe (valeurs brutes, nombre d'enfants agrégé), écriture des seules
+    lignes modifiées : {'checked': n, 'repriced': n}.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(children=children_count())
+        .values_list(
+            'pk', 'plan__nursery_id', 'plan_id', 'plan__price', 'plan__duration',
+            'start_date', 'end_date', 'price', 'children',
+        )
+    )
+    checked, changed, added, removed = 0, [], [], []
+    for row in rows.iterator(chunk_size=batch_size):
+        pk, nursery_id, plan_id, unit_price, duration, start_date, end_date, price, children = row
+        checked += 1
+        result = quote(unit_price, duration, start_date, children, end_date)
+        if result.price != price or result.end_date != end_date:
+            changed.append((pk, result.price, result.end_date))
+            if result.price != price:
+                removed.append(rollups.contribution(nursery_id, plan_id, start_date, price))
+                added.append(rollups.contribution(nursery_id, plan_id, start_date, result.price))
+    if changed and not dry_run:
+        with transaction.atomic():
+            write(changed, batch_size)
+            # UPDATE hors save() : agrégats de chiffre d'affaires ajustés explicitement
+            rollups.record(added, removed)
+    return {'checked': checked, 'repriced': len(changed)}
+
+
+def write(changed, batch_size):
+    """
+    Enregistre des (pk, prix, date de fin) par une requête UPDATE paramétrée exécutée en lot
+    (executemany) : bulk_update construit un CASE WHEN par ligne, dix fois plus lent ici.
+    updated_at est fourni (pas d'auto_now hors save()) pour périmer les ETags des souscriptions.
+    """
+    meta = Subscription._meta
+    fields = [meta.get_field(name) for name in ('price', 'end_date', 'updated_at')]
+    connection = connections[router.db_for_write(Subscription)]
+    quote_name = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        quote_name(meta.db_table),
+        ', '.join(f'{quote_name(field.column)} = %s' for field in fields),
+        quote_name(meta.pk.column),
+    )
+    now = timezone.now()
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for offset in range(0, len(changed), batch_size):
+            cursor.executemany(sql, [
+                [
+                    fields[0].get_db_prep_save(price, connection),
+                    fields[1].get_db_prep_save(end_date, connection),
+                    fields[2].get_db_prep_save(now, connection),
+                    pk,
+                ]
+                for pk, price, end_date in changed[offset:offset + batch_size]
+            ])
@@ -0,0 +1,107 @@
+import datetime
+import logging
+import time
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.classrooms import occupancy
+from . import pricing, rollups
+from .models import Subscription, SubscriptionDetail
+
+logger = logging.getLogger(__name__)
+
+# Plans reconduits automatiquement à la fin de chaque période
+RECURRING_DURATIONS = ('month', 'quarter', 'semester', 'year')
+
+
+def due(today, window):
+    """
+    Souscriptions actives d'un plan récurrent (toujours proposé) se terminant d'ici
+    `window` jours et pas encore renouvelées : le lien renewed_from (unique) rend le
+    renouvellement idempotent par période.
+    """
+    return Subscription.objects.filter(
+        is_active=True, end_date__gte=today, end_date__lte=today + datetime.timedelta(days=window),
+        plan__is_active=True, plan__duration__in=RECURRING_DURATIONS, renewal__isnull=True,
+    )
+
+
+def renew(today=None, window=7, batch_size=1000, dry_run=False):
+    """
+    Reconduit les souscriptions dues pour la période suivante (début le lendemain de la fin,
+    prix et date de fin recalculés depuis le plan), avec leurs détails valides.
+    Une transaction courte par lot : lecture des souscriptions (pagination par clé sur
+    (end_date, id)) et de leurs détails, deux bulk_create, recomptage des classes touchées.
+    La place de l'enfant passe au renouvellement : il reste compté une seule fois dans
+    l'effectif (voir occupancy.actual_counts). Retourne les métriques du passage.
+    """
+    today = today or timezone.localdate()
+    started = time.perf_counter()
+    metrics = {'subscriptions': 0, 'details': 0, 'skipped': 0, 'batches': 0}
+    queryset = due(today, window)
+    if dry_run:
+        metrics['subscriptions'] = queryset.count()
+        metrics['details'] = SubscriptionDetail.objects.filter(subscription__in=queryset, is_valide=True).count()
+    last = None
+    while not dry_run:
+        with transaction.atomic():
+            batch = queryset.order_by('end_date', 'pk')
+            if last is not None:
+                batch = batch.filter(Q(end_date__gt=last[0]) | Q(end_date=last[0], pk__gt=last[1]))
+            rows = list(
+                batch.select_for_update(of=('self',))
+                .values_list(
+                    'pk', 'parent_id', 'plan_id', 'end_date', 'plan__price', 'plan__duration', 'plan__nursery_id',
+                )[:batch_size]
+            )
+            if not rows:
+                break
+            last = (rows[-1][3], rows[-1][0])
+            placements = {}
+            for subscription_id, child_id, classroom_id, group_id in (
+                SubscriptionDetail.objects.filter(subscription_id__in=[row[0] for row in rows], is_valide=True)
+                .values_list('subscription_id', 'child_id', 'classroom_id', 'group_id')
+            ):
+                placements.setdefault(subscription_id, []).append((child_id, classroom_id, group_id))
+
+            renewals, nurseries = [], {}
+            for pk, parent_id, plan_id, end_date, unit_price, duration, nursery_id in rows:
+                nurseries[plan_id] = nursery_id
+                if pk not in placements:
+                    # Plus aucun enfant inscrit : rien à reconduire
+                    metrics['skipped'] += 1
+                    continue
+                start_date = end_date + datetime.timedelta(days=1)
+                result = pricing.quote(unit_price, duration, start_date, len(placements[pk]))
+                renewals.append(Subscription(
+                    parent_id=parent_id, plan_id=plan_id, start_date=start_date,
+                    end_date=result.end_date, price=result.price, renewed_from_id=pk,
+                ))
+            renewals = Subscription.objects.bulk_create(renewals, batch_size=batch_size)
+            details = SubscriptionDetail.objects.bulk_create([
+                SubscriptionDetail(subscription=renewal, child_id=child_id, classroom_id=classroom_id, group_id=group_id)
+                for renewal in renewals
+                for child_id, classroom_id, group_id in placements[renewal.renewed_from_id]
+            ], batch_size=batch_size)
+            rollups.record(added=[
+                rollups.contribution(nurseries[renewal.plan_id], renewal.plan_id, renewal.start_date, renewal.price)
+                for renewal in renewals
+            ])
+            # Recomptage plutôt qu'inscription : la capacité n'est pas revérifiée pour un
+            # enfant qui garde sa place, la souscription renouvelée ne compte plus
+            occupancy.recount(
+                {detail.classroom_id for detail in details if detail.classroom_id},
+                {detail.group_id for detail in details if detail.group_id},
+            )
+            metrics['subscriptions'] += len(renewals)
+            metrics['details'] += len(details)
+            metrics['batches'] += 1
+    metrics['duration_ms'] = round((time.perf_counter() - started) * 1000)
+    logger.info(
+        "Renouvellement des souscriptions (%s, %s jour(s)%s) : %s",
+        today.isoformat(), window, ", simulation" if dry_run else "",
+        " ".join(f"{key}={value}" for key, value in metrics.items()),
+    )
+    return metrics
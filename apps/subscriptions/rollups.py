@@ -0,0 +1,174 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncMonth
+
+from apps.classrooms import occupancy
+from apps.classrooms.models import Classroom, ClassroomDailyEnrolment
+from .models import MonthlyPlanRevenue, Subscription
+
+# Chiffre d'affaires mensuel par plan (MonthlyPlanRevenue), tenu à jour par variations :
+# signaux de Subscription pour les écritures unitaires, appels explicites pour les écritures
+# groupées (bulk_create, recalcul des prix). Les effectifs journaliers des classes sont
+# tenus par apps.classrooms.occupancy.
+
+
+def month_of(date):
+    return date.replace(day=1)
+
+
+def contribution(nursery_id, plan_id, start_date, price):
+    """
+    (clé de l'agrégat, (souscriptions, chiffre d'affaires)) d'une souscription.
+    """
+    return (nursery_id, plan_id, month_of(start_date)), (1, Decimal(price))
+
+
+def apply(deltas):
+    """
+    Applique des variations {(crèche, plan, mois): [souscriptions, chiffre d'affaires]}.
+    Les lignes manquantes sont créées pour toute hausse (souscription ou prix) ; une baisse
+    seule ne fait que décrémenter (la ligne peut avoir disparu avec son plan, lors d'une
+    suppression en cascade).
+    """
+    deltas = {key: value for key, value in deltas.items() if value[0] or value[1]}
+    if not deltas:
+        return
+    MonthlyPlanRevenue.objects.bulk_create(
+        [
+            MonthlyPlanRevenue(nursery_id=nursery_id, plan_id=plan_id, month=month)
+            for (nursery_id, plan_id, month), (count, revenue) in deltas.items() if count > 0 or revenue > 0
+        ],
+        ignore_conflicts=True,
+    )
+    for (nursery_id, plan_id, month), (count, revenue) in sorted(deltas.items()):
+        MonthlyPlanRevenue.objects.filter(plan_id=plan_id, month=month).update(
+            subscriptions=F('subscriptions') + count, revenue=F('revenue') + revenue,
+        )
+
+
+def collect(added=(), removed=()):
+    """
+    Variations nettes à partir de contributions ajoutées et retirées.
+    """
+    deltas = defaultdict(lambda: [0, Decimal(0)])
+    for sign, contributions in ((1, added), (-1, removed)):
+        for key, (count, revenue) in contributions:
+            deltas[key][0] += sign * count
+            deltas[key][1] += sign * revenue
+    return deltas
+
+
+def record(added=(), removed=()):
+    apply(collect(added, removed))
+
+
+def rebuild(nursery_id=None):
+    """
+    Recalcule les agrégats depuis les souscriptions (chiffre d'affaires) et les effectifs
+    courants (effectif du jour ; l'historique des effectifs n'est pas reconstructible).
+    """
+    subscriptions = Subscription.objects.all()
+    revenues = MonthlyPlanRevenue.objects.all()
+    classrooms = Classroom.objects.all()
+    if nursery_id is not None:
+        subscriptions = subscriptions.filter(plan__nursery_id=nursery_id)
+        revenues = revenues.filter(nursery_id=nursery_id)
+        classrooms = classrooms.filter(nursery_id=nursery_id)
+    rows = (
+        subscriptions.order_by()
+        .annotate(month=TruncMonth('start_date'))
+        .values('plan__nursery_id', 'plan_id', 'month')
+        .annotate(subscriptions=Count('pk'), revenue=Sum('price'))
+    )
+    with transaction.atomic():
+        revenues.delete()
+        created = MonthlyPlanRevenue.objects.bulk_create([
+            MonthlyPlanRevenue(
+                nursery_id=row['plan__nursery_id'], plan_id=row['plan_id'], month=row['month'],
+                subscriptions=row['subscriptions'], revenue=row['revenue'],
+            )
+            for row in rows
+        ], batch_size=2000)
+        classroom_ids = list(classrooms.values_list('pk', flat=True))
+        occupancy.snapshot(classroom_ids)
+    return {'revenues': len(created), 'classrooms': len(classroom_ids)}
+
+
+# Lecture (tableau de bord du manager) : uniquement les agrégats
+
+def months(start, end):
+    month = month_of(start)
+    while month <= end:
+        yield month
+        month = (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def revenue_report(nursery_id, start, end):
+    rows = (
+        MonthlyPlanRevenue.objects.filter(nursery_id=nursery_id, month__range=(month_of(start), end))
+        .order_by('plan_id', 'month')
+        .values_list('plan_id', 'plan__name', 'month', 'subscriptions', 'revenue')
+    )
+    plans, totals = {}, defaultdict(lambda: [0, Decimal(0)])
+    for plan_id, name, month, count, revenue in rows:
+        plan = plans.setdefault(plan_id, {
+            'plan': plan_id, 'name': name, 'subscriptions': 0, 'revenue': Decimal(0), 'months': [],
+        })
+        plan['months'].append({'month': f'{month:%Y-%m}', 'subscriptions': count, 'revenue': f'{revenue:.2f}'})
+        plan['subscriptions'] += count
+        plan['revenue'] += revenue
+        totals[month][0] += count
+        totals[month][1] += revenue
+    for plan in plans.values():
+        plan['revenue'] = f"{plan['revenue']:.2f}"
+    # Montants en chaînes, comme les DecimalField des autres réponses
+    return {
+        'subscriptions': sum(count for count, _ in totals.values()),
+        'revenue': f"{sum((revenue for _, revenue in totals.values()), Decimal(0)):.2f}",
+        'months': [
+            {'month': f'{month:%Y-%m}', 'subscriptions': totals[month][0], 'revenue': f'{totals[month][1]:.2f}'}
+            for month in months(start, end)
+        ],
+        'plans': list(plans.values()),
+    }
+
+
+def enrolment_report(nursery_id, start, end, granularity='month'):
+    """
+    Effectif de chaque classe par jour ou en fin de mois sur [start, end] : lignes de la période
+    plus, pour chaque classe, la dernière ligne antérieure (valeur reprise jusqu'au premier changement).
+    """
+    previous = (
+        ClassroomDailyEnrolment.objects.filter(classroom_id=OuterRef('classroom_id'), date__lt=start)
+        .order_by().values('classroom_id').annotate(last=Max('date')).values('last')
+    )
+    rows = (
+        ClassroomDailyEnrolment.objects.filter(nursery_id=nursery_id)
+        .filter(Q(date__range=(start, end)) | Q(date=Subquery(previous)))
+        .order_by('classroom_id', 'date')
+        .values_list('classroom_id', 'classroom__name', 'date', 'children')
+    )
+    history = {}
+    for classroom_id, name, date, children in rows:
+        history.setdefault(classroom_id, (name, []))[1].append((date, children))
+
+    if granularity == 'day':
+        points = [start + datetime.timedelta(days=offset) for offset in range((end - start).days + 1)]
+    else:
+        points = [min((month + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1), end)
+                  for month in months(start, end)]
+    classrooms = []
+    for classroom_id, (name, changes) in history.items():
+        series, index, current = [], 0, 0
+        for point in points:
+            while index < len(changes) and changes[index][0] <= point:
+                current = changes[index][1]
+                index += 1
+            label = point.isoformat() if granularity == 'day' else f'{point:%Y-%m}'
+            series.append({'date' if granularity == 'day' else 'month': label, 'children': current})
+        classrooms.append({'classroom': classroom_id, 'name': name, 'series': series})
+    return {'granularity': granularity, 'classrooms': classrooms}
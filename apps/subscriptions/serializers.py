@@ -1,9 +1,13 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Plan, Subscription, SubscriptionDetail
 from apps.nurseries.models import Nursery
 from apps.children.models import Child
 from apps.users.models import UserType
 from apps.classrooms.models import Classroom, Group
+from apps.classrooms import occupancy
+from . import pricing
+from .details import sync as sync_details
 
 # -----------------------
 # Serializers de base (lecture simple)
@@ -54,27 +58,115 @@ class ClassroomSerializer(serializers.ModelSerializer):
 # SubscriptionDetailSerializer — pour le write (POST/PUT)
 # -----------------------
 
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Clé primaire résolue dans les objets préchargés par SubscriptionDetailListSerializer
+    (un in_bulk par relation pour tout le lot) au lieu d'une requête par ligne.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = getattr(self.parent.parent, 'preloaded', None)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        value = preloaded[self.field_name].get(pk)
+        if value is None:
+            self.fail('does_not_exist', pk_value=data)
+        return value
+
+
+class SubscriptionDetailListSerializer(serializers.ListSerializer):
+    """
+    Validation des détails en lot : parent du demandeur et crèche du plan résolus une fois,
+    enfants, classes et groupes chargés par un in_bulk chacun. Le nombre de requêtes
+    ne dépend pas du nombre d'enfants.
+    """
+    preloaded = None
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            request = self.context.get('request')
+            self.parent_id = (
+                UserType.objects.filter(user=request.user, type='parent').values_list('pk', flat=True).first()
+                if request else None
+            )
+            self.nursery_id = self.plan_nursery_id()
+            self.preloaded = self.preload(data)
+        return super().to_internal_value(data)
+
+    def preload(self, data):
+        ids = {'child': set(), 'classroom': set(), 'group': set()}
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            for name, values in ids.items():
+                try:
+                    values.add(int(item[name]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+        return {
+            'child': Child.objects.in_bulk(ids['child']),
+            'classroom': Classroom.objects.in_bulk(ids['classroom']),
+            'group': Group.objects.select_related('classroom').in_bulk(ids['group']),
+        }
+
+    def plan_nursery_id(self):
+        # Plan modifié par la requête, sinon plan de la souscription, sinon plan de l'URL
+        subscription = self.parent
+        plan_id = None
+        if subscription is not None and subscription.instance is not None:
+            plan_id = subscription.initial_data.get('plan') or subscription.instance.plan_id
+        if plan_id is None and self.context.get('view') is not None:
+            plan_id = self.context['view'].kwargs.get('plans_pk')
+        try:
+            plan_id = int(plan_id)
+        except (TypeError, ValueError):
+            return None
+        return Plan.objects.filter(pk=plan_id).values_list('nursery_id', flat=True).first()
+
+
 class SubscriptionDetailSerializer(serializers.ModelSerializer):
-    child = serializers.PrimaryKeyRelatedField(queryset=Child.objects.all())
-    classroom = serializers.PrimaryKeyRelatedField(queryset=Classroom.objects.all(), required=False, allow_null=True)
-    group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all(), required=False, allow_null=True)
+    child = PreloadedPrimaryKeyRelatedField(queryset=Child.objects.all())
+    classroom = PreloadedPrimaryKeyRelatedField(queryset=Classroom.objects.all(), required=False, allow_null=True)
+    group = PreloadedPrimaryKeyRelatedField(queryset=Group.objects.all(), required=False, allow_null=True)
 
     class Meta:
         model = SubscriptionDetail
         fields = ['id', 'child', 'classroom', 'group']
         read_only_fields = ['id']
+        # Toujours utilisé en liste (many=True) : la validation se fait en lot
+        list_serializer_class = SubscriptionDetailListSerializer
 
     def validate_child(self, value):
-        request = self.context.get('request')
-        if request:
-            try:
-                parent_usertype = UserType.objects.get(user=request.user, type='parent')
-            except UserType.DoesNotExist:
+        if self.context.get('request'):
+            if self.parent.parent_id is None:
                 raise serializers.ValidationError("Vous n’êtes pas autorisé à enregistrer un enfant.")
-            if value.parent != parent_usertype:
+            if value.parent_id != self.parent.parent_id:
                 raise serializers.ValidationError("Cet enfant ne vous appartient pas.")
         return value
 
+    def validate_classroom(self, value):
+        if value is not None and self.parent.nursery_id is not None and value.nursery_id != self.parent.nursery_id:
+            raise serializers.ValidationError("Cette classe n'appartient pas à la crèche du plan.")
+        return value
+
+    def validate_group(self, value):
+        if value is not None and self.parent.nursery_id is not None \
+                and value.classroom.nursery_id != self.parent.nursery_id:
+            raise serializers.ValidationError("Ce groupe n'appartient pas à la crèche du plan.")
+        return value
+
+    def validate(self, attrs):
+        classroom, group = attrs.get('classroom'), attrs.get('group')
+        if classroom is not None and group is not None and group.classroom_id != classroom.pk:
+            raise serializers.ValidationError({'group': "Ce groupe n'appartient pas à la classe choisie."})
+        return attrs
+
 
 # -----------------------
 # Full SubscriptionDetail (lecture complète récursive)
@@ -114,10 +206,10 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         model = Subscription
         fields = [
             'id', 'parent', 'plan', 'start_date', 'end_date',
-            'price', 'is_active', 'created_at',
+            'price', 'is_active', 'renewed_from', 'created_at',
             'details', 'detail_objects'
         ]
-        read_only_fields = ['id', 'created_at', 'detail_objects','price']
+        read_only_fields = ['id', 'created_at', 'detail_objects', 'price', 'renewed_from']
         extra_kwargs = {
             'start_date': {'required': False, 'help_text': "Date de début de la souscription (obligatoire)"},
             'end_date': {'required': False, 'help_text': "Date de fin de la souscription (optionnelle, pour les plans à durée limitée)"},
@@ -130,29 +222,71 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         if self.instance:
             self.fields['plan'].read_only = False
 
+    def validate_details(self, value):
+        children = [detail['child'].pk for detail in value]
+        if len(children) != len(set(children)):
+            raise serializers.ValidationError("Un enfant ne peut figurer qu'une fois dans la souscription.")
+        return value
+
+    def validate(self, attrs):
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if self.instance is None and start_date is None:
+            raise serializers.ValidationError({'start_date': "La date de début est obligatoire."})
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError({'end_date': "La date de fin doit suivre la date de début."})
+        return attrs
+
+    def apply_quote(self, subscription, children):
+        # Prix et date de fin dérivés du plan (voir pricing.quote)
+        result = pricing.quote(
+            subscription.plan.price, subscription.plan.duration,
+            subscription.start_date, children, subscription.end_date,
+        )
+        subscription.price, subscription.end_date = result.price, result.end_date
+
     def create(self, validated_data):
         details_data = validated_data.pop('details')
-        subscription = Subscription.objects.create(**validated_data)
-        SubscriptionDetail.objects.bulk_create([
-            SubscriptionDetail(subscription=subscription, **detail) for detail in details_data
-        ])
+        with transaction.atomic():
+            subscription = Subscription(**validated_data)
+            self.apply_quote(subscription, len(details_data))
+            subscription.save()
+            details = SubscriptionDetail.objects.bulk_create([
+                SubscriptionDetail(subscription=subscription, **detail) for detail in details_data
+            ])
+            # Effectifs et capacité : toute la souscription est annulée si une classe est pleine
+            occupancy.enroll(details)
         return subscription
 
     def update(self, instance, validated_data):
         details_data = validated_data.pop('details', None)
 
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        if details_data is not None:
-            instance.details.all().delete()
-            SubscriptionDetail.objects.bulk_create([
-                SubscriptionDetail(subscription=instance, **detail) for detail in details_data
-            ])
+        with transaction.atomic():
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            if 'end_date' not in validated_data and {'plan', 'start_date'} & validated_data.keys():
+                # Date de fin calculée pour l'ancien plan ou l'ancienne date : recalculée
+                instance.end_date = None
+
+            if details_data is not None:
+                # Rapprochement enfant par enfant (voir details.sync), rapport exposé à la vue
+                self.detail_changes, details = sync_details(instance, details_data)
+                children = len(details)
+            else:
+                children = instance.details.count()
+            self.apply_quote(instance, children)
+            instance.save()
         return instance
 
 
+class RepriceRequestSerializer(serializers.Serializer):
+    """
+    Recalcul des prix des souscriptions d'un plan.
+    """
+    dry_run = serializers.BooleanField(default=False, help_text="Compter sans enregistrer")
+    include_inactive = serializers.BooleanField(default=False, help_text="Inclure les souscriptions inactives")
+
+
 # -----------------------
 # MySubscriptionSerializer — Vue complète récursive personnalisée
 # -----------------------
@@ -166,7 +300,7 @@ class MySubscriptionSerializer(serializers.ModelSerializer):
         model = Subscription
         fields = [
             'id', 'parent', 'plan', 'start_date', 'end_date',
-            'price', 'is_active', 'created_at',
+            'price', 'is_active', 'renewed_from', 'created_at',
             'detail_objects'
         ]
-        read_only_fields = ['id', 'created_at', 'detail_objects', 'plan', 'end_date', 'price']
+        read_only_fields = ['id', 'created_at', 'detail_objects', 'plan', 'end_date', 'price', 'renewed_from']
@@ -0,0 +1,107 @@
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from apps.classrooms import occupancy
+from . import rollups
+from .models import Plan, Subscription, SubscriptionDetail
+
+# Effectifs des classes et groupes tenus à jour à chaque écriture d'inscription.
+# bulk_create n'émettant pas de signaux, ses appelants utilisent occupancy.enroll().
+# Les écritures groupées qui calculent elles-mêmes la variation nette (details.sync)
+# activent `occupancy_managed` : les suppressions ne sont alors pas comptées une à une.
+occupancy_managed = ContextVar('occupancy_managed', default=False)
+
+
+def superseded(subscription_id):
+    # Souscription déjà renouvelée : ses inscriptions ne comptent plus (occupancy.actual_counts)
+    return Subscription.objects.filter(renewed_from_id=subscription_id).exists()
+
+
+@receiver(pre_save, sender=SubscriptionDetail)
+def remember_previous_placement(sender, instance, raw=False, **kwargs):
+    instance._previous_placement = None
+    if not raw and instance.pk:
+        instance._previous_placement = (
+            SubscriptionDetail.objects.filter(pk=instance.pk)
+            .only('classroom_id', 'group_id', 'is_valide')
+            .first()
+        )
+
+
+@receiver(post_save, sender=SubscriptionDetail)
+def update_occupancy_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if superseded(instance.subscription_id):
+        return
+    previous = getattr(instance, '_previous_placement', None)
+    if created or previous is None:
+        occupancy.enroll([instance])
+    else:
+        occupancy.change(previous, instance)
+
+
+@receiver(pre_delete, sender=SubscriptionDetail)
+def remember_counted(sender, instance, **kwargs):
+    # Vérifié avant la suppression : supprimer l'ancienne souscription détache d'abord
+    # son renouvellement (SET_NULL), puis supprime ses inscriptions
+    instance._counted = not occupancy_managed.get() and not superseded(instance.subscription_id)
+
+
+@receiver(post_delete, sender=SubscriptionDetail)
+def update_occupancy_on_delete(sender, instance, **kwargs):
+    if occupancy_managed.get() or not getattr(instance, '_counted', True):
+        return
+    occupancy.release([instance])
+
+
+@receiver(post_delete, sender=Subscription)
+def restore_renewed_places(sender, instance, **kwargs):
+    # Renouvellement supprimé : les enfants reprennent leur place au titre de l'ancienne souscription
+    if not instance.renewed_from_id:
+        return
+    placements = set(
+        SubscriptionDetail.objects.filter(subscription_id=instance.renewed_from_id, is_valide=True)
+        .values_list('classroom_id', 'group_id')
+    )
+    occupancy.recount(
+        {classroom_id for classroom_id, _ in placements if classroom_id},
+        {group_id for _, group_id in placements if group_id},
+    )
+
+
+# Chiffre d'affaires mensuel : contribution précédente retirée, nouvelle ajoutée
+
+@receiver(pre_save, sender=Subscription)
+def remember_previous_contribution(sender, instance, raw=False, **kwargs):
+    instance._previous_contribution = None
+    if not raw and instance.pk:
+        previous = (
+            Subscription.objects.filter(pk=instance.pk)
+            .values_list('plan__nursery_id', 'plan_id', 'start_date', 'price')
+            .first()
+        )
+        if previous is not None:
+            instance._previous_contribution = rollups.contribution(*previous)
+
+
+@receiver(post_save, sender=Subscription)
+def update_revenue_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_contribution', None)
+    # Valeurs telles qu'enregistrées (une date ou un prix peuvent avoir été fournis en texte)
+    start_date = Subscription._meta.get_field('start_date').to_python(instance.start_date)
+    current = rollups.contribution(instance.plan.nursery_id, instance.plan_id, start_date, instance.price)
+    rollups.record(added=[current], removed=[previous] if previous else [])
+
+
+@receiver(post_delete, sender=Subscription)
+def update_revenue_on_delete(sender, instance, **kwargs):
+    try:
+        nursery_id = instance.plan.nursery_id
+    except Plan.DoesNotExist:
+        # Plan supprimé dans la même cascade : ses agrégats disparaissent avec lui
+        return
+    rollups.record(removed=[rollups.contribution(nursery_id, instance.plan_id, instance.start_date, instance.price)])
@@ -0,0 +1,20 @@
+from celery import shared_task
+
+from apps.core.tasks import IdempotentTask
+from . import expiry, renewal
+
+
+@shared_task(base=IdempotentTask)
+def expire_subscriptions():
+    """
+    Tâche périodique (CELERY_BEAT_SCHEDULE) : expiration des souscriptions échues.
+    """
+    return expiry.expire()
+
+
+@shared_task(base=IdempotentTask)
+def renew_subscriptions():
+    """
+    Tâche périodique (CELERY_BEAT_SCHEDULE) : reconduction des souscriptions récurrentes.
+    """
+    return renewal.renew()
@@ -0,0 +1,77 @@
+import datetime
+
+from django.test import TestCase
+
+from apps.children.models import Child
+from apps.classrooms import occupancy
+from apps.classrooms.models import Classroom, Group
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+from apps.subscriptions import details
+from apps.subscriptions.models import Subscription, SubscriptionDetail
+
+
+class SyncTests(TestCase):
+
+    def setUp(self):
+        objects, parents, _ = seed_budget_dataset(2)
+        self.subscription = objects['plans-subscription']
+        self.classroom = Classroom.objects.get(pk=parents['classroom_pk'])
+        self.groups = list(Group.objects.filter(classroom=self.classroom).order_by('name'))
+        self.children = {detail.child.first_name: detail.child for detail in self.subscription.details.select_related('child')}
+        # Jeu créé sans signaux : effectifs recalculés (2 souscriptions × 2 enfants)
+        occupancy.reconcile()
+
+    def wanted(self, name, group=0, classroom=None):
+        return {'child': self.children[name], 'classroom': classroom or self.classroom,
+                'group': self.groups[group] if group is not None else None}
+
+    def counts(self):
+        self.classroom.refresh_from_db()
+        for group in self.groups:
+            group.refresh_from_db()
+        return self.classroom.nbr_children, [group.nbr_children for group in self.groups]
+
+    def test_diff_report_and_counts(self):
+        self.children["Nouveau"] = Child.objects.create(parent=self.subscription.parent, first_name="Nouveau", last_name="Budget")
+        untouched = SubscriptionDetail.objects.get(subscription=self.subscription, child=self.children["Enfant 0"])
+
+        report, final = details.sync(self.subscription, [
+            self.wanted("Enfant 0"), self.wanted("Enfant 1", group=1), self.wanted("Nouveau", group=None),
+        ])
+        self.assertEqual(report, {
+            'created': [self.children["Nouveau"].pk], 'updated': [self.children["Enfant 1"].pk],
+            'deleted': [], 'unchanged': 1,
+        })
+        self.assertEqual(len(final), 3)
+        self.assertEqual(self.counts(), (5, [3, 1]))
+        # Ligne inchangée : pas réécrite
+        self.assertEqual(SubscriptionDetail.objects.get(pk=untouched.pk).updated_at, untouched.updated_at)
+
+    def test_deleted_children_released_once(self):
+        report, _ = details.sync(self.subscription, [self.wanted("Enfant 1")])
+        self.assertEqual(report['deleted'], [self.children["Enfant 0"].pk])
+        self.assertEqual(self.counts(), (3, [3, 0]))
+        self.assertFalse(self.subscription.details.filter(child=self.children["Enfant 0"]).exists())
+
+    def test_full_classroom(self):
+        Classroom.objects.filter(pk=self.classroom.pk).update(capacity=4)
+        # Déplacement à l'intérieur de la classe pleine : accepté
+        details.sync(self.subscription, [self.wanted("Enfant 0", group=1), self.wanted("Enfant 1")])
+        self.assertEqual(self.counts(), (4, [3, 1]))
+
+        self.children["Nouveau"] = Child.objects.create(parent=self.subscription.parent, first_name="Nouveau", last_name="Budget")
+        with self.assertRaises(occupancy.CapacityExceeded):
+            details.sync(self.subscription, [self.wanted("Enfant 0"), self.wanted("Enfant 1"), self.wanted("Nouveau")])
+        self.assertEqual(self.subscription.details.count(), 2)
+        self.assertEqual(self.counts(), (4, [3, 1]))
+
+    def test_renewed_subscription_does_not_count(self):
+        Subscription.objects.create(
+            parent=self.subscription.parent, plan=self.subscription.plan, price=10000,
+            start_date=datetime.date.today(), renewed_from=self.subscription,
+        )
+        occupancy.reconcile()
+        before = self.counts()
+        report, _ = details.sync(self.subscription, [self.wanted("Enfant 0", group=1)])
+        self.assertEqual(report['deleted'], [self.children["Enfant 1"].pk])
+        self.assertEqual(self.counts(), before)
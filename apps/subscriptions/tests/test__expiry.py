@@ -0,0 +1,82 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.classrooms import occupancy
+from apps.classrooms.models import Classroom, Group
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+from apps.subscriptions import tasks
+from apps.subscriptions.expiry import expire
+from apps.subscriptions.models import Subscription, SubscriptionDetail
+
+TODAY = datetime.date(2030, 1, 31)
+
+
+class ExpireTests(TestCase):
+
+    def setUp(self):
+        _, parents, _ = seed_budget_dataset(4)
+        self.classroom = Classroom.objects.get(pk=parents['classroom_pk'])
+        self.group = Group.objects.get(classroom=self.classroom, name="Groupe 0")
+        self.subscriptions = list(Subscription.objects.order_by('pk'))
+        # Deux échues, une finissant aujourd'hui (incluse), une sans fin
+        self.end(0, TODAY - datetime.timedelta(days=10))
+        self.end(1, TODAY - datetime.timedelta(days=1))
+        self.end(2, TODAY)
+        # Jeu créé sans signaux : effectifs recalculés (4 souscriptions × 4 enfants)
+        occupancy.reconcile()
+
+    def end(self, index, date):
+        Subscription.objects.filter(pk=self.subscriptions[index].pk).update(end_date=date)
+
+    def counts(self):
+        self.classroom.refresh_from_db()
+        self.group.refresh_from_db()
+        return self.classroom.nbr_children, self.group.nbr_children
+
+    def active(self):
+        return list(Subscription.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True))
+
+    def test_expire_in_batches(self):
+        self.assertEqual(self.counts(), (16, 16))
+        metrics = expire(today=TODAY, batch_size=1)
+        self.assertEqual(
+            {key: metrics[key] for key in ('subscriptions', 'details', 'classrooms', 'groups', 'batches')},
+            {'subscriptions': 2, 'details': 8, 'classrooms': 1, 'groups': 1, 'batches': 2},
+        )
+        self.assertEqual(self.active(), [self.subscriptions[2].pk, self.subscriptions[3].pk])
+        self.assertFalse(SubscriptionDetail.objects.filter(
+            subscription__in=self.subscriptions[:2], is_valide=True,
+        ).exists())
+        self.assertEqual(self.counts(), (8, 8))
+
+        # Passage suivant : plus rien à traiter
+        self.assertEqual(expire(today=TODAY)['subscriptions'], 0)
+        self.assertEqual(self.counts(), (8, 8))
+
+    def test_dry_run_changes_nothing(self):
+        metrics = expire(today=TODAY, dry_run=True)
+        self.assertEqual((metrics['subscriptions'], metrics['details'], metrics['batches']), (2, 8, 0))
+        self.assertEqual(len(self.active()), 4)
+        self.assertEqual(self.counts(), (16, 16))
+
+    def test_command(self):
+        out = StringIO()
+        call_command('expire_subscriptions', '--date', TODAY.isoformat(), '--dry-run', stdout=out)
+        self.assertIn("2 souscription(s) à expirer (8 détail(s))", out.getvalue())
+
+        out = StringIO()
+        call_command('expire_subscriptions', '--date', TODAY.isoformat(), stdout=out)
+        self.assertIn("2 souscription(s) expirée(s) (8 détail(s)), 1 classe(s) et 1 groupe(s)", out.getvalue())
+        self.assertEqual(len(self.active()), 2)
+
+    def test_task_uses_local_date(self):
+        self.end(3, timezone.localdate())
+        metrics = tasks.expire_subscriptions()
+        # Les autres fins sont en 2030 ; la date du jour reste incluse dans la souscription
+        self.assertEqual(metrics['subscriptions'], 0)
+        self.end(3, timezone.localdate() - datetime.timedelta(days=1))
+        self.assertEqual(tasks.expire_subscriptions()['subscriptions'], 1)
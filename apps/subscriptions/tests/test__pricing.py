@@ -0,0 +1,35 @@
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.subscriptions import expiry, pricing
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+from apps.subscriptions.models import Subscription
+from apps.subscriptions.serializers import SubscriptionSerializer
+
+
+class RepriceTests(TestCase):
+
+    def setUp(self):
+        objects, _, _ = seed_budget_dataset(2)
+        self.plan = objects['nursery-plan']
+        start = datetime.date(2030, 1, 1)
+        Subscription.objects.filter(plan=self.plan).update(start_date=start, end_date=datetime.date(2030, 1, 31))
+
+    def test_expired_subscriptions_keep_their_children(self):
+        expiry.expire(today=datetime.date(2030, 3, 1))
+        subscriptions = Subscription.objects.filter(plan=self.plan)
+        self.assertFalse(subscriptions.filter(is_active=True).exists())
+
+        result = pricing.reprice(subscriptions)
+        self.assertEqual(result, {'checked': 2, 'repriced': 2})
+        # Plan à 10000 par mois, deux enfants par souscription, un mois complet
+        self.assertEqual(set(subscriptions.values_list('price', flat=True)), {Decimal('20000.00')})
+
+    def test_patch_of_expired_subscription(self):
+        expiry.expire(today=datetime.date(2030, 3, 1))
+        subscription = Subscription.objects.filter(plan=self.plan).first()
+        serializer = SubscriptionSerializer(subscription, data={'end_date': '2030-02-28'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.save().price, Decimal('40000.00'))
@@ -0,0 +1,53 @@
+import datetime
+
+from django.test import TestCase
+
+from apps.classrooms.models import Classroom
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+from apps.subscriptions import expiry, renewal
+from apps.subscriptions.models import Subscription
+
+END = datetime.date(2030, 1, 31)
+
+
+class RenewalOccupancyTests(TestCase):
+
+    def setUp(self):
+        objects, parents, _ = seed_budget_dataset(1)
+        self.classroom = Classroom.objects.get(pk=parents['classroom_pk'])
+        self.subscription = objects['plans-subscription']
+        Subscription.objects.filter(pk=self.subscription.pk).update(
+            start_date=datetime.date(2030, 1, 1), end_date=END,
+        )
+        Classroom.objects.filter(pk=self.classroom.pk).update(nbr_children=1)
+
+    def children(self):
+        self.classroom.refresh_from_db()
+        return self.classroom.nbr_children
+
+    def test_renewed_child_counted_once(self):
+        metrics = renewal.renew(today=END - datetime.timedelta(days=3))
+        self.assertEqual(metrics['subscriptions'], 1)
+        self.assertEqual(self.children(), 1)
+
+        expiry.expire(today=END + datetime.timedelta(days=1))
+        self.assertEqual(self.children(), 1)
+
+    def test_deleted_renewal_gives_the_place_back(self):
+        renewal.renew(today=END)
+        Subscription.objects.get(renewed_from=self.subscription).delete()
+        self.assertEqual(self.children(), 1)
+
+    def test_deleting_renewed_subscription_keeps_the_renewal_count(self):
+        renewal.renew(today=END)
+        self.subscription.delete()
+        self.assertEqual(self.children(), 1)
+
+    def test_editing_renewed_detail_does_not_count(self):
+        renewal.renew(today=END)
+        detail = self.subscription.details.get()
+        detail.is_valide = False
+        detail.save()
+        self.assertEqual(self.children(), 1)
+        detail.delete()
+        self.assertEqual(self.children(), 1)
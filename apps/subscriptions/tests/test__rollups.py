@@ -0,0 +1,30 @@
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+from apps.subscriptions import rollups
+from apps.subscriptions.models import MonthlyPlanRevenue
+
+MONTH = datetime.date(2030, 1, 1)
+
+
+class ApplyTests(TestCase):
+
+    def setUp(self):
+        objects, _, _ = seed_budget_dataset(1)
+        self.plan = objects['nursery-plan']
+        MonthlyPlanRevenue.objects.all().delete()
+
+    def contribution(self, price):
+        return rollups.contribution(self.plan.nursery_id, self.plan.pk, MONTH, price)
+
+    def test_price_increase_creates_missing_row(self):
+        rollups.record(added=[self.contribution(150)], removed=[self.contribution(100)])
+        row = MonthlyPlanRevenue.objects.get(plan=self.plan, month=MONTH)
+        self.assertEqual((row.subscriptions, row.revenue), (0, Decimal('50.00')))
+
+    def test_decrease_alone_creates_nothing(self):
+        rollups.record(removed=[self.contribution(100)])
+        self.assertFalse(MonthlyPlanRevenue.objects.exists())
@@ -0,0 +1,98 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.children.models import Child
+from apps.classrooms.models import Classroom, Group
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+from apps.subscriptions.models import Subscription
+
+
+class PreloadedDetailsTests(APITestCase):
+    """
+    Validation en lot des détails d'une souscription (clés primaires préchargées).
+    """
+
+    def setUp(self):
+        _, self.parents, users = seed_budget_dataset(2)
+        self.parent = users['parent'].usertype
+        self.classroom_id = self.parents['classroom_pk']
+        self.group = Group.objects.filter(classroom_id=self.classroom_id).first()
+        _, other_parents, _ = seed_budget_dataset(1, prefix='other')
+        self.other_classroom_id = other_parents['classroom_pk']
+        self.other_child = Child.objects.exclude(parent=self.parent).first()
+        token = RefreshToken.for_user(users['parent']).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def children(self, count):
+        existing = list(Child.objects.filter(parent=self.parent))
+        for index in range(len(existing), count):
+            existing.append(Child.objects.create(parent=self.parent, first_name=f"Enfant {index}", last_name="Lot"))
+        return existing[:count]
+
+    def post(self, details):
+        url = reverse('plans-subscription-list', kwargs={
+            'nursery_pk': self.parents['nursery_pk'], 'plans_pk': self.parents['plans_pk'],
+        })
+        return self.client.post(url, {'start_date': "2030-01-01", 'details': details}, format='json', secure=True)
+
+    def detail(self, child, **fields):
+        return {'child': child if isinstance(child, (int, str, bool)) else child.pk,
+                'classroom': self.classroom_id, 'group': self.group.pk, **fields}
+
+    def test_query_count_independent_of_children(self):
+        def measure(count):
+            details = [self.detail(child) for child in self.children(count)]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(details)
+            self.assertEqual(response.status_code, 201, response.data)
+            return len(queries)
+
+        self.assertEqual(measure(2), measure(6))
+        self.assertEqual(Subscription.objects.filter(parent=self.parent).latest('pk').details.count(), 6)
+
+    def test_unknown_and_invalid_keys(self):
+        child = self.children(1)[0]
+        cases = [
+            (self.detail(999999), 'child', 'does_not_exist'),
+            (self.detail("abc"), 'child', 'incorrect_type'),
+            (self.detail(True), 'child', 'incorrect_type'),
+            (self.detail(child, classroom=999999), 'classroom', 'does_not_exist'),
+            (self.detail(child, group="x"), 'group', 'incorrect_type'),
+        ]
+        for detail, field, code in cases:
+            response = self.post([detail])
+            self.assertEqual(response.status_code, 400, detail)
+            self.assertEqual(response.data['details'][0][field][0].code, code, detail)
+
+    def test_ownership_and_nursery_checks(self):
+        child = self.children(1)[0]
+        foreign_group = Group.objects.filter(classroom_id=self.other_classroom_id).first()
+        cases = [
+            (self.detail(self.other_child), 'child'),
+            (self.detail(child, classroom=self.other_classroom_id, group=None), 'classroom'),
+            (self.detail(child, group=foreign_group.pk), 'group'),
+        ]
+        for detail, field in cases:
+            response = self.post([detail])
+            self.assertEqual(response.status_code, 400, detail)
+            self.assertIn(field, response.data['details'][0], detail)
+
+    def test_group_must_belong_to_classroom(self):
+        child = self.children(1)[0]
+        # Seconde classe de la même crèche : le groupe de la première n'y appartient pas
+        other_classroom = Classroom.objects.get(pk=self.classroom_id)
+        other_classroom.pk = None
+        other_classroom.name = "Classe bis"
+        other_classroom.save()
+        response = self.post([self.detail(child, classroom=other_classroom.pk)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('group', response.data['details'][0])
+
+    def test_duplicate_child_rejected(self):
+        child = self.children(1)[0]
+        response = self.post([self.detail(child), self.detail(child)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('details', response.data)
@@ -2,19 +2,26 @@ from rest_framework import viewsets, mixins, status
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from apps.nurseries.models import Nursery
 from apps.users.models import UserType
+from . import pricing
 from .models import Plan, Subscription
-from .serializers import PlanSerializer, SubscriptionSerializer, MySubscriptionSerializer
+from .serializers import (
+    PlanSerializer, SubscriptionSerializer, MySubscriptionSerializer, RepriceRequestSerializer,
+)
+from apps.core.mixins import ConditionalGetMixin, EagerLoadingMixin
 
 
-class PlanViewSet(viewsets.ModelViewSet):
+class PlanViewSet(EagerLoadingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Gestion des plans d’abonnement.
     Accessible aux utilisateurs authentifiés.
     """
     serializer_class = PlanSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'list': 4, 'retrieve': 3}
 
     def get_queryset(self):
         nursery_id = self.kwargs.get("nursery_pk")
@@ -27,8 +34,28 @@ class PlanViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         serializer.save()
 
+    @action(detail=True, methods=['POST'])
+    def reprice(self, request, pk=None, nursery_pk=None):
+        """
+        Recalcule prix et date de fin des souscriptions du plan (après un changement de tarif
+        ou de durée) : {"dry_run", "include_inactive"} -> {"checked", "repriced"}.
+        """
+        nursery = get_object_or_404(Nursery.objects.select_related('manager__user'), pk=nursery_pk)
+        if nursery.manager.user != request.user and not request.user.is_staff:
+            raise PermissionDenied("Permission refusée.")
+        plan = self.get_object()
+        params = RepriceRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        subscriptions = Subscription.objects.filter(plan=plan)
+        if not params.validated_data['include_inactive']:
+            subscriptions = subscriptions.filter(is_active=True)
+        result = pricing.reprice(subscriptions, dry_run=params.validated_data['dry_run'])
+        return Response({'plan': plan.pk, 'dry_run': params.validated_data['dry_run'], **result})
+
 
 class GetPlanViewSet(
+    EagerLoadingMixin,
+    ConditionalGetMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
@@ -39,32 +66,34 @@ class GetPlanViewSet(
     """
     serializer_class = PlanSerializer
     permission_classes = [AllowAny]
+    query_budget = {'list': 4, 'retrieve': 3}
 
     def get_queryset(self):
         nursery_id = self.kwargs.get("mynursery_pk")
         return Plan.objects.filter(is_active=True, nursery_id=nursery_id)
 
 
-class SubscriptionViewSet(viewsets.ModelViewSet):
+class SubscriptionViewSet(EagerLoadingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Gestion des abonnements liés à un plan.
     Authentification requise.
     """
-    queryset = Subscription.objects.select_related('plan', 'parent').prefetch_related('details')
+    conditional_related = ('details__updated_at',)
+    query_budget = {'list': 5, 'retrieve': 4}
+    queryset = Subscription.objects.all()
     serializer_class = SubscriptionSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        try:
-            parent = UserType.objects.get(user=self.request.user, type='parent')
-            return self.queryset.filter(parent=parent)
-        except UserType.DoesNotExist:
-            return Subscription.objects.none()
+        # Jointure sur le profil plutôt qu'une requête de plus à chaque appel
+        return self.queryset.filter(parent__user=self.request.user, parent__type='parent')
 
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data, context={'request': request})
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
+        # Réponse lue avec le préchargement des détails (une requête par relation)
+        serializer.instance = self.filter_queryset(self.get_queryset()).get(pk=serializer.instance.pk)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def perform_create(self, serializer):
@@ -79,33 +108,34 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
-        serializer = self.get_serializer(
-            instance, data=request.data, partial=partial, context={'request': request}
-        )
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-        return Response(serializer.data)
+
+        if getattr(instance, '_prefetched_objects_cache', None):
+            # Les détails préchargés ont été modifiés : relus avec leur préchargement
+            serializer.instance = self.get_object()
+        data = serializer.data
+        if hasattr(serializer, 'detail_changes'):
+            data['detail_changes'] = serializer.detail_changes
+        return Response(data)
 
     def perform_update(self, serializer):
         serializer.save()
 
 
-class MySubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
+class MySubscriptionViewSet(EagerLoadingMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     Liste les abonnements du parent connecté.
     """
+    conditional_related = ('details__updated_at', 'plan__updated_at')
+    query_budget = {'list': 5, 'retrieve': 4}
     serializer_class = MySubscriptionSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        try:
-            parent = UserType.objects.get(user=user, type='parent')
-        except UserType.DoesNotExist:
-            return Subscription.objects.none()
         return Subscription.objects.filter(
-            parent=parent,
+            parent__user=self.request.user,
+            parent__type='parent',
             plan__is_active=True
-        ).prefetch_related(
-            'details__child', 'details__classroom', 'details__group', 'plan'
         )
@@ -0,0 +1,270 @@
+import csv
+import datetime
+import io
+import itertools
+import logging
+import time
+import uuid
+import zipfile
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from apps.children.models import Child
+from apps.core.tasks import enqueue
+from .tasks import send_invitations
+from .models import UserType
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+MAX_ROWS = 50000
+
+# En-têtes reconnus (insensibles à la casse) : ceux de l'export des enfants, plus l'adresse
+COLUMNS = {
+    'parent (e-mail)': 'email',
+    'parent (nom)': 'parent_last_name',
+    'parent (prénom)': 'parent_first_name',
+    'parent (téléphone)': 'contact',
+    'parent (adresse)': 'address',
+    'nom': 'last_name',
+    'prénom': 'first_name',
+    'naissance': 'birthday',
+}
+REQUIRED_COLUMNS = ('Parent (e-mail)', 'Nom', 'Prénom', 'Naissance')
+NON_FIELD_ERRORS = api_settings.NON_FIELD_ERRORS_KEY
+UNREADABLE = (UnicodeDecodeError, csv.Error, zipfile.BadZipFile, ValueError, KeyError, OSError)
+
+
+class FamilyRowSerializer(serializers.Serializer):
+    """
+    Une ligne du fichier : un enfant et son parent (les lignes d'un même parent partagent l'e-mail).
+    """
+    email = serializers.EmailField(max_length=150)
+    parent_last_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    parent_first_name = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    contact = serializers.CharField(max_length=15, required=False, allow_blank=True)
+    address = serializers.CharField(required=False, allow_blank=True)
+    last_name = serializers.CharField(max_length=100)
+    first_name = serializers.CharField(max_length=100)
+    birthday = serializers.DateField(input_formats=['iso-8601', '%d/%m/%Y'])
+
+    def validate_email(self, value):
+        return value.lower()
+
+    def validate_birthday(self, value):
+        if value > datetime.date.today():
+            raise serializers.ValidationError("La date de naissance ne peut pas être dans le futur.")
+        return value
+
+
+# Lecture en flux : les lignes sont produites une à une, jamais le fichier entier en mémoire
+
+def csv_rows(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    header = text.readline()
+    delimiter = ';' if header.count(';') >= header.count(',') else ','
+    return csv.reader(itertools.chain([header], text), delimiter=delimiter)
+
+
+def xlsx_rows(file):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    for row in workbook.active.iter_rows(values_only=True):
+        yield [
+            value.date() if isinstance(value, datetime.datetime) else value
+            for value in row
+        ]
+
+
+def read(file, filetype):
+    """
+    (numéro de ligne, dict) pour chaque ligne non vide ; ValidationError si le fichier
+    est illisible ou s'il manque des colonnes.
+    """
+    try:
+        rows = xlsx_rows(file) if filetype == 'xlsx' else csv_rows(file)
+        header = next(rows, None) or []
+    except UNREADABLE as exc:
+        raise serializers.ValidationError({'file': f"Fichier illisible : {exc}"})
+    positions = {}
+    for index, title in enumerate(header):
+        key = COLUMNS.get(str(title or '').strip().lower())
+        if key is not None:
+            positions.setdefault(key, index)
+    missing = [title for title in REQUIRED_COLUMNS if COLUMNS[title.lower()] not in positions]
+    if missing:
+        raise serializers.ValidationError({'file': f"Colonnes manquantes : {', '.join(missing)}."})
+
+    def lines():
+        try:
+            for number, row in enumerate(rows, start=2):
+                values = {
+                    key: row[index] if index < len(row) and row[index] is not None else ''
+                    for key, index in positions.items()
+                }
+                values = {key: value.strip() if isinstance(value, str) else value for key, value in values.items()}
+                if any(value != '' for value in values.values()):
+                    yield number, values
+        except UNREADABLE as exc:
+            raise serializers.ValidationError({'file': f"Fichier illisible : {exc}"})
+    return lines()
+
+
+def header_errors(errors):
+    # Erreurs rapportées sous les en-têtes du fichier
+    titles = {key: title for title, key in COLUMNS.items()}
+    return {
+        (titles[field].capitalize() if field in titles else field): messages
+        for field, messages in errors.items()
+    }
+
+
+def existing_parents(emails, nursery_id):
+    """
+    {e-mail: (compte, erreur)} des comptes déjà enregistrés sous ces e-mails (e-mail ou identifiant).
+    Seuls les comptes créés par un import de la même crèche sont repris : un parent inscrit
+    par ailleurs rattache lui-même ses enfants.
+    """
+    accounts = {}
+    users = (
+        User.objects.annotate(email_key=Lower('email'))
+        .filter(Q(email_key__in=emails) | Q(username__in=emails))
+        .select_related('usertype')
+    )
+    for user in users:
+        for key in {user.email_key, user.username} & emails:
+            accounts.setdefault(key, []).append(user)
+    result = {}
+    for email, users in accounts.items():
+        user = users[0]
+        if len({account.pk for account in users}) > 1:
+            result[email] = (None, "Plusieurs comptes utilisent cet e-mail.")
+        elif getattr(user, 'usertype', None) is None or user.usertype.type != 'parent':
+            result[email] = (None, "Un compte non parent utilise cet e-mail.")
+        elif user.usertype.imported_by_id != nursery_id:
+            result[email] = (None, "Un compte parent existe déjà pour cet e-mail : le parent ajoute lui-même ses enfants.")
+        else:
+            result[email] = (user.usertype, None)
+    return result
+
+
+def import_chunk(rows, report, state, nursery_id, dry_run):
+    """
+    Valide puis enregistre un paquet de lignes : une requête pour les comptes existants,
+    une pour leurs enfants, puis un bulk_create par table (comptes, profils, enfants).
+    `state` garde d'un paquet à l'autre les comptes créés par l'import, les enfants vus
+    et les comptes à inviter.
+    """
+    valid = []
+    for number, values in rows:
+        row = FamilyRowSerializer(data=values)
+        if row.is_valid():
+            valid.append((number, row.validated_data))
+        else:
+            report['errors'].append({'row': number, 'errors': header_errors(row.errors)})
+
+    accounts, seen, existing = state['accounts'], state['seen'], state['existing']
+    parents = existing_parents({data['email'] for _, data in valid} - set(accounts), nursery_id)
+    emails = {parent.pk: email for email, (parent, _) in parents.items() if parent}
+    for parent_id, last, first in (
+        Child.objects.filter(parent_id__in=emails)
+        .annotate(last=Lower('last_name'), first=Lower('first_name'))
+        .values_list('parent_id', 'last', 'first')
+    ):
+        existing.add((emails[parent_id], last, first))
+
+    users, children, touched = [], [], {}
+    for number, data in valid:
+        email = data['email']
+        parent, error = parents.get(email, (None, None))
+        if error:
+            report['errors'].append({'row': number, 'errors': {'Parent (e-mail)': [error]}})
+            continue
+        key = (email, data['last_name'].lower(), data['first_name'].lower())
+        if key in seen:
+            report['errors'].append({
+                'row': number, 'errors': {NON_FIELD_ERRORS: ["Enfant en double dans le fichier."]},
+            })
+            continue
+        seen.add(key)
+        if parent is None and email not in accounts:
+            # Compte sans mot de passe (aucun hachage) : le parent le choisit via l'invitation
+            user = User(
+                username=email, email=email, password=make_password(None),
+                first_name=data.get('parent_first_name', ''), last_name=data.get('parent_last_name', ''),
+            )
+            accounts[email] = UserType(
+                user=user, type='parent', contact=data.get('contact') or None, address=data.get('address') or None,
+                imported_by_id=nursery_id,
+            )
+            users.append(accounts[email])
+        touched[email] = parent or accounts[email]
+        if key in existing:
+            # Déjà enregistré (fichier réimporté) : rien à créer
+            report['skipped'] += 1
+            continue
+        children.append((touched[email], Child(
+            last_name=data['last_name'], first_name=data['first_name'], birthday=data['birthday'],
+        )))
+
+    if not dry_run:
+        User.objects.bulk_create([profile.user for profile in users])
+        UserType.objects.bulk_create(users)
+        for parent, child in children:
+            child.parent = parent
+        Child.objects.bulk_create([child for _, child in children])
+    report['parents'] += len(users)
+    report['children'] += len(children)
+
+    # Invitations : comptes créés, et comptes de la crèche encore sans mot de passe (nouvelle
+    # invitation) ; envoyées par e-mail au parent après validation de l'import
+    for email, parent in touched.items():
+        if email not in state['invited'] and not parent.user.has_usable_password():
+            state['invited'].add(email)
+            report['invitations'].append(email)
+            if not dry_run:
+                state['invite'].append(parent.user.pk)
+
+
+def import_families(file, filetype, nursery_id, dry_run=False, chunk_size=CHUNK_SIZE):
+    """
+    Importe dans la crèche parents et enfants d'un fichier CSV ou XLSX (une ligne par enfant),
+    lu en flux et traité par paquets, dans une seule transaction.
+    Les lignes invalides sont ignorées et rapportées avec leur numéro ; les autres sont
+    enregistrées ; un enfant déjà enregistré pour ce parent est ignoré (skipped), le fichier
+    peut donc être réimporté, ce qui renouvelle les invitations non utilisées.
+    Les nouveaux comptes ont l'e-mail pour identifiant, sont rattachés à la crèche et
+    reçoivent par e-mail une invitation pour choisir leur mot de passe ; le rapport ne
+    liste que les adresses invitées.
+    """
+    started = time.perf_counter()
+    report = {'rows': 0, 'parents': 0, 'children': 0, 'skipped': 0, 'errors': [], 'invitations': []}
+    state = {'accounts': {}, 'seen': set(), 'existing': set(), 'invited': set(), 'invite': []}
+    lines = read(file, filetype)
+    with transaction.atomic():
+        while True:
+            chunk = list(itertools.islice(lines, chunk_size))
+            if not chunk:
+                break
+            report['rows'] += len(chunk)
+            if report['rows'] > MAX_ROWS:
+                raise serializers.ValidationError({'file': f"{MAX_ROWS} lignes au plus par fichier."})
+            import_chunk(chunk, report, state, nursery_id, dry_run)
+        if state['invite']:
+            enqueue(send_invitations, state['invite'], idempotency_key=f"invitations:{uuid.uuid4().hex}")
+    report['errors'].sort(key=lambda error: error['row'])
+    report['dry_run'] = dry_run
+    report['duration_ms'] = round((time.perf_counter() - started) * 1000)
+    logger.info(
+        "Import de familles%s : %s ligne(s), %s parent(s), %s enfant(s), %s ignoré(s), %s erreur(s) en %s ms",
+        " (simulation)" if dry_run else "", report['rows'], report['parents'], report['children'],
+        report['skipped'], len(report['errors']), report['duration_ms'],
+    )
+    return report
@@ -0,0 +1,59 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core.mail import send_mass_mail
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+class InvitationTokenGenerator(PasswordResetTokenGenerator):
+    """
+    Jeton d'invitation des comptes créés sans mot de passe (import de familles).
+    Sel distinct de la réinitialisation de mot de passe ; le jeton est signé sur le mot de passe
+    (inutilisable) du compte : il ne sert qu'une fois et expire après PASSWORD_RESET_TIMEOUT.
+    """
+    key_salt = 'apps.users.invitations.InvitationTokenGenerator'
+
+
+invitation_token = InvitationTokenGenerator()
+
+
+def invitation(user):
+    return {
+        'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+        'token': invitation_token.make_token(user),
+    }
+
+
+def send(users):
+    """
+    Envoie à chaque compte encore sans mot de passe son lien d'invitation, à sa propre adresse :
+    le jeton n'est jamais transmis à la crèche. Retourne le nombre d'e-mails envoyés.
+    """
+    messages = []
+    for user in users:
+        if user.has_usable_password() or not user.email:
+            continue
+        link = f"{settings.INVITATION_URL}?{urlencode(invitation(user))}"
+        messages.append((
+            "Votre compte sur la plateforme de la crèche",
+            "Bonjour,\n\nVotre crèche vous a créé un compte. Choisissez votre mot de passe "
+            f"depuis ce lien (valable {settings.PASSWORD_RESET_TIMEOUT // 86400} jours) :\n{link}\n",
+            None, [user.email],
+        ))
+    return send_mass_mail(messages) if messages else 0
+
+
+def invited_user(uid, token):
+    """
+    Compte désigné par une invitation valide, ou None.
+    """
+    try:
+        user = User.objects.get(pk=force_str(urlsafe_base64_decode(uid)))
+    except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+        return None
+    if user.has_usable_password() or not invitation_token.check_token(user, token):
+        return None
+    return user
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 19:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nurseries', '0010_chunkedupload'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertype',
+            name='imported_by',
+            field=models.ForeignKey(blank=True, help_text="Crèche dont l'import de familles a créé ce compte (seule à pouvoir y rattacher des enfants)", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='imported_parents', to='nurseries.nursery'),
+        ),
+    ]
@@ -29,6 +29,10 @@ class UserType(models.Model):
         default='parent',
         help_text="Rôle de l'utilisateur (parent, assistant, manager, admin)"
     )
+    imported_by = models.ForeignKey(
+        'nurseries.Nursery', null=True, blank=True, on_delete=models.SET_NULL, related_name='imported_parents',
+        help_text="Crèche dont l'import de familles a créé ce compte (seule à pouvoir y rattacher des enfants)",
+    )
 
     class Meta:
         verbose_name = "Utilisateur étendu"
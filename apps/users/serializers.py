@@ -3,6 +3,7 @@ from django.contrib.auth.models import User
 from django.db import transaction
 from .models import *
 from apps.nurseries.models import NurseryAssistant
+from .invitations import invited_user
 
 class UserPasswordUpdateSerializer(serializers.Serializer):
     old_password = serializers.CharField(write_only=True)
@@ -26,6 +27,32 @@ class UserPasswordUpdateSerializer(serializers.Serializer):
         return user
 
 
+class InvitationAcceptSerializer(serializers.Serializer):
+    """
+    Choix du mot de passe d'un compte créé par import, à partir du lien d'invitation.
+    """
+    uid = serializers.CharField(write_only=True)
+    token = serializers.CharField(write_only=True)
+    new_password = serializers.CharField(write_only=True)
+
+    def validate_new_password(self, value):
+        if len(value) < 8:
+            raise serializers.ValidationError("Mot de passe trop court.")
+        return value
+
+    def validate(self, attrs):
+        attrs['user'] = invited_user(attrs['uid'], attrs['token'])
+        if attrs['user'] is None:
+            raise serializers.ValidationError({'token': "Invitation invalide ou expirée."})
+        return attrs
+
+    def save(self, **kwargs):
+        user = self.validated_data['user']
+        user.set_password(self.validated_data['new_password'])
+        user.save(update_fields=['password'])
+        return user
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -0,0 +1,13 @@
+from celery import shared_task
+from django.contrib.auth.models import User
+
+from apps.core.tasks import IdempotentTask
+from . import invitations
+
+
+@shared_task(base=IdempotentTask, autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def send_invitations(user_ids):
+    """
+    Envoie les invitations des comptes créés par un import de familles.
+    """
+    return invitations.send(User.objects.filter(pk__in=user_ids).order_by('pk'))
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.children.models import Child
+from apps.nurseries import exports
+from apps.nurseries.management.commands._seed import seed_budget_dataset
+from apps.users.models import UserType
+
+HEADER = "Parent (e-mail);Nom;Prénom;Naissance\n"
+
+
+class FamilyImportTests(APITestCase):
+
+    def setUp(self):
+        _, parents, users = seed_budget_dataset(1, prefix='ours')
+        self.nursery_id = parents['nursery_pk']
+        self.manager = users['manager']
+        _, parents, users = seed_budget_dataset(1, prefix='theirs')
+        self.other = (parents['nursery_pk'], users['manager'])
+
+    def post(self, lines, nursery_id=None, manager=None):
+        token = RefreshToken.for_user(manager or self.manager).access_token
+        upload = SimpleUploadedFile('familles.csv', (HEADER + ''.join(lines)).encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('nursery-import-families', kwargs={'pk': nursery_id or self.nursery_id}),
+                {'file': upload}, format='multipart', secure=True, HTTP_AUTHORIZATION=f"Bearer {token}",
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def test_invitation_sent_to_parent_only(self):
+        report = self.post(["Lea@Example.org;Martin;Léo;2024-05-01\n"])
+        self.assertEqual((report['parents'], report['children']), (1, 1))
+        self.assertEqual(report['invitations'], ['lea@example.org'])
+        self.assertNotIn('token', str(report))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['lea@example.org'])
+        self.assertIn('token=', mail.outbox[0].body)
+
+        parent = UserType.objects.get(user__email='lea@example.org')
+        self.assertEqual(parent.imported_by_id, self.nursery_id)
+        children = exports.DATASETS['children'].queryset
+        self.assertEqual(list(children(self.nursery_id).values_list('first_name', flat=True)), ['Enfant 0', 'Léo'])
+        self.assertNotIn('Léo', children(self.other[0]).values_list('first_name', flat=True))
+
+    def test_reimport_by_same_nursery(self):
+        self.post(["lea@example.org;Martin;Léo;2024-05-01\n"])
+        report = self.post(["lea@example.org;Martin;Léo;2024-05-01\n", "lea@example.org;Martin;Zoé;2025-01-01\n"])
+        self.assertEqual((report['parents'], report['children'], report['skipped']), (0, 1, 1))
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_accounts_of_others_untouched(self):
+        user = User.objects.create(username='famille@example.org', email='famille@example.org', password='!')
+        UserType.objects.create(user=user, type='parent')
+        self.post(["lea@example.org;Martin;Léo;2024-05-01\n"], *self.other)
+        mail.outbox.clear()
+
+        report = self.post(["famille@example.org;Durand;Ana;2024-05-01\n", "lea@example.org;Martin;Zoé;2025-01-01\n"])
+        self.assertEqual((report['parents'], report['children'], report['invitations']), (0, 0, []))
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3])
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(Child.objects.filter(first_name__in=['Ana', 'Zoé']).exists())
@@ -1,6 +1,8 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import UserDetailView, UpdatePasswordView, UserCreateView, CustomTokenObtainPairView
+from .views import (
+    UserDetailView, UpdatePasswordView, UserCreateView, CustomTokenObtainPairView, InvitationAcceptView,
+)
 
 router = DefaultRouter()
 router.register(r'profil', UserDetailView, basename='user-profil')
@@ -8,6 +10,7 @@ router.register(r'profil', UserDetailView, basename='user-profil')
 urlpatterns = [
     path('mot-de-passe/', UpdatePasswordView.as_view(), name='update-password'),
     path('register/', UserCreateView.as_view(), name='register'),
+    path('invitation/', InvitationAcceptView.as_view(), name='invitation-accept'),
     path('login/', CustomTokenObtainPairView.as_view(), name='login'),
 ]
 
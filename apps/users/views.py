@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from .serializers import (
     UserPasswordUpdateSerializer,
+    InvitationAcceptSerializer,
     UserTypeSerializer,
 )
 from .models import UserType
@@ -40,6 +41,17 @@ class UpdatePasswordView(generics.UpdateAPIView):
         serializer.save()
 
 
+class InvitationAcceptView(generics.GenericAPIView):
+    serializer_class = InvitationAcceptSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.save()
+        return Response({"detail": "Mot de passe défini.", "username": user.username})
+
+
 class UserCreateView(generics.CreateAPIView):
     serializer_class = UserTypeSerializer
     permission_classes = [permissions.AllowAny]
@@ -1,4 +1,12 @@
 #!/usr/bin/env bash
+# Point d'entrée du conteneur, selon le rôle (web par défaut) :
+#   web    : migrations, fixtures, fichiers statiques, worker Celery en arrière-plan puis gunicorn
+#   worker : worker Celery seul (déploiement où base et stockage sont partagés entre services)
+ROLE="${1:-web}"
+
+if [ "$ROLE" = "worker" ]; then
+    exec python manage.py run_worker --beat --concurrency="${CELERY_CONCURRENCY:-2}"
+fi
 
 echo "Applying migrations..."
 python manage.py migrate --noinput
@@ -23,4 +31,14 @@ python manage.py collectstatic --noinput
 
 echo "Build script finished."
 
+# Worker et planificateur (CELERY_BEAT_SCHEDULE) dans le même conteneur que l'API :
+# mêmes base SQLite et dossier media ; relancé s'il s'arrête
+(
+    while true; do
+        python manage.py run_worker --beat --concurrency="${CELERY_CONCURRENCY:-2}"
+        echo "Celery worker stopped, restarting in 5s..."
+        sleep 5
+    done
+) &
+
 exec gunicorn stage.wsgi:application --bind 0.0.0.0:$PORT
@@ -0,0 +1,19 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stage.settings')
+
+app = Celery('stage')
+# Toute la configuration vient des réglages Django préfixés CELERY_
+app.config_from_object('django.conf:settings', namespace='CELERY')
+# Charge les modules tasks.py de chaque application
+app.autodiscover_tasks()
+
+
+@app.on_after_configure.connect
+def create_broker_folders(sender, **kwargs):
+    # File sur disque (local) : kombu attend des dossiers existants
+    if sender.conf.broker_url == 'filesystem://':
+        for folder in sender.conf.broker_transport_options.values():
+            os.makedirs(folder, exist_ok=True)
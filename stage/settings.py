@@ -4,6 +4,8 @@ from datetime import timedelta
 import os
 import dj_database_url
 from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
+from celery.schedules import crontab
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -57,8 +59,18 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.QueryBudgetMiddleware',
 ]
 
+# Budget de requêtes SQL par vue (attribut `query_budget`) et détection des N+1 :
+# actif en développement et en tests (strict : un dépassement fait échouer le test)
+# manage.py test, ou pytest (pytest-django importe les réglages après pytest)
+TESTING = 'test' in sys.argv or 'pytest' in sys.modules
+QUERY_BUDGET_ENABLED = DEBUG or TESTING or os.getenv('QUERY_BUDGET_ENABLED') == 'True'
+QUERY_BUDGET_STRICT = TESTING or os.getenv('QUERY_BUDGET_STRICT') == 'True'
+QUERY_BUDGET_N_PLUS_ONE_THRESHOLD = 3
+QUERY_BUDGET_DEFAULT = None
+
 ROOT_URLCONF = 'stage.urls'
 
 TEMPLATES = [
@@ -97,6 +109,9 @@ TIME_ZONE = 'UTC'
 USE_I18N = True
 USE_TZ = True
 
+# Fuseau des horaires d'ouverture saisis par les crèches (Bénin, UTC+1)
+NURSERY_TIME_ZONE = 'Africa/Porto-Novo'
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -163,10 +178,84 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024  # 20MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024  # 20MB
 FILE_UPLOAD_PERMISSIONS = 0o644
 
+# Cache : mémoire locale par défaut, Redis si REDIS_URL est défini
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'stage',
+    }
+}
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+# Durée de vie (secondes) des réponses publiques des crèches en cache
+NURSERY_CACHE_TIMEOUT = 300
+
+# Calendriers .ics : durée de vie en cache (la clé suit la version des données,
+# d'où une durée longue) et max-age annoncé aux applications de calendrier
+ICS_FEED_CACHE_TIMEOUT = 86400
+ICS_FEED_MAX_AGE = 300
+
+# Tâches d'arrière-plan (Celery) : broker CELERY_BROKER_URL ou REDIS_URL. Sans broker, les tâches
+# s'exécutent sur place au commit (mode eager), ce qui suffit à runserver / migrate en local ;
+# en production (CELERY_REQUIRE_BROKER=True), l'absence de broker est une erreur de configuration.
+# La file sur disque (filesystem://, worker : python manage.py run_worker) se demande explicitement.
+# Mode eager : exécution immédiate dans le processus (tests, ou CELERY_TASK_ALWAYS_EAGER=True)
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER') == 'True' or TESTING
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL') or os.getenv('REDIS_URL')
+if not CELERY_BROKER_URL:
+    if os.getenv('CELERY_REQUIRE_BROKER') == 'True':
+        raise ImproperlyConfigured(
+            "Aucun broker Celery : définir CELERY_BROKER_URL ou REDIS_URL "
+            "(CELERY_BROKER_URL=filesystem:// pour une file sur disque en local)."
+        )
+    CELERY_TASK_ALWAYS_EAGER = True
+    CELERY_BROKER_URL = 'memory://'
+if CELERY_BROKER_URL == 'filesystem://':
+    # Dossiers créés au démarrage de l'application Celery (stage/celery.py), pas ici
+    CELERY_BROKER_FOLDER = os.getenv('CELERY_BROKER_FOLDER', os.path.join(BASE_DIR, '.celery'))
+    CELERY_BROKER_TRANSPORT_OPTIONS = {
+        'data_folder_in': CELERY_BROKER_FOLDER,
+        'data_folder_out': CELERY_BROKER_FOLDER,
+        'control_folder': os.path.join(CELERY_BROKER_FOLDER, 'control'),
+    }
+CELERY_TASK_IGNORE_RESULT = True
+# Acquittement après exécution : une tâche interrompue est relivrée (d'où les clés d'idempotence)
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TIMEZONE = 'UTC'
+CELERY_TASK_EAGER_PROPAGATES = True
+# Tâches périodiques : portées par le worker lancé avec --beat (conteneur web, ou en local)
+CELERY_BEAT_SCHEDULE = {
+    'expire-subscriptions': {
+        'task': 'apps.subscriptions.tasks.expire_subscriptions',
+        'schedule': crontab(hour=0, minute=15),
+    },
+    'renew-subscriptions': {
+        'task': 'apps.subscriptions.tasks.renew_subscriptions',
+        'schedule': crontab(hour=0, minute=30),
+    },
+}
+
+# E-mails (invitations des familles importées) : serveur SMTP défini par l'environnement
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS') == 'True'
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'no-reply@plateforme-creche.onrender.com')
+# Page du front où le parent choisit son mot de passe (paramètres uid et token)
+INVITATION_URL = os.getenv('INVITATION_URL', 'https://plateforme-creche.onrender.com/invitation')
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+
 # Extensions autorisées
 ALLOWED_FILE_EXTENSIONS = {
     'document': ['.pdf'],